@@ -1,36 +1,67 @@
+import argparse
+import logging
 import socket
 import threading
+import time
+from bitboard import BitBoard
+from game_log import GameLogWriter
+from log_config import configure_logging, room_logger
+from framing import DISCONNECT_MESSAGE, FrameReader, encode_frame
+from outbox import ThreadedOutbox
+from protocol import ERR_RATE_LIMITED, OP_MOVE, parse_message
+from validation import ERROR_FRAMES, MESSAGE_RATE, RateLimiter, check_move
 
 # Constants
-HEADER = 64  # Fixed size for the length of the incoming message
 PORT = 1000  # Port for the server to listen on
 SERVER = socket.gethostbyname(socket.gethostname())  # Get the IP address of the local machine
 ADDR = (SERVER, PORT)  # Server address
-FORMAT = 'utf-8'  # Format for encoding/decoding messages
-DISCONNECT_MESSAGE = "D"  # Message to indicate a client wants to disconnect
 GAME_OVER_MESSAGE = "GAME_OVER"  # Message to indicate the game is over
+ROOM_ID = 1  # The single game is logged as one room, like the first room of the async server
+CLOSE_LINGER = 2.0  # Seconds to let queued messages go out before a departing client's socket is closed
 
-# Setup the server socket
-server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-server.bind(ADDR)
+logger = logging.getLogger(__name__)
+room_log = room_logger(logger, ROOM_ID)  # For everything that happens in the game
+
+server = None  # Listening socket, created by start_server
 
 clients = []  # List to store connected clients
+outboxes = {}  # Outbound queue and writer thread of each connected client
 players = ['X', 'O']  # Players are 'X' and 'O'
-board = [" " for _ in range(9)]  # Tic-Tac-Toe board represented as a list of 9 spaces
+board = BitBoard()  # Tic-Tac-Toe board represented as one 9-bit mask per player
+turn = 'X'  # Mark whose move the server accepts next
+moves = []  # Cell indices played so far in the current game
+game_started = time.time()  # Start time of the current game
+game_log = None  # GameLogWriter finished games are recorded to, set by start_server
 
 def send_message_to_client(conn, message):
     """Sends a length-prefixed message to the client.
     
+    Messages go through the client's outbound queue when it has one, so the
+    caller never blocks on a slow peer.
+    
     Args:
         conn: The client socket connection.
         message: The message string to send to the client.
     """
-    message = message.encode(FORMAT)
-    msg_length = len(message)
-    send_length = str(msg_length).encode(FORMAT)
-    send_length += b' ' * (HEADER - len(send_length))  # Padding to meet the HEADER size
-    conn.send(send_length)
-    conn.send(message)
+    data = encode_frame(message)  # Header and payload in a single buffer
+    outbox = outboxes.get(conn)
+    if outbox is not None:
+        outbox.send(data)
+    else:
+        conn.sendall(data)
+
+def broadcast(messages):
+    """Send the messages produced by one event to every client as a single write.
+    
+    Args:
+        messages: The message strings to send, in order.
+    """
+    room_log.debug("Broadcasting %s", messages)
+    data = b"".join(encode_frame(message) for message in messages)
+    for client in list(clients):
+        outbox = outboxes.get(client)
+        if outbox is not None:
+            outbox.send(data)
 
 def check_winner(mark):
     """Check if a player has won by matching their mark on the board.
@@ -41,13 +72,7 @@ def check_winner(mark):
     Returns:
         bool: True if the player has won, False otherwise.
     """
-    win_conditions = [(0, 1, 2), (3, 4, 5), (6, 7, 8),  # Horizontal win conditions
-                      (0, 3, 6), (1, 4, 7), (2, 5, 8),  # Vertical win conditions
-                      (0, 4, 8), (2, 4, 6)]  # Diagonal win conditions
-    for condition in win_conditions:
-        if board[condition[0]] == board[condition[1]] == board[condition[2]] == mark:
-            return True
-    return False
+    return board.has_won(mark)  # Single lookup against the precomputed line masks
 
 def board_full():
     """Check if the Tic-Tac-Toe board is full (i.e., no more moves left).
@@ -55,70 +80,95 @@ def board_full():
     Returns:
         bool: True if the board is full, False otherwise.
     """
-    return " " not in board
+    return board.is_full()
 
 def handle_client(conn, addr):
     """Handle the interaction with a connected client.
     
+    Every move is validated against the server's board before it is applied, and
+    rejected messages only cost a pre-encoded error reply to the sender.
+    
     Args:
         conn: The client socket connection.
         addr: The address of the client.
     """
-    global clients
+    global clients, turn
     if len(clients) >= 2:
         send_message_to_client(conn, "TOO_MANY_PLAYERS")  # Reject connection if there are already 2 players
         conn.close()
         return
 
     player = players[len(clients)]  # Assign 'X' or 'O' based on the current number of connected clients
+    outboxes[conn] = ThreadedOutbox(conn)  # Writer thread so other players never wait on this one
     clients.append(conn)  # Add the client to the list
-    print(f"[NEW CONNECTION] {addr} connected as {player}.")
+    room_log.info("%s connected as %s", addr, player)
     
     send_message_to_client(conn, player)  # Inform the client of their role ('X' or 'O')
 
+    reader = FrameReader(conn)  # Buffers partial and coalesced frames
+    limiter = RateLimiter()
     connected = True
     while connected:
         try:
-            msg_length = conn.recv(HEADER).decode(FORMAT).strip()  # Receive the length of the incoming message
+            msg = reader.read_frame()  # Receive the next complete message
             
-            if msg_length == DISCONNECT_MESSAGE:
-                print(f"[{addr}] {player} is disconnecting.")
+            if msg == DISCONNECT_MESSAGE:
+                room_log.info("%s: %s is disconnecting", addr, player)
                 notify_disconnect(player)  # Notify the other player of the disconnection
                 connected = False
                 break
             
-            if msg_length:
-                msg_length = int(msg_length)
-                msg = conn.recv(msg_length).decode(FORMAT)  # Receive the actual message
-                print(f"[{addr}] Message received: {msg}")
+            if msg is None:
+                connected = False  # Connection closed without a disconnect notice
+                break
+            
+            room_log.debug("%s: message received: %r", addr, msg)
+            
+            op, fields = parse_message(msg)
+            error = 0 if limiter.allow() else ERR_RATE_LIMITED
+            if not error and op == OP_MOVE:
+                error = check_move(board, turn, player, *fields)  # Turn, bounds and occupancy
+            if error:
+                outboxes[conn].send(ERROR_FRAMES[error, False])  # Only the sender hears about it
+                if limiter.strike():
+                    room_log.warning("%s: too many rejected messages, disconnecting", addr)
+                    connected = False
+                    break
+                continue
+            limiter.clear()
+            
+            if op == OP_MOVE:
+                index = fields[1]
+                board.place(index, player)  # Update the board
+                turn = 'O' if player == 'X' else 'X'
+                moves.append(index)
+                
+                events = [f"MOVE:{player}:{index // 3}:{index % 3}"]  # The move goes to both players
                 
-                if msg.startswith(player):  # Ensure the message is from the correct player
-                    _, row, col = msg.split(':')
-                    row, col = int(row), int(col)
-                    index = row * 3 + col  # Convert the row and col to a board index
-                    board[index] = player  # Update the board
-                    
-                    # Send the move to both players
-                    for client in clients:
-                        send_message_to_client(client, f"MOVE:{player}:{row}:{col}")
-                    
-                    # Check for a winner or if the board is full
-                    if check_winner(player):
-                        for client in clients:
-                            send_message_to_client(client, f"WINNER:{player}")
-                        reset_game()  # Reset the game after a win
-                    elif board_full():
-                        for client in clients:
-                            send_message_to_client(client, "DRAW")
-                        reset_game()  # Reset the game after a draw
+                # Check for a winner or if the board is full
+                if check_winner(player):
+                    events.append(f"WINNER:{player}")
+                    record_game(player)
+                    reset_game(events)  # Reset the game after a win
+                elif board_full():
+                    events.append("DRAW")
+                    record_game(None)
+                    reset_game(events)  # Reset the game after a draw
+                
+                broadcast(events)  # Everything this move produced, in one write per client
 
         except Exception as e:
-            print(f"[ERROR] {e}")
+            room_log.error("%s: %s", addr, e)
             connected = False
             break
     
-    print(f"[DISCONNECTED] {addr} disconnected.")
+    room_log.info("%s disconnected", addr)
     clients.remove(conn)  # Remove the client from the list upon disconnection
+    outbox = outboxes.pop(conn)
+    outbox.close()
+    if not outbox.join(CLOSE_LINGER):  # Closing the socket under the writer thread would cut its last frames
+        outbox.abort()
+        outbox.join()
     conn.close()
 
 def notify_disconnect(disconnecting_player):
@@ -133,28 +183,102 @@ def notify_disconnect(disconnecting_player):
     for client in clients:
         if players[clients.index(client)] == other_player:
             addr = client.getpeername()
-            print(f"[NOTIFY DISCONNECT] Sending DISCONNECT message to {addr} ({other_player}).")
+            room_log.info("Sending DISCONNECT to %s (%s)", addr, other_player)
             send_message_to_client(client, "DISCONNECT")  # Notify the other player
 
-def reset_game():
-    """Reset the game board for a new game."""
-    global board
-    print("[RESETTING GAME] Resetting the board for a new game.")
-    board = [" " for _ in range(9)]  # Clear the board
+def record_game(winner):
+    """Append the finished game to the game log, if the server keeps one.
     
-    for client in clients:
-        send_message_to_client(client, "RESET_BOARD")  # Notify clients that the board has been reset
+    Args:
+        winner: The winning mark, or None for a draw.
+    """
+    if game_log is None:
+        return
+    names = []
+    for client in clients[:2]:
+        try:
+            host, port = client.getpeername()[:2]
+            names.append(f"{host}:{port}")
+        except OSError:
+            names.append("")  # Player already gone
+    names += [""] * (2 - len(names))
+    game_log.write(names[0], names[1], moves, winner, game_started)
+    game_log.flush()  # A single game finishes rarely enough to write each one out at once
+
+def reset_game(events=None):
+    """Reset the game board for a new game.
+    
+    Args:
+        events: Optional list of pending messages; if given, the reset notice is
+            appended to it so it goes out with them instead of on its own.
+    """
+    global board, turn, moves, game_started
+    room_log.debug("Resetting the board for a new game")
+    board = BitBoard()  # Clear the board
+    turn = 'X'  # X starts every game
+    moves = []
+    game_started = time.time()
+    
+    if events is not None:
+        events.append("RESET_BOARD")
+    else:
+        broadcast(["RESET_BOARD"])  # Notify clients that the board has been reset
 
-def start_server():
-    """Start the server and handle incoming connections."""
+def start_server(host=SERVER, port=PORT, game_log_path=None):
+    """Start the server and handle incoming connections.
+    
+    Args:
+        host: The address to listen on.
+        port: The port to listen on.
+        game_log_path: Optional path of the game log to append finished games to.
+    """
+    global server, game_log
+    if game_log_path:
+        game_log = GameLogWriter(game_log_path)
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind((host, port))
     server.listen()
-    print(f"Server listening on {SERVER}")
+    logger.info("Server listening on %s:%s", host, port)
     while True:
         if len(clients) < 2:  # Only accept connections if fewer than 2 players are connected
             conn, addr = server.accept()  # Accept incoming connections
             thread = threading.Thread(target=handle_client, args=(conn, addr))
             thread.start()  # Start a new thread for each client connection
-            print(f"[ACTIVE CONNECTIONS] {threading.active_count() - 1}")  # Display active connections
+            logger.info("Active connections: %d", threading.active_count() - 1)
+
+def main():
+    """Parse the command line and start the server in the selected mode.
+    
+    The default threaded mode hosts a single game with one thread per client. The
+    async mode hosts any number of independent rooms on a single asyncio event loop.
+    """
+    parser = argparse.ArgumentParser(description="Tic-Tac-Toe game server")
+    parser.add_argument("--mode", choices=("threaded", "async"), default="threaded",
+                        help="threaded: one game, one thread per client; async: many rooms on one event loop")
+    parser.add_argument("--host", default=SERVER, help="address to listen on")
+    parser.add_argument("--port", type=int, default=PORT, help="port to listen on")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="async mode only: number of worker processes sharing the port (0 = one per core)")
+    parser.add_argument("--message-rate", type=float, default=MESSAGE_RATE,
+                        help=f"async mode only: messages per second each client may send "
+                             f"(default {MESSAGE_RATE:g}; 0 = no limit)")
+    parser.add_argument("--game-log", metavar="PATH",
+                        help="append every finished game to a binary game log (one file per async worker)")
+    parser.add_argument("--log-level", help="DEBUG logs every message and move; default INFO "
+                                            "(or $TICTACTOE_LOG_LEVEL)")
+    args = parser.parse_args()
+    configure_logging(args.log_level)
+
+    if args.mode == "async":
+        from async_server import run_workers
+        run_workers(args.host, args.port, args.workers, args.game_log, args.message_rate or None)
+    else:
+        try:
+            start_server(args.host, args.port, args.game_log)
+        finally:
+            if game_log is not None:
+                game_log.close()
 
 # Start the server
-start_server()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bitboard import BitBoard
+from game_logic import TicTacToeGame
+from mnk_engine import SearchTimeout
+
+AI_TIME_BUDGET = 2.0  # Seconds the UI waits for a search before playing the fallback move
+POLL_INTERVAL = 10  # Milliseconds between checks for a finished search on the Tk thread
+STOP_GRACE = 0.25  # Seconds a search past its deadline gets to hand back its best move
+
+logger = logging.getLogger(__name__)
+
+
+def search_move(x, o, search, deadline=None, stop=None):
+    """Search for O's move on a private copy of a position.
+
+    Takes plain masks so it can run in a thread or in another process.
+
+    Args:
+        x: Bit mask of the cells held by X.
+        o: Bit mask of the cells held by O.
+        search: The TicTacToeGame.ai_move search mode.
+        deadline: time.monotonic() at which the search stops, or None.
+        stop: threading.Event that stops the search when set, or None.
+
+    Returns:
+        int: The index of the chosen cell, or None if the board is full.
+    """
+    game = TicTacToeGame(ai_enabled=True)
+    game.board = BitBoard(x, o)
+    game.current_player = "O"
+    try:
+        return game.ai_move(search, deadline, stop)
+    except SearchTimeout:
+        return fallback_move(BitBoard(x, o))  # Stopped before any move was scored
+
+
+def fallback_move(board):
+    """Pick O's move instantly: a win, else a block, else the best-placed free cell.
+
+    Args:
+        board: The current BitBoard.
+
+    Returns:
+        int: The index of the chosen cell, or None if the board is full.
+    """
+    moves = TicTacToeGame().ordered_moves(board, "O")
+    return moves[0] if moves else None
+
+
+class AIWorker:
+    """Runs AI searches in the background and hands the result back on the Tk thread.
+
+    The search runs on an executor, by default a single background thread, while
+    the Tk event loop keeps drawing and animating. A short after() poll picks up the
+    result, so the callback always runs on the Tk thread. The search is given the
+    time budget as a deadline and plays its best move so far when it runs out; one
+    that has not answered STOP_GRACE later is given up in favour of fallback_move().
+    Cancelling sets the search's stop event, so it ends at its next check and the
+    thread is free for the next request. Pass a ProcessPoolExecutor to keep long
+    searches from competing with the UI for the GIL; the deadline still applies,
+    but a search in another process cannot be stopped early.
+
+    Attributes:
+        root: The Tk widget whose event loop receives the results.
+        search: The TicTacToeGame.ai_move search mode.
+        time_budget: Seconds to wait for a search, or None to wait as long as it takes.
+        executor: The executor running the searches.
+    """
+
+    def __init__(self, root, search="book", time_budget=AI_TIME_BUDGET, executor=None):
+        """Create an idle worker.
+
+        Args:
+            root: The Tk widget whose event loop receives the results.
+            search: The TicTacToeGame.ai_move search mode.
+            time_budget: Seconds to wait for a search, or None for no limit.
+            executor: Executor for the searches (default: one background thread).
+        """
+        self.root = root
+        self.search = search
+        self.time_budget = time_budget
+        self.executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="ai")
+        self._future = None
+        self._board = None
+        self._callback = None
+        self._deadline = None
+        self._stop = None
+        self._poll_job = None
+
+    @property
+    def thinking(self):
+        """bool: True while a search is under way."""
+        return self._future is not None
+
+    def request(self, board, callback):
+        """Start searching for O's move, replacing any search still under way.
+
+        Args:
+            board: The position to search; it is copied, so the game may change meanwhile.
+            callback: Called on the Tk thread with the chosen cell index.
+        """
+        self.cancel()
+        self._board = board.copy()
+        self._callback = callback
+        self._deadline = None if self.time_budget is None else time.monotonic() + self.time_budget
+        # An event cannot be sent to another process; there only the deadline applies
+        self._stop = threading.Event() if isinstance(self.executor, ThreadPoolExecutor) else None
+        self._future = self.executor.submit(search_move, self._board.x, self._board.o, self.search,
+                                            self._deadline, self._stop)
+        self._poll_job = self.root.after(POLL_INTERVAL, self._poll)
+
+    def cancel(self):
+        """Forget the current search, if any; its callback will not be called."""
+        if self._poll_job is not None:
+            self.root.after_cancel(self._poll_job)
+            self._poll_job = None
+        self._stop_search()
+        self._callback = None
+
+    def close(self):
+        """Cancel the current search and release the executor without waiting for it."""
+        self.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _stop_search(self):
+        """Stop waiting for the current search and tell it to stop at its next check."""
+        if self._future is not None:
+            self._future.cancel()  # A search that has not started yet never runs
+            self._future = None
+        if self._stop is not None:
+            self._stop.set()
+            self._stop = None
+
+    def _poll(self):
+        """Deliver the finished search, or the fallback once the time budget is spent."""
+        self._poll_job = None
+        future = self._future
+        if future.done():
+            try:
+                move = future.result()
+            except Exception as e:
+                logger.error("AI search failed, playing the fallback move: %s", e)
+                move = fallback_move(self._board)
+        elif self._deadline is not None and time.monotonic() >= self._deadline + STOP_GRACE:
+            logger.warning("AI search exceeded its %gs budget, playing the fallback move", self.time_budget)
+            self._stop_search()
+            move = fallback_move(self._board)
+        else:
+            self._poll_job = self.root.after(POLL_INTERVAL, self._poll)
+            return
+        callback = self._callback
+        self._future = self._stop = self._callback = None
+        callback(move)
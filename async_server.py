@@ -0,0 +1,641 @@
+import asyncio
+import functools
+import itertools
+import logging
+import multiprocessing
+import secrets
+import signal
+import socket
+import time
+from bitboard import BitBoard
+from game_log import GameLogWriter
+from log_config import configure_logging, room_logger, stop_logging
+from matchmaking import DEFAULT_VARIANT, MatchmakingQueue, RoomManager, Ticket
+from framing import DISCONNECT_MESSAGE, FrameDecoder
+from outbox import AsyncOutbox
+from protocol import (ERR_NOT_SEATED, ERR_RATE_LIMITED, ERR_SESSION_EXPIRED, OP_DISCONNECT, OP_DRAW, OP_HELLO,
+                      OP_JOIN, OP_MOVE, OP_REDIRECT, OP_REMATCH, OP_RESET_BOARD, OP_RESUME, OP_ROLE, OP_ROOM,
+                      OP_SESSION, OP_SNAPSHOT, OP_WINNER, PROTOCOL_VERSION, encode_message, parse_message,
+                      token_room)
+from validation import ERROR_FRAMES, MESSAGE_RATE, RateLimiter, check_move
+from Server import PORT, SERVER
+
+GRACE_PERIOD = 30.0  # Seconds a dropped player's seat is held for them to resume
+LOG_FLUSH_INTERVAL = 5.0  # Seconds between flushes of the game log buffer
+FIRST_FRAME_WAIT = 0.25  # Seconds a public-port connection may take to send RESUME or JOIN before it is matchmade
+
+logger = logging.getLogger(__name__)
+
+
+class Room:
+    """A single match between two players with its own board.
+
+    Attributes:
+        room_id: Unique identifier of the room.
+        variant: The board variant the room was matched for.
+        board: The room's Tic-Tac-Toe board.
+        turn: The mark ('X' or 'O') whose move the room expects next.
+        players: Maps each mark ('X' or 'O') to that player's connection.
+        tokens: Maps each mark to the session token of the player holding that seat.
+        held: Maps the mark of each dropped player to the timer that gives up their seat.
+        moves: Cell indices played so far in the current game.
+        started: Start time of the current game, in seconds since the epoch.
+        game_log: The GameLogWriter finished games are recorded to, or None.
+        log: Logger tagging every record with the room id.
+    """
+
+    def __init__(self, room_id, variant=DEFAULT_VARIANT, game_log=None):
+        """Create an empty room.
+
+        Args:
+            room_id: Unique identifier of the room.
+            variant: The board variant the room was matched for.
+            game_log: Optional GameLogWriter to record finished games to.
+        """
+        self.room_id = room_id
+        self.variant = variant
+        self.board = BitBoard()
+        self.turn = 'X'
+        self.players = {}
+        self.tokens = {}
+        self.held = {}
+        self.moves = []
+        self.started = time.time()
+        self.game_log = game_log
+        self.log = room_logger(logger, room_id)
+
+    def is_full(self):
+        """Return True once both seats are taken, counting seats held for dropped players."""
+        return len(self.players) + len(self.held) == 2
+
+    def broadcast(self, op, *fields):
+        """Queue a message for every player in the room.
+
+        The message is encoded at most once per protocol, however many players
+        use that protocol, and handed to each player's outbox without waiting.
+
+        Args:
+            op: The message opcode.
+            *fields: The message fields.
+        """
+        frames = {}
+        for client in self.players.values():
+            frame = frames.get(client.binary)
+            if frame is None:
+                frame = frames[client.binary] = encode_message(op, *fields, binary=client.binary)
+            client.outbox.send(frame)
+
+    def check(self, player, mark, index):
+        """Validate a move against the room's authoritative state.
+
+        Args:
+            player: The mark assigned to the sending player.
+            mark: The mark named in the move message.
+            index: The board index named in the move message.
+
+        Returns:
+            int: 0 if the move is legal, otherwise the error code to reply with.
+        """
+        return check_move(self.board, self.turn, player, mark, index)
+
+    def play(self, player, index):
+        """Apply a validated move and notify both players of the move and any result.
+
+        Args:
+            player: The mark of the player making the move.
+            index: The board index of the move.
+        """
+        self.board.place(index, player)
+        self.turn = 'O' if player == 'X' else 'X'
+        self.moves.append(index)
+        self.broadcast(OP_MOVE, player, index)
+
+        if self.board.has_won(player):
+            self.broadcast(OP_WINNER, player)
+            self.record(player)
+            self.reset()
+        elif self.board.is_full():
+            self.broadcast(OP_DRAW)
+            self.record(None)
+            self.reset()
+
+    def record(self, winner):
+        """Append the finished game to the game log, if the server keeps one.
+
+        Players are named by their address; a seat held for a dropped player is
+        recorded with an empty name.
+
+        Args:
+            winner: The winning mark, or None for a draw.
+        """
+        if self.game_log is None:
+            return
+        names = []
+        for mark in ('X', 'O'):
+            client = self.players.get(mark)
+            names.append(f"{client.addr[0]}:{client.addr[1]}" if client is not None and client.addr else "")
+        self.game_log.write(names[0], names[1], self.moves, winner, self.started)
+
+    def reset(self):
+        """Clear the board for a new game and notify both players."""
+        self.log.debug("Resetting the board for a new game")
+        self.board.reset()
+        self.turn = 'X'  # X starts every game
+        self.moves = []
+        self.started = time.time()
+        self.broadcast(OP_RESET_BOARD)
+
+
+class PlayerConnection:
+    """Server-side state of one connected player.
+
+    Attributes:
+        client_id: Unique identifier of the connection.
+        writer: The connection's stream writer.
+        outbox: The bounded outbound queue drained by the connection's writer task.
+        addr: The peer address.
+        room: The room the player is seated in, or None while queued.
+        player: The mark ('X' or 'O') assigned to the player.
+        binary: True once the client has negotiated the binary protocol.
+        limiter: The rate limiter applied to the client's messages.
+    """
+
+    def __init__(self, client_id, writer, addr, message_rate=MESSAGE_RATE):
+        """Create the state for a new connection.
+
+        Args:
+            client_id: Unique identifier of the connection.
+            writer: The connection's stream writer.
+            addr: The peer address.
+            message_rate: Messages per second the client may send, or None for no limit.
+        """
+        self.client_id = client_id
+        self.writer = writer
+        self.outbox = AsyncOutbox(writer)
+        self.addr = addr
+        self.room = None
+        self.player = None
+        self.binary = False
+        self.limiter = RateLimiter(message_rate)
+
+    def send(self, op, *fields):
+        """Queue a message for this player in its negotiated protocol.
+
+        Args:
+            op: The message opcode.
+            *fields: The message fields.
+        """
+        self.outbox.send(encode_message(op, *fields, binary=self.binary))
+
+    def reject(self, code):
+        """Reply to a rejected message with its pre-encoded error frame.
+
+        Args:
+            code: The error code.
+
+        Returns:
+            bool: True if the client has misbehaved often enough to be disconnected.
+        """
+        self.outbox.send(ERROR_FRAMES[code, self.binary])
+        return self.limiter.strike()
+
+
+class AsyncGameServer:
+    """Hosts many independent rooms on one asyncio event loop.
+
+    New connections go through the matchmaking queue and are paired FIFO with a
+    waiting player of the same board variant (and skill band, if enabled), unless
+    their first message is a RESUME or JOIN; a client that says nothing is queued
+    after FIRST_FRAME_WAIT. The waiting player is told it is 'X' straight away and
+    its opponent becomes 'O', so the role message arrives exactly as with the
+    threaded server and existing clients work unchanged. A player whose room has finished can send REMATCH to
+    be queued again. Clients that send HELLO with a supported version are switched
+    to the compact binary protocol; all others keep the text protocol.
+
+    Every seated player is issued a session token. If their connection drops
+    without a disconnect notice, the seat is held for GRACE_PERIOD seconds and the
+    opponent is not told; a new connection sending RESUME with the token takes the
+    seat back and receives one SNAPSHOT of the board and turn.
+
+    When run as one of several worker processes, every worker accepts connections
+    on the shared public port (SO_REUSEPORT) and also listens on its own direct
+    port. Each worker queues and seats the players it accepted, so rooms are spread
+    over the workers. The workers share how many players each one has waiting: a
+    player who asked for a match with REMATCH or JOIN, and finds nobody waiting on
+    its own worker, is redirected to a worker where someone is, and the room is
+    created there. Clients that only wait for their role are matched on the worker
+    they reached. Room ids encode the owning worker, so a player asking to JOIN a
+    room owned by another worker is redirected to that worker's direct port.
+
+    Attributes:
+        host: The address to listen on.
+        port: The public port to listen on.
+        worker_index: Index of this worker process.
+        worker_count: Total number of worker processes.
+        queue: The matchmaking queue of players waiting for an opponent.
+        waiting: Shared array of the number of players queued on each worker, or
+            None for a single worker.
+        message_rate: Messages per second each client may send, or None for no limit.
+        rooms: The manager of active rooms.
+        sessions: Maps session tokens to the (room, mark) of the seat they hold.
+        game_log: The GameLogWriter every finished game is recorded to, or None.
+    """
+
+    def __init__(self, host=SERVER, port=PORT, skill_band=None, worker_index=0, worker_count=1, game_log=None,
+                 waiting=None, message_rate=MESSAGE_RATE):
+        """Create the server without binding yet.
+
+        Args:
+            host: The address to listen on.
+            port: The public port to listen on.
+            skill_band: Width of a skill band for pairing; None ignores skill.
+            worker_index: Index of this worker process.
+            worker_count: Total number of worker processes.
+            game_log: Optional GameLogWriter to record finished games to.
+            waiting: Shared multiprocessing.Array with one queue length per worker.
+            message_rate: Messages per second each client may send, or None for no limit.
+        """
+        self.host = host
+        self.port = port
+        self.worker_index = worker_index
+        self.worker_count = worker_count
+        self.game_log = game_log
+        self.queue = MatchmakingQueue(skill_band)
+        self.waiting = waiting
+        self.message_rate = message_rate
+        self.rooms = RoomManager(functools.partial(Room, game_log=game_log), worker_index, worker_count)
+        self.sessions = {}
+        self._client_ids = itertools.count(1)
+
+    def worker_port(self, worker_index):
+        """Return the direct port of a worker.
+
+        Args:
+            worker_index: Index of the worker.
+
+        Returns:
+            int: The port only that worker listens on.
+        """
+        return self.port + 1 + worker_index
+
+    def matchmake(self, client, variant=DEFAULT_VARIANT, skill=None, redirect=False):
+        """Find a player a match: pair or queue them here, or redirect them to a waiting player.
+
+        Args:
+            client: The connection of the player.
+            variant: The board variant to play.
+            skill: Optional skill rating for skill-band pairing.
+            redirect: True if the client asked for the match itself and so can
+                follow a redirect; others are always matched on this worker.
+        """
+        if self.waiting is None:
+            self.enqueue(client, variant, skill)
+            return
+        with self.waiting.get_lock():  # Checking and queueing is atomic across workers
+            if redirect and not len(self.queue):
+                for index, count in enumerate(self.waiting):
+                    if count > 0 and index != self.worker_index:
+                        self.waiting[index] = count - 1  # Claim the waiting player, so no one else is sent for them
+                        client.send(OP_REDIRECT, self.worker_port(index))  # The client sends REMATCH there
+                        return
+            self.enqueue(client, variant, skill)
+            self.waiting[self.worker_index] = len(self.queue)
+
+    def enqueue(self, client, variant=DEFAULT_VARIANT, skill=None):
+        """Queue a player for a match, seating them in a new room if an opponent is waiting.
+
+        Args:
+            client: The connection of the player.
+            variant: The board variant to play.
+            skill: Optional skill rating for skill-band pairing.
+        """
+        opponent = self.queue.enqueue(Ticket(client.client_id, variant, skill, client))
+        if opponent is None:
+            client.player = 'X'  # First in line moves first
+            client.send(OP_ROLE, client.player)
+            return
+
+        room = self.rooms.create_room(variant=variant)
+        first = opponent.client
+        room.players['X'] = first
+        room.players['O'] = client
+        first.room = room
+        client.room, client.player = room, 'O'
+        client.send(OP_ROLE, client.player)
+        room.broadcast(OP_ROOM, room.room_id)  # Lets clients find the owning worker again
+        self.issue_session(first)
+        self.issue_session(client)
+        room.log.debug("%s and %s paired", first.addr, client.addr)
+
+    def issue_session(self, client):
+        """Create a session token for a seated player and send it to them.
+
+        The token starts with the room id, so any worker can tell from the token
+        alone which worker owns the seat.
+
+        Args:
+            client: The connection of the seated player.
+        """
+        room = client.room
+        token = (room.room_id.to_bytes(4, 'big') + secrets.token_bytes(8)).hex()
+        self.sessions.pop(room.tokens.get(client.player), None)
+        room.tokens[client.player] = token
+        self.sessions[token] = room, client.player
+        client.send(OP_SESSION, token)
+
+    def leave(self, client, hold_seat=False):
+        """Take a player out of the queue or their room, tearing the room down once empty.
+
+        Args:
+            client: The connection of the leaving player.
+            hold_seat: True if the connection dropped without a disconnect notice,
+                so the seat is kept for GRACE_PERIOD seconds while the opponent stays.
+        """
+        room = client.room
+        if room is None:
+            if self.queue.cancel(client.client_id) is not None and self.waiting is not None:
+                self.waiting[self.worker_index] = len(self.queue)
+            return
+
+        client.room = None
+        room.players.pop(client.player, None)
+        if hold_seat and room.players and client.player in room.tokens:
+            loop = asyncio.get_running_loop()
+            room.held[client.player] = loop.call_later(GRACE_PERIOD, self.expire, room, client.player)
+            room.log.info("Holding seat %s for %gs", client.player, GRACE_PERIOD)
+            return
+        self.close_seat(room, client.player)
+
+    def expire(self, room, mark):
+        """Give up a held seat whose grace period has run out.
+
+        Args:
+            room: The room of the held seat.
+            mark: The mark of the held seat.
+        """
+        if room.held.pop(mark, None) is not None:
+            room.log.info("Seat %s was not resumed in time", mark)
+            self.close_seat(room, mark)
+
+    def close_seat(self, room, mark):
+        """Release a seat for good, telling the opponent or closing the room once empty.
+
+        Args:
+            room: The room of the seat.
+            mark: The mark of the seat.
+        """
+        self.sessions.pop(room.tokens.pop(mark, None), None)
+        if room.players:
+            # Notify the remaining player; the client disconnects on this message
+            room.broadcast(OP_DISCONNECT)
+            return
+
+        for handle in room.held.values():
+            handle.cancel()
+        for token in room.tokens.values():
+            self.sessions.pop(token, None)
+        room.held.clear()
+        room.tokens.clear()
+        self.rooms.close_room(room.room_id)
+
+    def resume(self, client, token):
+        """Handle a RESUME request: give a dropped player their seat back, or redirect.
+
+        The player gets a single SNAPSHOT with their mark, both players' cell masks
+        and the mark to move, instead of a replay of the moves they missed.
+
+        Args:
+            client: The connection of the returning player.
+            token: The session token issued when the player was seated.
+        """
+        owner = self.rooms.owner(token_room(token))
+        if owner != self.worker_index:
+            client.send(OP_REDIRECT, self.worker_port(owner))
+            return
+
+        seat = self.sessions.get(token)
+        if seat is None:
+            client.outbox.send(ERROR_FRAMES[ERR_SESSION_EXPIRED, client.binary])
+            return
+        room, mark = seat
+        handle = room.held.pop(mark, None)
+        if handle is not None:
+            handle.cancel()
+        else:
+            # The old connection has not noticed it is dead yet; the new one replaces it
+            stale = room.players.pop(mark)
+            stale.room = None
+            stale.outbox.abort()
+
+        self.leave(client)  # Give up any match the connection asked for before resuming
+        client.room, client.player = room, mark
+        room.players[mark] = client
+        client.send(OP_SNAPSHOT, mark, room.board.x, room.board.o, room.turn)
+        room.log.info("%s resumed seat %s", client.addr, mark)
+
+    def rematch(self, client, options):
+        """Handle a REMATCH[:variant[:skill]] request by re-queueing the player.
+
+        Args:
+            client: The connection of the requesting player.
+            options: The optional variant and skill fields of the request.
+        """
+        variant = options[0] if options and options[0] else DEFAULT_VARIANT
+        skill = float(options[1]) if len(options) > 1 and options[1] else None
+        self.leave(client)
+        self.matchmake(client, variant, skill, redirect=True)
+
+    def join(self, client, room_id):
+        """Handle a JOIN request: seat the player in a room this worker owns, or redirect.
+
+        Args:
+            client: The connection of the requesting player.
+            room_id: The id of the room to join.
+        """
+        owner = self.rooms.owner(room_id)
+        if owner != self.worker_index:
+            client.send(OP_REDIRECT, self.worker_port(owner))
+            return
+
+        room = self.rooms.get(room_id)
+        if room is None or room.is_full():
+            if client.room is None and client.client_id not in self.queue:
+                self.matchmake(client, redirect=True)  # Nothing to join, find a new match instead
+            return
+
+        self.leave(client)  # Give up any queue ticket before taking the seat
+        client.player = 'X' if 'X' not in room.players else 'O'
+        client.room = room
+        room.players[client.player] = client
+        client.send(OP_ROLE, client.player)
+        client.send(OP_ROOM, room.room_id)
+        self.issue_session(client)
+
+    async def handle_connection(self, reader, writer, auto_queue=True):
+        """Serve one client connection for its whole lifetime.
+
+        Args:
+            reader: The connection's stream reader.
+            writer: The connection's stream writer.
+            auto_queue: True to matchmake the player unless their first message
+                is a RESUME or JOIN (public port), False to wait for a JOIN,
+                REMATCH or RESUME (direct port).
+        """
+        client = PlayerConnection(next(self._client_ids), writer, writer.get_extra_info('peername'),
+                                  self.message_rate)
+        addr = client.addr
+        logger.info("%s connected", addr)
+        undecided = auto_queue  # Matchmade once the first message is known not to be a RESUME or JOIN
+
+        decoder = FrameDecoder()  # Buffers partial and coalesced frames
+        dropped = True  # Until the client says goodbye, a lost connection may come back
+        try:
+            connected = True
+            while connected:
+                if undecided:
+                    try:
+                        data = await asyncio.wait_for(reader.read(65536), FIRST_FRAME_WAIT)
+                    except asyncio.TimeoutError:
+                        undecided = False
+                        self.matchmake(client)  # A client that waits for its role, as the original one does
+                        continue
+                else:
+                    data = await reader.read(65536)
+                if not data and decoder.close() is None:
+                    break  # Connection lost without a disconnect notice
+                messages = decoder.feed(data) if data else [DISCONNECT_MESSAGE]
+                for msg in messages:
+                    op, fields = parse_message(msg)
+                    if undecided:
+                        undecided = False
+                        if op not in (OP_RESUME, OP_JOIN, OP_REMATCH, OP_DISCONNECT):
+                            self.matchmake(client)
+                    if op == OP_DISCONNECT:
+                        logger.info("%s: %s is disconnecting", addr, client.player)
+                        connected = dropped = False
+                        break
+                    # Junk is turned away here, before it can touch a room or reach the opponent
+                    error = 0 if client.limiter.allow() else ERR_RATE_LIMITED
+                    if not error and op == OP_MOVE:
+                        room = client.room
+                        error = room.check(client.player, *fields) if room is not None else ERR_NOT_SEATED
+                    if error:
+                        if client.reject(error):
+                            logger.warning("%s: too many rejected messages, disconnecting", addr)
+                            connected = dropped = False
+                            break
+                        continue
+                    client.limiter.clear()
+                    if op == OP_MOVE:
+                        client.room.play(client.player, fields[1])
+                    elif op == OP_HELLO:
+                        if fields[0] == PROTOCOL_VERSION:
+                            client.binary = True  # Acknowledge in binary, then stay binary
+                            client.send(OP_HELLO, PROTOCOL_VERSION)
+                    elif op == OP_REMATCH:
+                        self.rematch(client, fields)
+                    elif op == OP_JOIN:
+                        self.join(client, fields[0])
+                    elif op == OP_RESUME:
+                        self.resume(client, fields[0])
+        except ConnectionError as e:
+            logger.info("%s: %s", addr, e)
+        except (ValueError, IndexError) as e:
+            logger.warning("%s: malformed message: %s", addr, e)
+            dropped = False  # Malformed input is not a network problem
+        finally:
+            logger.info("%s disconnected", addr)
+            self.leave(client, hold_seat=dropped)
+            client.outbox.close()
+
+    async def serve(self):
+        """Listen for connections until cancelled."""
+        sharded = self.worker_count > 1
+        servers = [await asyncio.start_server(self.handle_connection, self.host, self.port,
+                                              reuse_port=sharded or None)]
+        if sharded:
+            direct_port = self.worker_port(self.worker_index)
+            servers.append(await asyncio.start_server(
+                functools.partial(self.handle_connection, auto_queue=False), self.host, direct_port))
+            logger.info("Worker %d listening on %s:%s (direct port %d)", self.worker_index, self.host, self.port,
+                        direct_port)
+        else:
+            logger.info("Async server listening on %s:%s", self.host, self.port)
+        tasks = [server.serve_forever() for server in servers]
+        if self.game_log is not None:
+            tasks.append(self.flush_game_log())
+        await asyncio.gather(*tasks)
+
+    async def flush_game_log(self):
+        """Flush the game log periodically so a quiet server still writes its games out."""
+        while True:
+            await asyncio.sleep(LOG_FLUSH_INTERVAL)
+            self.game_log.flush()
+
+
+def run_server(host=SERVER, port=PORT, worker_index=0, worker_count=1, game_log_path=None, waiting=None,
+               message_rate=MESSAGE_RATE):
+    """Run the asyncio server on the current thread until interrupted.
+
+    Args:
+        host: The address to listen on.
+        port: The public port to listen on.
+        worker_index: Index of this worker process.
+        worker_count: Total number of worker processes.
+        game_log_path: Optional path of the game log to append finished games to.
+            With several workers each one writes its own file, suffixed with its index.
+        waiting: Shared array of the workers' queue lengths (see AsyncGameServer).
+        message_rate: Messages per second each client may send, or None for no limit.
+    """
+    configure_logging()  # Keeps the parent's level; a forked worker needs its own listener thread
+    signal.signal(signal.SIGTERM, signal.default_int_handler)  # Terminating a worker still flushes its log
+    game_log = None
+    if game_log_path:
+        game_log = GameLogWriter(f"{game_log_path}.{worker_index}" if worker_count > 1 else game_log_path)
+    try:
+        asyncio.run(AsyncGameServer(host, port, worker_index=worker_index, worker_count=worker_count,
+                                    game_log=game_log, waiting=waiting, message_rate=message_rate).serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if game_log is not None:
+            game_log.close()
+        stop_logging()  # Worker processes exit without running atexit hooks
+
+
+def run_workers(host=SERVER, port=PORT, workers=None, game_log_path=None, message_rate=MESSAGE_RATE):
+    """Run one asyncio server process per worker, all sharing the public port.
+
+    Each worker owns the rooms it creates. Ports port + 1 to port + workers are
+    used as the workers' direct ports for routing players to the right worker.
+
+    Args:
+        host: The address to listen on.
+        port: The public port to listen on.
+        workers: Number of worker processes (default: one per CPU core).
+        game_log_path: Optional path of the game log (see run_server).
+        message_rate: Messages per second each client may send, or None for no limit.
+    """
+    workers = workers or multiprocessing.cpu_count()
+    if workers == 1 or not hasattr(socket, "SO_REUSEPORT"):
+        if workers > 1:
+            logger.warning("SO_REUSEPORT is not available on this platform, running a single worker")
+        run_server(host, port, game_log_path=game_log_path, message_rate=message_rate)
+        return
+
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    waiting = multiprocessing.Array('i', workers)  # Players queued on each worker
+    processes = [multiprocessing.Process(target=run_server,
+                                         args=(host, port, index, workers, game_log_path, waiting, message_rate),
+                                         daemon=True)
+                 for index in range(workers)]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join(5.0)  # Let the workers write out their logs
@@ -0,0 +1,188 @@
+from functools import lru_cache
+
+from bitboard import FULL_MASK, WIN_CONDITIONS
+from opening_book import MOVES_MASK, POSITIONS, REACHABLE, VALUE_SHIFT, get_book
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is only needed for bulk analysis, the game runs without it
+    np = None
+
+# Cell encoding of the (N, 9) int8 board arrays: X and O cancel out in line sums,
+# so a line summing to +3 is won by X and one summing to -3 by O
+EMPTY, X, O = 0, 1, -1
+
+# Names of the per-position results returned by evaluate_batch
+FIELDS = ("winner", "terminal", "draw", "legal", "to_move", "reachable", "best_move", "value")
+
+
+def require_numpy():
+    """
+    Raises a helpful error if NumPy is not installed.
+
+    Raises:
+    -------
+    ImportError
+        If NumPy cannot be imported.
+    """
+    if np is None:
+        raise ImportError("batch evaluation requires NumPy (pip install numpy)")
+
+
+def classify(cells, entries):
+    """
+    Evaluates an array of boards with array operations only.
+
+    Winners come from one matrix product of the boards with the (8, 9) win-line
+    matrix; optimal play comes from indexing the opening book table with every
+    board's base-3 index.
+
+    Parameters:
+    -----------
+    cells : numpy.ndarray
+        An (N, 9) array with X = 1, O = -1 and empty = 0.
+    entries : numpy.ndarray
+        The opening book entries, in base-3 index order.
+
+    Returns:
+    --------
+    dict of numpy.ndarray
+        One array of length N per name in FIELDS (see evaluate_batch).
+    """
+    lines = np.zeros((len(WIN_CONDITIONS), 9), dtype=np.int16)
+    for row, line in enumerate(WIN_CONDITIONS):
+        lines[row, list(line)] = 1
+    cells = cells.astype(np.int16)
+    sums = cells @ lines.T  # (N, 8) line sums
+    x_won = (sums == 3 * X).any(axis=1)
+    o_won = (sums == 3 * O).any(axis=1)
+    empty = cells == EMPTY
+    full = ~empty.any(axis=1)
+    terminal = x_won | o_won | full
+
+    entry = entries[position_indices(cells)]
+    reachable = (entry & REACHABLE) != 0
+    lowest = np.array([(mask & -mask).bit_length() - 1 for mask in range(FULL_MASK + 1)], dtype=np.int8)
+    bits = (1 << np.arange(9)).astype(np.uint16)
+    return {
+        "winner": np.where(x_won, X, np.where(o_won, O, EMPTY)).astype(np.int8),
+        "terminal": terminal,
+        "draw": full & ~x_won & ~o_won,
+        "legal": np.where(terminal, 0, empty.astype(np.uint16) @ bits).astype(np.uint16),
+        "to_move": np.where(cells.sum(axis=1) > 0, O, X).astype(np.int8),
+        "reachable": reachable,
+        "best_move": lowest[entry & MOVES_MASK],
+        "value": np.where(reachable, (entry >> VALUE_SHIFT & 3).astype(np.int8) - 1, 0).astype(np.int8),
+    }
+
+
+@lru_cache(maxsize=None)
+def tables():
+    """
+    Evaluates all 3^9 boards once per process, so batches only need table lookups.
+
+    Returns:
+    --------
+    dict of numpy.ndarray
+        One array of length POSITIONS per name in FIELDS, in base-3 index order.
+
+    Raises:
+    -------
+    RuntimeError
+        If the opening book is unavailable.
+    """
+    require_numpy()
+    book = get_book()
+    if book is None:
+        raise RuntimeError("opening book unavailable, regenerate it with: python opening_book.py")
+    entries = np.frombuffer(book.entries(), dtype="<u2", count=POSITIONS)
+    digits = np.arange(POSITIONS)[:, None] // 3 ** np.arange(9) % 3  # Cell i of board n is digit i of n
+    return classify(np.where(digits == 2, O, digits).astype(np.int8), entries)
+
+
+def position_indices(boards):
+    """
+    Returns the base-3 index (' ' = 0, 'X' = 1, 'O' = 2, cell 0 least significant)
+    of every board, as used by the opening book.
+
+    Parameters:
+    -----------
+    boards : numpy.ndarray
+        An (N, 9) array with X = 1, O = -1 and empty = 0.
+
+    Returns:
+    --------
+    numpy.ndarray
+        The N indices as int32.
+    """
+    powers = (3 ** np.arange(9)).astype(np.float32)  # Indices stay below 2^24, exact in float32
+    signed = boards.astype(np.float32) @ powers
+    negative = (boards < 0).astype(np.float32) @ (3 * powers)  # Shifts O from -1 to 2
+    return (signed + negative).astype(np.int32)
+
+
+def to_array(boards):
+    """
+    Converts boards to the (N, 9) int8 array taken by evaluate_batch.
+
+    Parameters:
+    -----------
+    boards : iterable of BitBoard or list
+        Boards as BitBoards or lists of ' ', 'X' and 'O'.
+
+    Returns:
+    --------
+    numpy.ndarray
+        An (N, 9) int8 array with X = 1, O = -1 and empty = 0.
+    """
+    require_numpy()
+    codes = {"X": X, "O": O}
+    rows = [[codes.get(cell, EMPTY) for cell in board] for board in boards]
+    return np.array(rows, dtype=np.int8).reshape(-1, 9)
+
+
+def evaluate_batch(boards, fields=FIELDS):
+    """
+    Classifies and solves many positions at once.
+
+    Every board is mapped to its base-3 index with two matrix products, then each
+    requested result is gathered from a table holding it for all 3^9 boards. The
+    tables are built once per process by classify(), from the win-line matrix and
+    the opening book, so there is no per-position Python code at all.
+
+    Parameters:
+    -----------
+    boards : numpy.ndarray
+        An (N, 9) array with X = 1, O = -1 and empty = 0 (see to_array).
+    fields : iterable of str, optional
+        The results to compute (default is all of FIELDS).
+
+    Returns:
+    --------
+    dict of numpy.ndarray
+        Arrays of length N:
+        - winner: 1 if X has a line, -1 if O has, 0 otherwise
+        - terminal: True if the game is over (a line or a full board)
+        - draw: True if the board is full without a line
+        - legal: 9-bit mask of the empty cells, 0 for terminal positions
+        - to_move: 1 if X moves next, -1 if O does
+        - reachable: True if the position can arise in a legal game
+        - best_move: lowest-index optimal move, -1 if none (terminal or unreachable)
+        - value: game value for the player to move (1 win, 0 draw, -1 loss), 0 if unreachable
+
+    Raises:
+    -------
+    ValueError
+        If the array is not (N, 9) or holds values other than -1, 0 and 1.
+    RuntimeError
+        If the opening book is unavailable.
+    """
+    require_numpy()
+    boards = np.asarray(boards)
+    if boards.ndim != 2 or boards.shape[1] != 9:
+        raise ValueError(f"expected an (N, 9) array of boards, got shape {boards.shape}")
+    if boards.size and (boards.min() < O or boards.max() > X):
+        raise ValueError("board cells must be -1 (O), 0 (empty) or 1 (X)")
+    table = tables()
+    index = position_indices(boards)
+    return {field: table[field][index] for field in fields}
@@ -0,0 +1,284 @@
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from bitboard import BitBoard
+from game_logic import TicTacToeGame
+
+# Fixed corpus of positions, written row by row with '.' for an empty cell. Every
+# position has 'O' (the AI) to move, so all functions can be timed on every entry.
+CORPUS = (
+    ("empty", "........."),
+    *(("opening", "." * i + "X" + "." * (8 - i)) for i in range(9)),
+    ("midgame", "X...O...X"),
+    ("midgame", "XO..X...."),
+    ("midgame", ".X..O..X."),
+    ("midgame", "X.O.X...."),
+    ("near_terminal", "XOX.X.O.."),
+    ("near_terminal", "XXO.O.X.."),
+    ("near_terminal", "XOXXOO.X."),
+    ("near_terminal", "XOXOOX.X."),
+)
+CATEGORIES = ("empty", "opening", "midgame", "near_terminal")
+
+SEARCH_MODES = ("book", "solver", "alphabeta", "minimax")
+
+
+def parse_position(text):
+    """
+    Builds a BitBoard from a corpus entry.
+
+    Parameters:
+    -----------
+    text : str
+        Nine characters, 'X', 'O' or '.'.
+
+    Returns:
+    --------
+    BitBoard
+        The position.
+    """
+    return BitBoard.from_list([" " if cell == "." else cell for cell in text])
+
+
+def make_games(category):
+    """
+    Creates one game per corpus position of a category, with 'O' to move.
+
+    Parameters:
+    -----------
+    category : str
+        One of CATEGORIES.
+
+    Returns:
+    --------
+    list of TicTacToeGame
+        The games, in corpus order.
+    """
+    games = []
+    for name, text in CORPUS:
+        if name == category:
+            game = TicTacToeGame(ai_enabled=True)
+            game.board = parse_position(text)
+            game.current_player = "O"
+            games.append(game)
+    return games
+
+
+# Each benchmark maps a game to one call of the function under test. Searches
+# undo their moves, so the same games are reused for every call.
+BENCHMARKS = {
+    "check_winner": lambda game: game.check_winner("X") or game.check_winner("O"),
+    "board_full": lambda game: game.board_full(),
+    "minimax": lambda game: game.minimax(game.board, 0, True),
+    **{f"ai_move[{mode}]": (lambda mode: lambda game: game.ai_move(mode))(mode) for mode in SEARCH_MODES},
+}
+
+
+def bench_round(name, category):
+    """
+    Returns a callable that runs one benchmark once on every position of a category.
+
+    The callable suits a pytest-benchmark test as well, e.g.
+    ``benchmark(bench_round("minimax", "midgame"))``.
+
+    Parameters:
+    -----------
+    name : str
+        A key of BENCHMARKS.
+    category : str
+        One of CATEGORIES.
+
+    Returns:
+    --------
+    callable
+        A function without arguments returning the total nodes searched.
+    """
+    call = BENCHMARKS[name]
+    games = make_games(category)
+
+    def run():
+        nodes = 0
+        for game in games:
+            game.nodes_searched = 0
+            call(game)
+            nodes += game.nodes_searched
+        return nodes
+
+    run.positions = len(games)
+    return run
+
+
+def measure_allocations(run):
+    """
+    Measures the memory one round allocates, using tracemalloc.
+
+    Parameters:
+    -----------
+    run : callable
+        A round returned by bench_round.
+
+    Returns:
+    --------
+    tuple
+        (peak bytes allocated above the starting point, net blocks still allocated afterwards).
+    """
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+        tracemalloc.reset_peak()
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+        blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename")) - blocks
+    finally:
+        tracemalloc.stop()
+    return peak - before, blocks
+
+
+def run_benchmark(name, category, min_time=0.2):
+    """
+    Times one benchmark on one category of the corpus.
+
+    One untimed round warms caches (the solver's transposition table, the mapped
+    opening book), then the number of rounds doubles until a batch takes at least
+    min_time seconds.
+
+    Parameters:
+    -----------
+    name : str
+        A key of BENCHMARKS.
+    category : str
+        One of CATEGORIES.
+    min_time : float, optional
+        Minimum duration of the timed batch in seconds (default is 0.2).
+
+    Returns:
+    --------
+    dict
+        The result row: calls, seconds, calls_per_sec, us_per_call, nodes_per_call,
+        peak_alloc_bytes_per_call and alloc_blocks_per_call.
+    """
+    run = bench_round(name, category)
+    positions = run.positions
+    nodes = run()  # Warm-up round, also gives the node count
+    peak, blocks = measure_allocations(run)
+
+    rounds = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            run()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        rounds *= 2
+
+    calls = rounds * positions
+    return {
+        "benchmark": name,
+        "category": category,
+        "positions": positions,
+        "calls": calls,
+        "seconds": round(elapsed, 6),
+        "calls_per_sec": round(calls / elapsed, 1),
+        "us_per_call": round(elapsed / calls * 1e6, 3),
+        "nodes_per_call": round(nodes / positions, 1) if nodes else None,
+        "peak_alloc_bytes_per_call": round(peak / positions, 1),
+        "alloc_blocks_per_call": round(blocks / positions, 2),
+    }
+
+
+def environment():
+    """
+    Describes the machine and code a run was made on, so results can be compared.
+
+    Returns:
+    --------
+    dict
+        Python version, platform, time and git commit (None outside a checkout).
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": commit,
+    }
+
+
+def format_results(results, baseline=None):
+    """
+    Formats result rows as a table, with the speed-up against a baseline run if given.
+
+    Parameters:
+    -----------
+    results : list of dict
+        Rows returned by run_benchmark.
+    baseline : list of dict, optional
+        Rows of an earlier run to compare against.
+
+    Returns:
+    --------
+    str
+        The table.
+    """
+    previous = {(row["benchmark"], row["category"]): row for row in baseline or ()}
+    lines = [f"{'benchmark':<20} {'category':<14} {'calls/s':>12} {'us/call':>10} {'nodes/call':>11} "
+             f"{'peak B/call':>12} {'blocks/call':>12}" + ("   vs baseline" if baseline else "")]
+    for row in results:
+        nodes = "-" if row["nodes_per_call"] is None else f"{row['nodes_per_call']:.1f}"
+        line = (f"{row['benchmark']:<20} {row['category']:<14} {row['calls_per_sec']:>12.1f} "
+                f"{row['us_per_call']:>10.3f} {nodes:>11} {row['peak_alloc_bytes_per_call']:>12.1f} "
+                f"{row['alloc_blocks_per_call']:>12.2f}")
+        old = previous.get((row["benchmark"], row["category"]))
+        if old is not None:
+            line += f"   {row['calls_per_sec'] / old['calls_per_sec']:.2f}x"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main():
+    """
+    Runs the benchmark suite from the command line.
+    """
+    parser = argparse.ArgumentParser(description="Microbenchmarks for the game_logic hot paths")
+    parser.add_argument("-k", "--filter", default="", help="only run benchmarks whose name contains this text")
+    parser.add_argument("--category", choices=CATEGORIES, action="append",
+                        help="corpus category to run (repeatable, default: all)")
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimum seconds per timed batch")
+    parser.add_argument("--json", metavar="PATH", help="write machine-readable results to PATH")
+    parser.add_argument("--compare", metavar="PATH", help="compare against results written earlier with --json")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+
+    results = []
+    for name in BENCHMARKS:
+        if args.filter not in name:
+            continue
+        for category in args.category or CATEGORIES:
+            results.append(run_benchmark(name, category, args.min_time))
+            print(format_results(results[-1:], baseline).splitlines()[-1], file=sys.stderr)
+
+    print(format_results(results, baseline))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"environment": environment(), "results": results}, f, indent=2)
+        print(f"Wrote {len(results)} results to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
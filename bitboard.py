@@ -0,0 +1,250 @@
+EMPTY = " "  # Mark used for a free cell in the list view
+FULL_MASK = 0x1FF  # All 9 cells set
+
+# Winning lines (rows, columns, diagonals) as cell indices and as bit masks
+WIN_CONDITIONS = ((0, 1, 2), (3, 4, 5), (6, 7, 8),
+                  (0, 3, 6), (1, 4, 7), (2, 5, 8),
+                  (0, 4, 8), (2, 4, 6))
+LINE_MASKS = tuple(sum(1 << i for i in line) for line in WIN_CONDITIONS)
+
+# WIN_TABLE[bits] is 1 if the 9-bit mask contains a complete line, so a win check is one lookup
+WIN_TABLE = bytes(int(any(bits & mask == mask for mask in LINE_MASKS)) for bits in range(FULL_MASK + 1))
+
+
+def is_win(bits):
+    """
+    Checks whether a 9-bit mask of one player's marks contains a complete line.
+
+    Parameters:
+    -----------
+    bits : int
+        The mask of cells owned by a single player.
+
+    Returns:
+    --------
+    bool
+        True if the mask contains a winning line, False otherwise.
+    """
+    return WIN_TABLE[bits] == 1
+
+
+def iter_moves(free):
+    """
+    Yields the indices of the set bits of a free-cell mask in ascending order.
+
+    Parameters:
+    -----------
+    free : int
+        The mask of empty cells.
+
+    Yields:
+    -------
+    int
+        The index of each empty cell.
+    """
+    while free:
+        low = free & -free  # Isolate the lowest set bit
+        yield low.bit_length() - 1
+        free ^= low
+
+
+class BitBoard:
+    """
+    A compact 3x3 board stored as two 9-bit integers, one per mark.
+
+    Bit i of a mask corresponds to cell i (row * 3 + col). Indexing, iteration and
+    assignment behave like the original list of 9 one-character strings, so code
+    that treats the board as a list keeps working.
+
+    Attributes:
+    -----------
+    x : int
+        The mask of cells occupied by 'X'.
+    o : int
+        The mask of cells occupied by 'O'.
+    """
+
+    __slots__ = ("x", "o")
+
+    def __init__(self, x=0, o=0):
+        """
+        Initializes the board from the two player masks (empty by default).
+
+        Parameters:
+        -----------
+        x : int, optional
+            The mask of cells occupied by 'X' (default is 0).
+        o : int, optional
+            The mask of cells occupied by 'O' (default is 0).
+        """
+        self.x = x
+        self.o = o
+
+    @classmethod
+    def from_list(cls, cells):
+        """
+        Builds a board from a sequence of 9 marks ('X', 'O' or ' ').
+
+        Parameters:
+        -----------
+        cells : sequence
+            The marks of the 9 cells in index order.
+
+        Returns:
+        --------
+        BitBoard
+            The equivalent bitboard.
+        """
+        board = cls()
+        for i, mark in enumerate(cells):
+            if mark != EMPTY:
+                board.place(i, mark)
+        return board
+
+    def bits(self, mark):
+        """
+        Returns the mask of cells owned by the given mark.
+
+        Parameters:
+        -----------
+        mark : str
+            The mark ('X' or 'O').
+
+        Returns:
+        --------
+        int
+            The 9-bit mask for that mark.
+        """
+        return self.x if mark == "X" else self.o
+
+    def free_mask(self):
+        """
+        Returns the mask of empty cells.
+        """
+        return FULL_MASK & ~(self.x | self.o)
+
+    def moves(self):
+        """
+        Yields the indices of all empty cells in ascending order.
+        """
+        return iter_moves(self.free_mask())
+
+    def is_free(self, idx):
+        """
+        Checks whether the cell at the given index is empty.
+
+        Parameters:
+        -----------
+        idx : int
+            The cell index (0-8).
+
+        Returns:
+        --------
+        bool
+            True if the cell is empty, False otherwise.
+        """
+        return not (self.x | self.o) >> idx & 1
+
+    def place(self, idx, mark):
+        """
+        Places a mark on a cell without checking whether it is free.
+
+        Parameters:
+        -----------
+        idx : int
+            The cell index (0-8).
+        mark : str
+            The mark ('X' or 'O') to place.
+        """
+        if mark == "X":
+            self.x |= 1 << idx
+        else:
+            self.o |= 1 << idx
+
+    def clear(self, idx):
+        """
+        Removes any mark from the cell at the given index.
+
+        Parameters:
+        -----------
+        idx : int
+            The cell index (0-8).
+        """
+        keep = ~(1 << idx)
+        self.x &= keep
+        self.o &= keep
+
+    def has_won(self, mark):
+        """
+        Checks whether the given mark has a complete line.
+
+        Parameters:
+        -----------
+        mark : str
+            The mark ('X' or 'O') to check.
+
+        Returns:
+        --------
+        bool
+            True if the mark has won, False otherwise.
+        """
+        return WIN_TABLE[self.x if mark == "X" else self.o] == 1
+
+    def is_full(self):
+        """
+        Checks whether every cell is occupied.
+        """
+        return self.x | self.o == FULL_MASK
+
+    def reset(self):
+        """
+        Clears every cell.
+        """
+        self.x = 0
+        self.o = 0
+
+    def copy(self):
+        """
+        Returns an independent copy of the board.
+        """
+        return BitBoard(self.x, self.o)
+
+    def __getitem__(self, idx):
+        if not 0 <= idx < 9:
+            raise IndexError("board index out of range")
+        if self.x >> idx & 1:
+            return "X"
+        if self.o >> idx & 1:
+            return "O"
+        return EMPTY
+
+    def __setitem__(self, idx, mark):
+        if not 0 <= idx < 9:
+            raise IndexError("board index out of range")
+        self.clear(idx)
+        if mark != EMPTY:
+            self.place(idx, mark)
+
+    def __len__(self):
+        return 9
+
+    def __iter__(self):
+        return (self[i] for i in range(9))
+
+    def __contains__(self, mark):
+        if mark == EMPTY:
+            return self.free_mask() != 0
+        return self.bits(mark) != 0 if mark in ("X", "O") else False
+
+    def __eq__(self, other):
+        if isinstance(other, BitBoard):
+            return self.x == other.x and self.o == other.o
+        try:
+            return list(self) == list(other)
+        except TypeError:
+            return NotImplemented
+
+    __hash__ = None  # Mutable, like the list it replaces
+
+    def __repr__(self):
+        return repr(list(self))
@@ -0,0 +1,133 @@
+import tkinter as tk
+
+from sprites import CELL_SIZE, EMPTY, get_sprite
+
+CELL_GAP = 4  # Pixels between cells, where the canvas background shows as grid lines
+BOARD_COLOR = "silver"
+
+
+class CanvasBoard(tk.Canvas):
+    """
+    A board of any size drawn on one Canvas, with one image item per cell.
+
+    The board remembers what each cell shows and only reconfigures the cells whose
+    mark changed, so a move costs one item update however big the board is. Clicks
+    are mapped to a cell with integer arithmetic instead of one widget per cell.
+
+    Attributes:
+    -----------
+    size : int
+        The number of rows and columns.
+    cell_size : tuple
+        (width, height) of a cell in pixels.
+    on_click : callable or None
+        Called with the index of a clicked cell while the board is enabled.
+    enabled : bool
+        False to ignore clicks.
+    """
+
+    def __init__(self, master, size=3, cell_size=CELL_SIZE, on_click=None, **kwargs):
+        """
+        Creates the board with every cell empty.
+
+        Parameters:
+        -----------
+        master : tk.Misc
+            The parent widget.
+        size : int, optional
+            The number of rows and columns (default is 3).
+        cell_size : tuple, optional
+            (width, height) of a cell in pixels (default is CELL_SIZE).
+        on_click : callable, optional
+            Called with the index of a clicked cell.
+        **kwargs
+            Further Canvas options.
+        """
+        self.size = size
+        self.cell_size = tuple(cell_size)
+        self._pitch = (self.cell_size[0] + CELL_GAP, self.cell_size[1] + CELL_GAP)  # Cell plus grid line
+        width = size * self._pitch[0] - CELL_GAP
+        height = size * self._pitch[1] - CELL_GAP
+        kwargs.setdefault("bg", BOARD_COLOR)
+        kwargs.setdefault("highlightthickness", 0)
+        tk.Canvas.__init__(self, master, width=width, height=height, **kwargs)
+
+        self.on_click = on_click
+        self.enabled = True
+        # The board's own references keep the shared sprites alive while they are shown
+        self._sprites = {mark: get_sprite(mark, self.cell_size) for mark in ('X', 'O', EMPTY)}
+        self._shown = [' '] * (size * size)  # Mark each cell currently displays
+        self._items = [
+            self.create_image(col * self._pitch[0], row * self._pitch[1], image=self._sprites[EMPTY], anchor="nw")
+            for row in range(size) for col in range(size)
+        ]
+        self.bind("<Button-1>", self._click)
+
+    def cell_at(self, x, y):
+        """
+        Returns the cell under a point of the canvas.
+
+        Parameters:
+        -----------
+        x, y : int
+            Canvas coordinates.
+
+        Returns:
+        --------
+        int or None
+            The cell index, or None for a point on a grid line or off the board.
+        """
+        col, dx = divmod(int(x), self._pitch[0])
+        row, dy = divmod(int(y), self._pitch[1])
+        if not (0 <= col < self.size and 0 <= row < self.size) or dx >= self.cell_size[0] or dy >= self.cell_size[1]:
+            return None
+        return row * self.size + col
+
+    def _click(self, event):
+        """
+        Passes a click on a cell to on_click.
+        """
+        if not self.enabled or self.on_click is None:
+            return
+        index = self.cell_at(self.canvasx(event.x), self.canvasy(event.y))
+        if index is not None:
+            self.on_click(index)
+
+    def set_cell(self, index, mark):
+        """
+        Shows a mark in one cell, touching the canvas only if the cell changes.
+
+        Parameters:
+        -----------
+        index : int
+            The cell index.
+        mark : str
+            'X', 'O', or ' ' for an empty cell.
+        """
+        if self._shown[index] != mark:
+            self._shown[index] = mark
+            self.itemconfigure(self._items[index], image=self._sprites.get(mark, self._sprites[EMPTY]))
+
+    def render(self, board):
+        """
+        Shows a board state, redrawing only the cells that differ from what is shown.
+
+        Parameters:
+        -----------
+        board : sequence
+            The mark of every cell ('X', 'O' or ' '), such as a list or a BitBoard.
+        """
+        shown = self._shown
+        for index in range(len(shown)):
+            mark = board[index]
+            if mark != shown[index]:
+                self.set_cell(index, mark)
+
+    def clear(self):
+        """
+        Empties every cell and enables the board.
+        """
+        for index, mark in enumerate(self._shown):
+            if mark != ' ':
+                self.set_cell(index, ' ')
+        self.enabled = True
@@ -0,0 +1,224 @@
+import logging
+import socket
+import threading
+import time
+from framing import FrameReader, encode_disconnect, encode_frame
+from outbox import ThreadedOutbox
+from protocol import (HELLO_MESSAGE, OP_DISCONNECT, OP_ERROR, OP_HELLO, OP_MOVE, OP_REDIRECT, OP_ROLE, OP_SESSION,
+                      OP_SNAPSHOT, PROTOCOL_VERSION, encode_binary, parse_message)
+
+CONNECT_TIMEOUT = 5.0  # Seconds to wait for a connection attempt to succeed
+RESUME_WINDOW = 30.0  # Seconds to keep trying to resume a dropped game (the server's grace period)
+RECONNECT_DELAY = 1.0  # Seconds between reconnect attempts
+CLOSE_LINGER = 2.0  # Seconds to let the disconnect notice go out before the socket is closed
+
+logger = logging.getLogger(__name__)
+
+# Connection events posted alongside the parsed (opcode, fields) server messages
+EVENT_CONNECTED = "CONNECTED"  # Fields: none
+EVENT_FAILED = "FAILED"  # Fields: the OSError that stopped the connection attempt
+EVENT_CLOSED = "CLOSED"  # Fields: none; the server went away and the game could not be resumed
+
+
+class ClientConnection:
+    """Client side of a game connection, run entirely on background threads.
+
+    A reader thread connects, receives and parses frames, and puts every event on
+    a thread-safe queue for the UI thread to handle; sends go through a
+    ThreadedOutbox. No method called from the UI thread ever waits on the
+    network. Protocol negotiation, redirects to the matchmaking worker and
+    session resume are handled here, so the UI
+    only sees the resulting messages (HELLO, SNAPSHOT, ...).
+
+    Attributes:
+        addr: The (host, port) of the server.
+        events: Queue receiving (opcode, fields) tuples and EVENT_* tuples.
+        binary: True once the server has accepted the binary protocol.
+        session: Session token for resuming the game, or None.
+    """
+
+    def __init__(self, addr, events, connect_timeout=CONNECT_TIMEOUT):
+        """Create the connection without connecting yet.
+
+        Args:
+            addr: The (host, port) of the server.
+            events: Queue receiving the connection's events.
+            connect_timeout: Seconds to wait for each connection attempt.
+        """
+        self.addr = addr
+        self.events = events
+        self.connect_timeout = connect_timeout
+        self.binary = False
+        self.session = None
+        self._closing = False
+        self._sock = None
+        self._outbox = None
+        self._lock = threading.Lock()  # Guards the socket and outbox, which are replaced on resume
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        """Start connecting in the background."""
+        self._thread.start()
+
+    def send(self, data):
+        """Queue encoded frames without blocking; dropped if not connected."""
+        with self._lock:
+            outbox = None if self._closing else self._outbox
+        if outbox is not None:
+            outbox.send(data)
+
+    def send_move(self, mark, index):
+        """Queue a move in the negotiated protocol.
+
+        Args:
+            mark: The player's mark.
+            index: The board index of the move.
+        """
+        if self.binary:
+            self.send(encode_binary(OP_MOVE, mark, index))
+        else:
+            self.send(encode_frame(f"{mark}:{index // 3}:{index % 3}"))
+
+    def close(self):
+        """Send the disconnect notice and close the connection in the background."""
+        with self._lock:
+            if self._closing:
+                return
+            self._closing = True
+            sock, outbox = self._sock, self._outbox
+        if outbox is None:
+            return  # Still connecting; the reader thread closes the socket once it exists
+        outbox.send(encode_binary(OP_DISCONNECT) if self.binary else encode_disconnect())
+        outbox.close()
+        threading.Thread(target=self._finish, args=(sock, outbox), daemon=True).start()
+
+    def _finish(self, sock, outbox):
+        """Close the socket once the outbox has flushed, waking the reader thread."""
+        outbox.join(CLOSE_LINGER)
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        sock.close()
+
+    def _abort(self):
+        """Drop the current socket without a disconnect notice."""
+        with self._lock:
+            outbox, self._outbox = self._outbox, None
+        if outbox is not None:
+            outbox.abort()
+            outbox.conn.close()
+
+    def _open(self, addr):
+        """Connect to a server, giving up after connect_timeout.
+
+        Returns:
+            FrameReader: A reader for the new connection, which is now the current one.
+        """
+        sock = socket.create_connection(addr, timeout=self.connect_timeout)
+        sock.settimeout(None)
+        with self._lock:
+            if self._closing:
+                sock.close()
+                raise ConnectionAbortedError("connection closed while connecting")
+            old = self._outbox
+            self._sock, self._outbox = sock, ThreadedOutbox(sock)
+            self.binary = False
+        if old is not None:
+            old.abort()
+        return FrameReader(sock)
+
+    def _hello(self):
+        """Offer the binary protocol; servers that do not support it ignore this."""
+        self.send(encode_frame(f"{HELLO_MESSAGE}:{PROTOCOL_VERSION}"))
+
+    def _run(self):
+        """Reader thread: connect, then turn every received frame into an event."""
+        try:
+            reader = self._open(self.addr)
+        except OSError as e:
+            if not self._closing:
+                self.events.put((EVENT_FAILED, (e,)))
+            return
+        self.events.put((EVENT_CONNECTED, ()))
+        self.send(encode_frame("REMATCH"))  # Ask for a match, so a sharded server may route us; others ignore it
+
+        offered = False
+        while True:
+            try:
+                msg = reader.read_frame()
+                op, fields = parse_message(msg) if msg is not None else (None, None)
+            except (OSError, ValueError):
+                msg = None
+            if msg is None:
+                if self._closing:
+                    return
+                reader = self._resume()
+                if reader is None:
+                    self._abort()
+                    self.events.put((EVENT_CLOSED, ()))
+                    return
+                continue
+
+            if op == OP_REDIRECT:
+                # Another worker does the matchmaking; ask it for a match instead
+                try:
+                    reader = self._open((self.addr[0], fields[0]))
+                except OSError as e:
+                    if not self._closing:
+                        self.events.put((EVENT_FAILED, (e,)))
+                    return
+                self.send(encode_frame("REMATCH"))
+                continue
+            if op == OP_HELLO:
+                self.binary = fields[0] == PROTOCOL_VERSION
+            elif op == OP_ROLE:
+                self.session = None  # A new seat comes with its own session
+                if not offered:
+                    self._hello()
+                    offered = True
+            elif op == OP_SESSION:
+                self.session = fields[0]
+                continue  # Nothing for the UI to do
+            self.events.put((op, fields))
+
+    def _resume(self):
+        """Reconnect after the connection dropped and take the player's seat back.
+
+        The server answers RESUME with one SNAPSHOT of the board and turn, which
+        is passed on to the UI, or with a redirect to the worker owning the room.
+
+        Returns:
+            FrameReader: The reader of the resumed connection, or None if the game
+                could not be resumed.
+        """
+        if self.session is None:
+            return None  # Never seated, nothing to resume
+        addr = self.addr
+        deadline = time.monotonic() + RESUME_WINDOW
+        while time.monotonic() < deadline and not self._closing:
+            try:
+                reader = self._open(addr)
+                self.send(encode_frame(f"RESUME:{self.session}"))
+                while True:
+                    msg = reader.read_frame()
+                    if msg is None:
+                        time.sleep(RECONNECT_DELAY)
+                        break
+                    op, fields = parse_message(msg)
+                    if op == OP_SNAPSHOT:
+                        self._hello()
+                        self.events.put((op, fields))
+                        logger.info("Resumed the game after a dropped connection")
+                        return reader
+                    if op == OP_REDIRECT:
+                        addr = (addr[0], fields[0])  # The room lives on another worker
+                        break
+                    if op == OP_ERROR:
+                        self.session = None  # The seat was given up
+                        return None
+                    # Anything else (such as a role from the public port) is not for us
+            except (OSError, ValueError) as e:
+                logger.info("Reconnect failed: %s", e)
+                time.sleep(RECONNECT_DELAY)
+        return None
@@ -0,0 +1,184 @@
+from collections import deque
+
+# Constants shared by the server and the client
+HEADER = 64  # Fixed size of the space-padded ASCII length header
+FORMAT = 'utf-8'  # Format for encoding/decoding messages
+DISCONNECT_MESSAGE = "D"  # Sent in place of a length header when a client disconnects
+MAX_FRAME_SIZE = 4096  # Largest text payload accepted; every protocol message is far smaller
+
+# Binary frames start with a single length byte below BINARY_LIMIT. A text header always
+# starts with a digit, 'D' or a space, all at or above 0x20, so each frame can be told
+# apart by its first byte and both framings can share one connection.
+BINARY_LIMIT = 0x20
+
+
+def encode_frame(message):
+    """Encode a message with its space-padded length header as one buffer.
+
+    Joining the header and payload lets the caller send a frame with a single
+    system call, so it also leaves in a single TCP segment.
+
+    Args:
+        message: The message string to encode.
+
+    Returns:
+        bytes: The header followed by the encoded message.
+    """
+    payload = message.encode(FORMAT)
+    send_length = str(len(payload)).encode(FORMAT)
+    return send_length + b' ' * (HEADER - len(send_length)) + payload
+
+
+def encode_disconnect():
+    """Return the disconnect notice, padded to a full header.
+
+    Older servers read exactly HEADER bytes and strip them, so the padded form is
+    understood by every server version.
+    """
+    return DISCONNECT_MESSAGE.encode(FORMAT).ljust(HEADER)
+
+
+def encode_binary_frame(payload):
+    """Prefix a binary payload with its one-byte length.
+
+    Args:
+        payload: The payload bytes, at most BINARY_LIMIT - 1 long.
+
+    Returns:
+        bytes: The length byte followed by the payload.
+
+    Raises:
+        ValueError: If the payload is too long for a binary frame.
+    """
+    if len(payload) >= BINARY_LIMIT:
+        raise ValueError(f"binary payload too long: {len(payload)} bytes")
+    return bytes((len(payload),)) + payload
+
+
+def send_frame(sock, message):
+    """Send one length-prefixed message over a blocking socket in a single call.
+
+    Args:
+        sock: The connected socket.
+        message: The message string to send.
+    """
+    sock.sendall(encode_frame(message))
+
+
+class FrameDecoder:
+    """Incremental decoder for the length-prefixed stream.
+
+    Bytes can be fed in chunks of any size: partial frames are kept in the buffer
+    until the rest arrives, and chunks holding several coalesced frames yield all
+    of them at once. Text frames are decoded to strings and binary frames are
+    returned as their raw payload bytes.
+    """
+
+    def __init__(self):
+        """Create a decoder with an empty buffer."""
+        self._buffer = bytearray()
+
+    def feed(self, data):
+        """Add received bytes and return every message they complete.
+
+        Args:
+            data: The received bytes (bytes, bytearray or memoryview).
+
+        Returns:
+            list: The decoded messages in order: strings for text frames, bytes for
+                binary frames. A disconnect notice is returned as DISCONNECT_MESSAGE.
+
+        Raises:
+            ValueError: If a header is not a valid length, or announces a negative
+                length or one above MAX_FRAME_SIZE. The caller should close the
+                connection, as the stream can no longer be framed.
+        """
+        buffer = self._buffer
+        buffer += data
+        messages = []
+        pos, end = 0, len(buffer)
+        while pos < end:
+            first = buffer[pos]
+            if first < BINARY_LIMIT:
+                if end - pos <= first:
+                    break  # Wait for the rest of the binary frame
+                if first:
+                    messages.append(bytes(buffer[pos + 1:pos + 1 + first]))
+                pos += 1 + first
+                continue
+            if end - pos < HEADER:
+                break  # Wait for the rest of the text header
+            header = buffer[pos:pos + HEADER].decode(FORMAT).strip()
+            if header == DISCONNECT_MESSAGE:
+                messages.append(DISCONNECT_MESSAGE)
+                pos += HEADER
+                continue
+            if not header:
+                pos += HEADER  # Blank header, nothing to read
+                continue
+            length = int(header)
+            if not 0 <= length <= MAX_FRAME_SIZE:
+                raise ValueError(f"frame length out of range: {length}")  # Never buffer for it
+            if end - pos - HEADER < length:
+                break  # Wait for the rest of the payload
+            start = pos + HEADER
+            messages.append(buffer[start:start + length].decode(FORMAT))
+            pos = start + length
+        if pos:
+            del buffer[:pos]  # Drop consumed bytes in one go
+        return messages
+
+    def close(self):
+        """Signal end of stream and return any final disconnect notice.
+
+        Legacy clients send a bare "D" without padding right before closing, which
+        only shows up as leftover bytes at end of stream.
+
+        Returns:
+            str: DISCONNECT_MESSAGE if the stream ended with a disconnect notice,
+                otherwise None.
+        """
+        leftover = self._buffer.decode(FORMAT, errors='replace').strip()
+        self._buffer.clear()
+        return DISCONNECT_MESSAGE if leftover == DISCONNECT_MESSAGE else None
+
+
+class FrameReader:
+    """Buffered reader of length-prefixed messages from a blocking socket.
+
+    Data is received into one preallocated buffer with recv_into, so a single
+    system call can deliver several frames and no frame is lost or split when
+    the network delivers partial reads.
+
+    Attributes:
+        sock: The connected socket.
+        decoder: The incremental frame decoder.
+    """
+
+    def __init__(self, sock, bufsize=65536):
+        """Create a reader for a socket.
+
+        Args:
+            sock: The connected socket.
+            bufsize: Size of the receive buffer in bytes.
+        """
+        self.sock = sock
+        self.decoder = FrameDecoder()
+        self._pending = deque()
+        self._chunk = bytearray(bufsize)
+        self._view = memoryview(self._chunk)
+
+    def read_frame(self):
+        """Block until the next complete message is available.
+
+        Returns:
+            str or bytes: The next message (bytes for a binary frame),
+                DISCONNECT_MESSAGE for a disconnect notice, or None once the peer
+                has closed the connection.
+        """
+        while not self._pending:
+            received = self.sock.recv_into(self._chunk)
+            if not received:
+                return self.decoder.close()
+            self._pending.extend(self.decoder.feed(self._view[:received]))
+        return self._pending.popleft()
@@ -0,0 +1,316 @@
+import mmap
+import os
+import struct
+import threading
+import time
+
+MAGIC = b"TTTG"  # File signature
+VERSION = 1
+HEADER_FORMAT = "<4sHH"  # Magic, version, reserved
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+# Record layout: size of the whole record, result, move count, start time (epoch
+# seconds), duration (ms), then both player names (length-prefixed UTF-8) and the
+# moves packed two 4-bit cell indices per byte, first move in the low nibble
+RECORD_FORMAT = "<HBBdI"
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+MAX_CELLS = 16  # 4-bit cell indices cover boards of up to 4x4
+MAX_NAME = 255
+
+RESULT_DRAW = 0
+RESULT_X = 1
+RESULT_O = 2
+RESULT_CODES = {None: RESULT_DRAW, "X": RESULT_X, "O": RESULT_O}
+RESULT_MARKS = (None, "X", "O")
+
+
+def pack_moves(moves):
+    """
+    Packs cell indices two per byte.
+
+    Parameters:
+    -----------
+    moves : list of int
+        Cell indices, each below MAX_CELLS.
+
+    Returns:
+    --------
+    bytes
+        ceil(len(moves) / 2) bytes, first move in the low nibble.
+    """
+    packed = bytearray((len(moves) + 1) // 2)
+    for i, move in enumerate(moves):
+        packed[i >> 1] |= move << (i & 1) * 4
+    return bytes(packed)
+
+
+def unpack_moves(data, count):
+    """
+    Unpacks cell indices packed by pack_moves.
+
+    Parameters:
+    -----------
+    data : bytes-like
+        The packed moves.
+    count : int
+        The number of moves.
+
+    Returns:
+    --------
+    list of int
+        The cell indices.
+    """
+    return [data[i >> 1] >> (i & 1) * 4 & 0x0F for i in range(count)]
+
+
+class GameRecord:
+    """
+    One finished game read from a log.
+
+    Attributes:
+    -----------
+    x, o : str
+        Names of the players of X and O.
+    moves : list of int
+        The cell indices played, in order, starting with X.
+    winner : str or None
+        'X', 'O', or None for a draw.
+    started : float
+        Start time in seconds since the epoch.
+    duration : float
+        Length of the game in seconds.
+    """
+
+    __slots__ = ("x", "o", "moves", "winner", "started", "duration")
+
+    def __init__(self, x, o, moves, winner, started, duration):
+        self.x = x
+        self.o = o
+        self.moves = moves
+        self.winner = winner
+        self.started = started
+        self.duration = duration
+
+    def __repr__(self):
+        return (f"GameRecord(x={self.x!r}, o={self.o!r}, moves={self.moves!r}, winner={self.winner!r}, "
+                f"started={self.started!r}, duration={self.duration!r})")
+
+
+def encode_record(x, o, moves, winner, started, ended):
+    """
+    Encodes one game as a log record.
+
+    Parameters:
+    -----------
+    x, o : str
+        Names of the players of X and O (truncated to 255 bytes of UTF-8).
+    moves : list of int
+        The cell indices played, in order.
+    winner : str or None
+        'X', 'O', or None for a draw.
+    started, ended : float
+        Start and end time in seconds since the epoch.
+
+    Returns:
+    --------
+    bytes
+        The record.
+
+    Raises:
+    -------
+    ValueError
+        If a move does not fit in 4 bits or there are more than 255 moves.
+    """
+    if len(moves) > 255 or any(not 0 <= move < MAX_CELLS for move in moves):
+        raise ValueError("game logs hold up to 255 moves on boards of at most 16 cells")
+    names = b"".join(bytes((len(name),)) + name for name in (x.encode()[:MAX_NAME], o.encode()[:MAX_NAME]))
+    body = names + pack_moves(moves)
+    duration = max(0, min(round((ended - started) * 1000), 0xFFFFFFFF))
+    return struct.pack(RECORD_FORMAT, RECORD_SIZE + len(body), RESULT_CODES[winner], len(moves), started,
+                       duration) + body
+
+
+class GameLogWriter:
+    """
+    Appends game records to a log file through a write buffer.
+
+    Records are only encoded and copied into the buffer on the caller's thread; the
+    file sees one write per buffer-full, so logging costs a few microseconds per game.
+    Writing is thread-safe. A crash can lose at most the buffered records; a record
+    cut short at the end of the file is ignored by the reader and cut off when the
+    log is next opened for writing, so new records never follow it.
+
+    Attributes:
+    -----------
+    path : str
+        The path of the log file.
+    """
+
+    def __init__(self, path, buffer_size=1 << 16):
+        """
+        Opens the log for appending, writing the file header if the file is new and
+        truncating a record left incomplete by a crash.
+
+        Parameters:
+        -----------
+        path : str
+            The path of the log file.
+        buffer_size : int, optional
+            Bytes buffered before they are written (default is 64 KiB).
+
+        Raises:
+        -------
+        ValueError
+            If the file exists but is not a game log of a supported version.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "ab", buffering=buffer_size)
+        if self._file.tell() == 0:
+            self._file.write(struct.pack(HEADER_FORMAT, MAGIC, VERSION, 0))
+        else:
+            check_header(path)
+            end = complete_length(path)
+            if end < self._file.tell():
+                self._file.truncate(end)  # Appending after the torn record would hide every later one
+
+    def write(self, x, o, moves, winner, started, ended=None):
+        """
+        Appends one finished game.
+
+        Parameters:
+        -----------
+        x, o : str
+            Names of the players of X and O.
+        moves : list of int
+            The cell indices played, in order.
+        winner : str or None
+            'X', 'O', or None for a draw.
+        started : float
+            Start time in seconds since the epoch.
+        ended : float, optional
+            End time in seconds since the epoch (default is now).
+        """
+        record = encode_record(x, o, moves, winner, started, time.time() if ended is None else ended)
+        with self._lock:
+            self._file.write(record)
+
+    def flush(self):
+        """
+        Writes the buffered records to the file.
+        """
+        with self._lock:
+            self._file.flush()
+
+    def close(self):
+        """
+        Flushes and closes the log.
+        """
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def check_header(path):
+    """
+    Checks that a file starts with a supported game log header.
+
+    Raises:
+    -------
+    ValueError
+        If it does not.
+    """
+    with open(path, "rb") as log_file:
+        header = log_file.read(HEADER_SIZE)
+    if len(header) < HEADER_SIZE or struct.unpack(HEADER_FORMAT, header)[:2] != (MAGIC, VERSION):
+        raise ValueError(f"{path} is not a version {VERSION} game log")
+
+
+def complete_length(path):
+    """
+    Returns the length of the part of a log made of whole records.
+
+    Parameters:
+    -----------
+    path : str
+        The path of the log file, which must start with a valid header.
+
+    Returns:
+    --------
+    int
+        The offset just past the last complete record; anything after it is a
+        record cut short by a crash while writing.
+    """
+    end = os.path.getsize(path)
+    if end == HEADER_SIZE:
+        return end
+    with open(path, "rb") as log_file:
+        log_map = mmap.mmap(log_file.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        offset = HEADER_SIZE
+        while offset + RECORD_SIZE <= end:
+            size = struct.unpack_from("<H", log_map, offset)[0]  # Leading size field of the record
+            if size < RECORD_SIZE or offset + size > end:
+                break
+            offset += size
+        return offset
+    finally:
+        log_map.close()
+
+
+def read_games(path):
+    """
+    Lazily iterates over the games in a log.
+
+    The file is memory-mapped and decoded one record per step, so only the records
+    being looked at are ever paged in and memory use does not grow with the file.
+
+    Parameters:
+    -----------
+    path : str
+        The path of the log file.
+
+    Yields:
+    -------
+    GameRecord
+        The games in the order they were written.
+
+    Raises:
+    -------
+    ValueError
+        If the file is not a game log of a supported version.
+    """
+    check_header(path)
+    if os.path.getsize(path) == HEADER_SIZE:
+        return  # No games yet, and empty mappings are not allowed
+    with open(path, "rb") as log_file:
+        log_map = mmap.mmap(log_file.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        offset, end = HEADER_SIZE, len(log_map)
+        while offset + RECORD_SIZE <= end:
+            size, result, count, started, duration = struct.unpack_from(RECORD_FORMAT, log_map, offset)
+            if size < RECORD_SIZE or offset + size > end:
+                break  # Record cut short by a crash while writing
+            pos = offset + RECORD_SIZE
+            names = []
+            for _ in range(2):
+                length = log_map[pos]
+                names.append(log_map[pos + 1:pos + 1 + length].decode(errors="replace"))
+                pos += 1 + length
+            moves = unpack_moves(log_map[pos:offset + size], count)
+            offset += size
+            yield GameRecord(names[0], names[1], moves, RESULT_MARKS[result], started, duration / 1000)
+    finally:
+        log_map.close()
+
+
+if __name__ == "__main__":
+    import sys
+
+    for game in read_games(sys.argv[1]):
+        print(game)
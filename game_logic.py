@@ -1,20 +1,43 @@
+import logging
+import time
+
+from bitboard import BitBoard, WIN_TABLE
+from mnk_engine import SearchTimeout
+from opening_book import get_book
+from solver import SOLVER
+
+logger = logging.getLogger(__name__)
+
+
 class TicTacToeGame:
     """
     A class representing a Tic-Tac-Toe game, supporting both AI and player moves.
     
     Attributes:
     -----------
-    board : list
-        Represents the 3x3 Tic-Tac-Toe board as a list of 9 spaces.
+    board : BitBoard
+        Represents the 3x3 Tic-Tac-Toe board as two 9-bit masks, viewable as a list of 9 marks.
     current_player : str
         The current player, either 'X' or 'O'.
     ai_enabled : bool
         Flag to indicate whether AI is enabled for single-player mode.
     game_over : bool
         Flag to indicate if the game is over.
+    solver : TicTacToeSolver
+        The cached solver used to pick AI moves, shared by all games by default.
+    nodes_searched : int
+        Number of positions visited by the last uncached search (minimax or alphabeta).
     """
 
-    def __init__(self, ai_enabled=False):
+    # Move ordering for the alpha-beta search: centre, then corners, then edges
+    MOVE_ORDER = (4, 0, 2, 6, 8, 1, 3, 5, 7)
+
+    # Score of a win at depth 0; deeper wins score lower so faster wins are preferred
+    WIN_SCORE = 10
+
+    CHECK_INTERVAL = 64  # Nodes between deadline and stop checks in the uncached searches
+
+    def __init__(self, ai_enabled=False, solver=SOLVER):
         """
         Initializes the TicTacToeGame class, setting up the board, player, and AI flag.
         
@@ -22,11 +45,17 @@ class TicTacToeGame:
         -----------
         ai_enabled : bool, optional
             If True, AI will be enabled to play against the user (default is False).
+        solver : TicTacToeSolver, optional
+            The solver used for AI moves (default is the process-wide shared solver).
         """
-        self.board = [" " for _ in range(9)]  # Initialize the empty board with 9 spaces
+        self.board = BitBoard()  # Initialize the empty board (one 9-bit mask per mark)
         self.current_player = "X"  # X starts first by default
         self.ai_enabled = ai_enabled  # Enable or disable AI
         self.game_over = False  # Track if the game has ended
+        self.solver = solver  # Transposition-table solver shared across games
+        self.nodes_searched = 0  # Node counter for the last uncached search
+        self._deadline = None  # time.monotonic() at which the running search gives up, or None
+        self._stop = None  # threading.Event that stops the running search when set, or None
 
     def check_winner(self, mark):
         """
@@ -42,15 +71,7 @@ class TicTacToeGame:
         bool
             True if the player has won, False otherwise.
         """
-        # Define the winning conditions (rows, columns, diagonals)
-        win_conditions = [(0, 1, 2), (3, 4, 5), (6, 7, 8),
-                          (0, 3, 6), (1, 4, 7), (2, 5, 8),
-                          (0, 4, 8), (2, 4, 6)]
-        # Check each condition
-        for condition in win_conditions:
-            if self.board[condition[0]] == self.board[condition[1]] == self.board[condition[2]] == mark:
-                return True
-        return False
+        return self.board.has_won(mark)  # Single table lookup on the mark's bitmask
 
     def board_full(self):
         """
@@ -61,7 +82,20 @@ class TicTacToeGame:
         bool
             True if the board is full, False otherwise.
         """
-        return " " not in self.board
+        return self.board.is_full()
+
+    def check_stop(self):
+        """
+        Stops the running search once its deadline has passed or it has been told to stop.
+
+        Raises:
+        -------
+        SearchTimeout
+            If the search should stop.
+        """
+        if ((self._deadline is not None and time.monotonic() > self._deadline)
+                or (self._stop is not None and self._stop.is_set())):
+            raise SearchTimeout()
 
     def minimax(self, board, depth, is_maximizing, max_depth=50):
         """
@@ -69,7 +103,7 @@ class TicTacToeGame:
         
         Parameters:
         -----------
-        board : list
+        board : BitBoard
             The current game board state.
         depth : int
             The current depth of the recursion (used to limit search).
@@ -83,6 +117,10 @@ class TicTacToeGame:
         int
             The score for the current game state (1 for AI win, -1 for player win, 0 for draw).
         """
+        self.nodes_searched += 1  # Count this position
+        if self.nodes_searched % self.CHECK_INTERVAL == 0:
+            self.check_stop()
+
         # Check if AI ('O') wins
         if self.check_winner("O"):
             return 1  # AI wins
@@ -98,44 +136,191 @@ class TicTacToeGame:
         # Maximizing player's (AI's) turn
         if is_maximizing:
             best_score = -float('inf')
-            for i in range(9):
-                if board[i] == " ":
-                    board[i] = "O"  # Simulate AI move
-                    score = self.minimax(board, depth + 1, False, max_depth)
-                    board[i] = " "  # Undo move (backtrack)
-                    best_score = max(score, best_score)  # Get best score
+            for i in board.moves():
+                board.place(i, "O")  # Simulate AI move
+                score = self.minimax(board, depth + 1, False, max_depth)
+                board.clear(i)  # Undo move (backtrack)
+                best_score = max(score, best_score)  # Get best score
             return best_score
 
         # Minimizing player's (opponent's) turn
         else:
             best_score = float('inf')
-            for i in range(9):
-                if board[i] == " ":
-                    board[i] = "X"  # Simulate player move
-                    score = self.minimax(board, depth + 1, True, max_depth)
-                    board[i] = " "  # Undo move (backtrack)
-                    best_score = min(score, best_score)  # Get best score
+            for i in board.moves():
+                board.place(i, "X")  # Simulate player move
+                score = self.minimax(board, depth + 1, True, max_depth)
+                board.clear(i)  # Undo move (backtrack)
+                best_score = min(score, best_score)  # Get best score
+            return best_score
+
+    def ordered_moves(self, board, mark):
+        """
+        Returns the empty cells in the order the alpha-beta search should try them:
+        winning moves first, then moves that block the opponent, then centre, corners
+        and edges.
+        
+        Parameters:
+        -----------
+        board : BitBoard
+            The current game board state.
+        mark : str
+            The mark ('X' or 'O') of the player to move.
+        
+        Returns:
+        --------
+        list
+            The indices of the empty cells, best candidates first.
+        """
+        mine = board.bits(mark)
+        theirs = board.bits("O" if mark == "X" else "X")
+        free = board.free_mask()
+        wins, blocks, others = [], [], []
+        for i in self.MOVE_ORDER:
+            bit = 1 << i
+            if not free & bit:
+                continue  # Cell already taken
+            if WIN_TABLE[mine | bit]:
+                wins.append(i)  # Completes one of our lines
+            elif WIN_TABLE[theirs | bit]:
+                blocks.append(i)  # Stops the opponent completing a line
+            else:
+                others.append(i)
+        return wins + blocks + others
+
+    def alphabeta(self, board, depth, alpha, beta, is_maximizing, max_depth=50):
+        """
+        Minimax search with alpha-beta pruning, move ordering and depth-adjusted scores.
+        
+        Parameters:
+        -----------
+        board : BitBoard
+            The current game board state.
+        depth : int
+            The current depth of the recursion.
+        alpha : float
+            The best score the maximizing player (AI) is already assured of.
+        beta : float
+            The best score the minimizing player (opponent) is already assured of.
+        is_maximizing : bool
+            True if it's the AI's turn, False if it's the opponent's turn.
+        max_depth : int, optional
+            Maximum depth of recursion, scored as a draw when reached (default is 50).
+        
+        Returns:
+        --------
+        int
+            WIN_SCORE - depth for an AI win, depth - WIN_SCORE for a player win, 0 for a draw,
+            so quicker wins and slower losses score better for the AI.
+        """
+        self.nodes_searched += 1  # Count this position
+        if self.nodes_searched % self.CHECK_INTERVAL == 0:
+            self.check_stop()
+
+        if board.has_won("O"):
+            return self.WIN_SCORE - depth  # AI wins, the sooner the better
+        if board.has_won("X"):
+            return depth - self.WIN_SCORE  # Player wins, the later the better
+        if board.is_full() or depth == max_depth:
+            return 0  # Draw
+
+        if is_maximizing:
+            best_score = -float('inf')
+            for i in self.ordered_moves(board, "O"):
+                board.place(i, "O")  # Simulate AI move
+                score = self.alphabeta(board, depth + 1, alpha, beta, False, max_depth)
+                board.clear(i)  # Undo move (backtrack)
+                best_score = max(score, best_score)
+                alpha = max(alpha, best_score)
+                if alpha >= beta:
+                    break  # The opponent will never allow this line
+            return best_score
+        else:
+            best_score = float('inf')
+            for i in self.ordered_moves(board, "X"):
+                board.place(i, "X")  # Simulate player move
+                score = self.alphabeta(board, depth + 1, alpha, beta, True, max_depth)
+                board.clear(i)  # Undo move (backtrack)
+                best_score = min(score, best_score)
+                beta = min(beta, best_score)
+                if alpha >= beta:
+                    break  # The AI will never allow this line
             return best_score
 
-    def ai_move(self):
+    def ai_move(self, search="book", deadline=None, stop=None):
         """
-        Determines the best move for the AI by applying the Minimax algorithm to each possible move.
+        Determines the best move for the AI.
+        
+        By default the move is read from the memory-mapped opening book, which stores the
+        optimal moves of every reachable position. If the book is missing, or the position
+        is not in it, the cached solver is used instead: positions are keyed by their
+        canonical form under the 8 board symmetries, so each one is searched at most once
+        per process and repeated replies are a single lookup. The uncached searches are
+        kept for comparison and record the number of positions they visit in
+        ``nodes_searched``. They check the deadline and the stop event every
+        CHECK_INTERVAL positions and then play the best move found so far.
+        
+        Parameters:
+        -----------
+        search : str, optional
+            'book' for the opening book, 'solver' for the cached solver, 'alphabeta' for
+            alpha-beta search with move ordering, or 'minimax' for a full Minimax search
+            (default is 'book').
+        deadline : float, optional
+            time.monotonic() at which an uncached search stops (default is no limit).
+        stop : threading.Event, optional
+            Stops an uncached search when set (default is None).
         
         Returns:
         --------
         int
             The index of the best move for the AI on the board.
+
+        Raises:
+        -------
+        SearchTimeout
+            If the search was stopped before it had scored a single move.
         """
+        if search == "book":
+            book = get_book()
+            move = book.best_move(self.board, "O") if book is not None else None
+            if move is not None:
+                return move
+            search = "solver"  # Fall back to the solver outside the book
+
+        if search == "solver":
+            return self.solver.best_move(self.board, "O")
+
+        self.nodes_searched = 0
+        self._deadline, self._stop = deadline, stop
+        x, o = self.board.x, self.board.o
         best_score = -float('inf')
         best_move = None
-        for i in range(9):
-            if self.board[i] == " ":
-                self.board[i] = "O"  # Simulate AI move
-                score = self.minimax(self.board, 0, False, max_depth=9)
-                self.board[i] = " "  # Undo move
-                if score > best_score:
-                    best_score = score
-                    best_move = i
+        try:
+            if search == "alphabeta":
+                for i in self.ordered_moves(self.board, "O"):
+                    self.board.place(i, "O")  # Simulate AI move
+                    score = self.alphabeta(self.board, 1, best_score, float('inf'), False, max_depth=10)
+                    self.board.clear(i)  # Undo move
+                    if score > best_score:
+                        best_score = score
+                        best_move = i
+            elif search == "minimax":
+                for i in self.board.moves():
+                    self.board.place(i, "O")  # Simulate AI move
+                    score = self.minimax(self.board, 0, False, max_depth=9)
+                    self.board.clear(i)  # Undo move
+                    if score > best_score:
+                        best_score = score
+                        best_move = i
+            else:
+                raise ValueError(f"Unknown search mode: {search}")
+        except SearchTimeout:
+            self.board.x, self.board.o = x, o  # Take back the moves the search left on the board
+            if best_move is None:
+                raise
+            logger.debug("Search stopped after %d positions, playing the best move so far", self.nodes_searched)
+        finally:
+            self._deadline = self._stop = None
         return best_move
 
     def make_move(self, idx):
@@ -152,8 +337,8 @@ class TicTacToeGame:
         bool
             True if the move was valid and successful, False if the spot was already taken.
         """
-        if self.board[idx] == " ":
-            self.board[idx] = self.current_player  # Place the mark
+        if self.board.is_free(idx):
+            self.board.place(idx, self.current_player)  # Place the mark
             return True
         return False
 
@@ -162,13 +347,13 @@ class TicTacToeGame:
         Switches the turn between player 'X' and player 'O'.
         """
         self.current_player = "O" if self.current_player == "X" else "X"
-        print("Switched to player:", self.current_player)
+        logger.debug("Switched to player %s", self.current_player)
 
     def reset_game(self):
         """
         Resets the game to its initial state, clearing the board and resetting the turn to player 'X'.
         """
-        self.board = [" " for _ in range(9)]  # Clear the board
+        self.board.reset()  # Clear the board
         self.current_player = "X"  # Reset the player to 'X'
         self.game_over = False  # Reset game over status
-        print("Game reset. Player:", self.current_player)
+        logger.debug("Game reset, player %s to move", self.current_player)
@@ -1,6 +1,257 @@
+import os
+import time
 import tkinter as tk
+from collections import OrderedDict
 from PIL import Image, ImageTk
 
+FRAME_DELAY = 100  # Milliseconds a frame is shown when the GIF gives no usable duration
+MIN_FRAME_DELAY = 20  # Shorter durations are treated as missing, as browsers do
+MAX_FPS = 30  # Default cap on animation updates per second
+REDUCED_MOTION = os.environ.get("TICTACTOE_REDUCED_MOTION", "") not in ("", "0")  # Show first frames only
+MAX_CACHED_GIFS = 4  # Decoded GIFs kept before the least recently used is dropped
+
+# Decoded frames shared by every GIFLabel, keyed by (absolute path, target size), least recently used first
+_frame_cache = OrderedDict()
+_clock = None  # The application's AnimationClock, created by the first animated widget
+
+
+class GIFFrames:
+    """
+    The frames of one GIF at one size, decoded lazily and shared by every label showing it.
+
+    Only the first frame is decoded up front; every other frame is decoded the first
+    time it is shown, so building a screen never waits for the whole file and each
+    frame is decoded at most once per process.
+
+    Attributes:
+    -----------
+    filename : str
+        The file path of the GIF.
+    size : tuple or None
+        (width, height) the frames are scaled to, or None for the GIF's own size.
+    count : int
+        The number of frames.
+    """
+
+    def __init__(self, filename, size=None):
+        """
+        Opens the GIF and decodes its first frame.
+
+        Parameters:
+        -----------
+        filename : str
+            The file path of the GIF.
+        size : tuple, optional
+            (width, height) to scale the frames to (default is the GIF's own size).
+        """
+        self.filename = filename
+        self.size = size
+        self._image = Image.open(filename)
+        self.count = getattr(self._image, "n_frames", 1)
+        self._frames = [None] * self.count  # PhotoImage per frame, None until decoded
+        self._delays = [None] * self.count  # Frame durations in seconds, None until read
+        self._decoded = 0
+        self.frame(0)
+
+    def _seek(self, index):
+        """
+        Moves the GIF to a frame and records the frame's duration.
+        """
+        self._image.seek(index)
+        duration = self._image.info.get("duration") or 0
+        self._delays[index] = (duration if duration >= MIN_FRAME_DELAY else FRAME_DELAY) / 1000
+
+    def delay(self, index):
+        """
+        Returns how long a frame is shown, as given by the GIF.
+
+        Parameters:
+        -----------
+        index : int
+            The frame index.
+
+        Returns:
+        --------
+        float
+            The frame's duration in seconds.
+        """
+        if self._delays[index] is None:
+            self._seek(index)  # Reads the frame header only, without converting the frame
+        return self._delays[index]
+
+    def frame(self, index):
+        """
+        Returns a frame, decoding it on first use.
+
+        Parameters:
+        -----------
+        index : int
+            The frame index.
+
+        Returns:
+        --------
+        ImageTk.PhotoImage
+            The frame, scaled to the target size.
+        """
+        photo = self._frames[index]
+        if photo is None:
+            self._seek(index)
+            frame = self._image.convert("RGBA")  # Copy with the palette applied
+            if self.size is not None and frame.size != self.size:
+                frame = frame.resize(self.size, resample=Image.BILINEAR)
+            photo = self._frames[index] = ImageTk.PhotoImage(frame)
+            self._decoded += 1
+            if self._decoded == self.count:
+                self._image.close()  # Everything decoded, the file is no longer needed
+        return photo
+
+
+def get_frames(filename, size=None):
+    """
+    Returns the shared frames of a GIF at a size, opening it on first use.
+
+    At most MAX_CACHED_GIFS sets of frames are kept; labels already showing an
+    evicted set keep their own reference to it.
+
+    Parameters:
+    -----------
+    filename : str
+        The file path of the GIF.
+    size : tuple, optional
+        (width, height) to scale the frames to (default is the GIF's own size).
+
+    Returns:
+    --------
+    GIFFrames
+        The cached frames.
+    """
+    key = (os.path.abspath(filename), size)
+    frames = _frame_cache.get(key)
+    if frames is not None:
+        _frame_cache.move_to_end(key)
+        return frames
+    frames = _frame_cache[key] = GIFFrames(filename, size)
+    if len(_frame_cache) > MAX_CACHED_GIFS:
+        _frame_cache.popitem(last=False)  # Evict the least recently used GIF
+    return frames
+
+
+class AnimationClock:
+    """
+    Drives every animated widget of an application from a single after() timer.
+
+    Each tick advances the widgets whose current frame has run its course and sleeps
+    until the next one is due, but never ticks faster than the frame-rate cap. Hidden
+    widgets are paused and destroyed ones dropped; once nothing visible is animating
+    the timer stops altogether, and a widget being shown again wakes it up.
+
+    Attributes:
+    -----------
+    root : tk.Misc
+        The widget whose after() timer is used.
+    max_fps : float
+        Maximum number of ticks per second.
+    reduced_motion : bool
+        True to freeze every animation on its current frame.
+    animations : list
+        The registered widgets, each with advance(now), pause() and winfo_* methods.
+    """
+
+    def __init__(self, root, max_fps=MAX_FPS, reduced_motion=REDUCED_MOTION):
+        """
+        Creates an idle clock.
+
+        Parameters:
+        -----------
+        root : tk.Misc
+            The widget whose after() timer is used.
+        max_fps : float, optional
+            Maximum number of ticks per second (default is MAX_FPS).
+        reduced_motion : bool, optional
+            True to freeze animations (default is $TICTACTOE_REDUCED_MOTION).
+        """
+        self.root = root
+        self.max_fps = max_fps
+        self.reduced_motion = reduced_motion
+        self.animations = []
+        self._job = None
+
+    def add(self, animation):
+        """
+        Starts driving a widget.
+        """
+        self.animations.append(animation)
+        self.wake()
+
+    def remove(self, animation):
+        """
+        Stops driving a widget.
+        """
+        if animation in self.animations:
+            self.animations.remove(animation)
+
+    def set_reduced_motion(self, enabled):
+        """
+        Freezes or resumes every animation.
+
+        Parameters:
+        -----------
+        enabled : bool
+            True to freeze animations on their current frame.
+        """
+        self.reduced_motion = enabled
+        if not enabled:
+            self.wake()
+
+    def wake(self):
+        """
+        Ticks as soon as possible if the timer is stopped.
+        """
+        if self._job is None and not self.reduced_motion:
+            self._job = self.root.after_idle(self._tick)
+
+    def _tick(self):
+        """
+        Advances the widgets that are due and schedules the next tick.
+        """
+        self._job = None
+        if self.reduced_motion:
+            return
+        now = time.monotonic()
+        next_due = None
+        for animation in list(self.animations):
+            if not animation.winfo_exists():
+                self.animations.remove(animation)
+            elif not animation.winfo_ismapped():
+                animation.pause()  # Hidden: no frames and no wake-ups until it is shown again
+            else:
+                due = animation.advance(now)
+                next_due = due if next_due is None else min(next_due, due)
+        if next_due is not None:
+            delay = max(next_due - now, 1 / self.max_fps)
+            self._job = self.root.after(max(1, round(delay * 1000)), self._tick)
+
+
+def get_clock(widget):
+    """
+    Returns the application's animation clock, creating it on first use.
+
+    Parameters:
+    -----------
+    widget : tk.Misc
+        Any widget of the application.
+
+    Returns:
+    --------
+    AnimationClock
+        The shared clock.
+    """
+    global _clock
+    if _clock is None or not _clock.root.winfo_exists():
+        _clock = AnimationClock(widget.winfo_toplevel())
+    return _clock
+
+
 class GIFLabel(tk.Label):
     """
     A custom Tkinter Label widget for displaying and animating GIF images.
@@ -11,19 +262,19 @@ class GIFLabel(tk.Label):
         The parent widget where the GIFLabel is placed.
     filename : str
         The file path of the GIF to be displayed.
-    image : PIL.Image.Image
-        The main image object opened from the GIF file.
-    frames : list
-        A list that holds individual frames of the GIF as PhotoImage objects.
+    frames : GIFFrames
+        The shared, lazily decoded frames of the GIF.
     index : int
         The current frame index in the GIF animation.
-    delay : int
-        The time delay between frames, in milliseconds.
+    due : float or None
+        Time (time.monotonic()) the next frame is due, or None while paused.
+    clock : AnimationClock
+        The clock driving the animation.
     """
 
-    def __init__(self, master, filename):
+    def __init__(self, master, filename, size=None, clock=None):
         """
-        Initializes the GIFLabel widget, extracts frames from the GIF, and starts the animation.
+        Initializes the GIFLabel widget, shows the GIF's first frame, and registers it with the animation clock.
 
         Parameters:
         -----------
@@ -31,63 +282,69 @@ class GIFLabel(tk.Label):
             The parent widget that will contain the GIFLabel.
         filename : str
             The file path of the GIF to be loaded and displayed.
+        size : tuple, optional
+            (width, height) to scale the GIF to (default is the size of the master
+            once it is on screen, else the GIF's own size).
+        clock : AnimationClock, optional
+            The clock to animate with (default is the application's shared clock).
         """
         # Initialize the parent tk.Label class
         tk.Label.__init__(self, master)
-        
+
         # Store the filename for future reference
         self.filename = filename
-        
-        # Open the GIF file using PIL
-        self.image = Image.open(filename)
-        
-        # Initialize an empty list to store the frames
-        self.frames = []
-        
-        try:
-            # Extract each frame from the GIF file
-            for i in range(self.image.n_frames):
-                # Seek to the current frame in the GIF
-                self.image.seek(i)
-                
-                # Copy the current frame to avoid referencing issues
-                frame = self.image.copy()
-                
-                # Convert the frame to a PhotoImage object that Tkinter can handle
-                photo = ImageTk.PhotoImage(frame)
-                
-                # Append the PhotoImage object (frame) to the frames list
-                self.frames.append(photo)
-        except EOFError:
-            # If an EOFError occurs, it means no more frames are available, so ignore it
-            pass
-        
-        # Set the current frame index to the first frame
+
+        # Scale to the window the label will fill, so every screen shares one set of frames
+        if size is None and master.winfo_ismapped():
+            size = (master.winfo_width(), master.winfo_height())
+        self.frames = get_frames(filename, size)
+
+        # Show the first frame; its duration starts counting once the label is on screen
         self.index = 0
-        
-        # Set the delay between frames (in milliseconds)
-        self.delay = 100
-        
-        # Start the animation loop by calling the update method
-        self.update()
-
-    def update(self):
-        """
-        Updates the displayed image to the next frame in the animation, looping back to the start
-        after the last frame. This method is called recursively with a delay.
-        """
-        # Get the current frame using the frame index
-        frame = self.frames[self.index]
-        
-        # Update the label's image to the current frame
-        self.config(image=frame)
-        
-        # Move to the next frame
-        self.index += 1
-        
-        # If the index exceeds the number of frames, reset to the first frame
-        if self.index == len(self.frames):
-            self.index = 0
-        
-        # Schedule the next frame update after the specified delay (in milliseconds)
-        self.after(self.delay, self.update)
+        self.due = None
+        self.config(image=self.frames.frame(0))
+
+        # Let the shared clock animate the label, and wake it whenever the label is shown again
+        self.clock = clock or get_clock(self)
+        self.clock.add(self)
+        self.bind("<Map>", lambda event: self.clock.wake(), add="+")
+
+    def advance(self, now):
+        """
+        Shows the frame that should be on screen at a given time.
+
+        Frames whose time has fully passed (after a slow tick or under the frame-rate
+        cap) are skipped, so the animation keeps the GIF's own pace.
+
+        Parameters:
+        -----------
+        now : float
+            The current time.monotonic().
+
+        Returns:
+        --------
+        float
+            The time the next frame is due.
+        """
+        if self.due is None:
+            self.due = now + self.frames.delay(self.index)  # Just shown: the current frame runs in full
+            return self.due
+        if now >= self.due:
+            while now >= self.due:
+                self.index = (self.index + 1) % self.frames.count
+                self.due += self.frames.delay(self.index)
+            self.config(image=self.frames.frame(self.index))
+        return self.due
+
+    def pause(self):
+        """
+        Stops the animation on its current frame until advance() is called again.
+        """
+        self.due = None
+
+    def destroy(self):
+        """
+        Unregisters the label from the clock and destroys the widget; the shared frames stay cached.
+        """
+        self.clock.remove(self)
+        tk.Label.destroy(self)
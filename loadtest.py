@@ -0,0 +1,494 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from bitboard import FULL_MASK, is_win
+from framing import FrameDecoder, encode_disconnect, encode_frame
+from protocol import (ERR_RATE_LIMITED, HELLO_MESSAGE, OP_DISCONNECT, OP_DRAW, OP_ERROR, OP_HELLO, OP_MOVE,
+                      OP_REDIRECT, OP_RESET_BOARD, OP_ROLE, OP_ROOM, OP_WINNER, PROTOCOL_VERSION, encode_binary,
+                      parse_message)
+from Server import PORT
+from validation import MESSAGE_RATE
+
+try:
+    import resource  # Unix only, used to raise the open file limit for thousands of sockets
+except ImportError:
+    resource = None
+
+DEFAULT_HOST = "127.0.0.1"  # Load tests run against a local server
+SERVER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Server.py")
+PACE_FRACTION = 0.9  # Default bot pace as a fraction of the server's message limit
+
+
+class LoadStats:
+    """Measurements collected by all bots of one run.
+
+    Attributes:
+        connect_times: Seconds from starting each connection to receiving its role.
+        round_trips: Seconds from sending each move to receiving its MOVE echo.
+        moves: Number of moves confirmed by the server.
+        games: Number of finished games (win or draw).
+        errors: Number of ERROR replies received, including rate limiting.
+        throttled: Number of moves the server rate-limited.
+        seated: Number of bots seated in a room.
+        failures: Number of bots that could not connect.
+    """
+
+    def __init__(self):
+        """Create empty statistics."""
+        self.connect_times = []
+        self.round_trips = []
+        self.moves = 0
+        self.games = 0
+        self.errors = 0
+        self.throttled = 0
+        self.seated = 0
+        self.failures = 0
+
+
+class Bot:
+    """Headless player that speaks the game protocol and plays random legal moves.
+
+    The bot keeps its own copy of the board from the MOVE messages it receives and
+    only moves on its turn, once every message of a read has been applied, so it
+    never moves into a finished game. It starts playing once the server announces
+    its room with ROOM, which only the async server does: the threaded server hosts
+    a single game and is not supported. A paced bot waits at least 1 / pace seconds
+    between its moves, so it stays under the server's rate limit.
+
+    Attributes:
+        host: The server address.
+        port: The server port.
+        binary: True to negotiate the binary protocol.
+        stats: The shared statistics.
+        pace: Maximum moves per second, or 0 for as fast as the game allows.
+        player: The bot's mark, once assigned.
+    """
+
+    def __init__(self, host, port, binary, stats, rng, pace=0.0):
+        """Create a bot.
+
+        Args:
+            host: The server address.
+            port: The server port.
+            binary: True to negotiate the binary protocol.
+            stats: The shared statistics.
+            rng: Random number generator used to pick moves.
+            pace: Maximum moves per second, or 0 for as fast as the game allows.
+        """
+        self.host = host
+        self.port = port
+        self.binary = binary
+        self.stats = stats
+        self.rng = rng
+        self.pace = pace
+        self.player = None
+        self.seated = False
+        self.acked = False  # True once the server talks binary to us
+        self.x = 0
+        self.o = 0
+        self.sent_at = None  # When the unconfirmed move was sent
+        self.next_move_at = 0.0  # Earliest time the pace allows the next move
+        self.held = False  # True while a paced move is scheduled
+
+    async def connect(self, limit):
+        """Open the connection, following a redirect to the matchmaking worker, and wait for the role.
+
+        Args:
+            limit: Semaphore bounding how many connections are set up at once.
+
+        Returns:
+            tuple: The (reader, writer, decoder) of the connection, or None on failure.
+        """
+        async with limit:
+            start = time.perf_counter()
+            try:
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+            except OSError:
+                self.stats.failures += 1
+                return None
+            writer.write(encode_frame("REMATCH"))  # Ask for a match right away instead of after the server's wait
+            decoder = FrameDecoder()
+            pending = []
+            while self.player is None:
+                try:
+                    data = await reader.read(65536)
+                except ConnectionError:
+                    data = b""
+                if not data:
+                    self.stats.failures += 1
+                    return None
+                for msg in decoder.feed(data):
+                    if self.player is None:
+                        op, fields = parse_message(msg)
+                        if op == OP_ROLE:
+                            self.player = fields[0]
+                        elif op == OP_REDIRECT:
+                            # Another worker does the matchmaking; ask it for a match instead
+                            writer.close()
+                            try:
+                                reader, writer = await asyncio.open_connection(self.host, fields[0])
+                            except OSError:
+                                self.stats.failures += 1
+                                return None
+                            writer.write(encode_frame("REMATCH"))
+                            decoder = FrameDecoder()
+                            break
+                        continue
+                    pending.append(msg)
+            self.stats.connect_times.append(time.perf_counter() - start)
+        if self.binary:
+            writer.write(encode_frame(f"{HELLO_MESSAGE}:{PROTOCOL_VERSION}"))
+        self.handle(pending, writer)
+        return reader, writer, decoder
+
+    async def run(self, limit, stop_at):
+        """Connect, then play until stop_at.
+
+        Args:
+            limit: Semaphore bounding how many connections are set up at once.
+            stop_at: perf_counter() time at which to disconnect.
+        """
+        try:
+            connection = await asyncio.wait_for(self.connect(limit), max(0.0, stop_at - time.perf_counter()))
+        except asyncio.TimeoutError:
+            self.stats.failures += 1  # Never given a role, as by a server that is already full
+            return
+        if connection is None:
+            return
+        reader, writer, decoder = connection
+        try:
+            while True:
+                remaining = stop_at - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    data = await asyncio.wait_for(reader.read(65536), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if not data:
+                    return
+                if not self.handle(decoder.feed(data), writer):
+                    return
+            writer.write(encode_binary(OP_DISCONNECT) if self.acked else encode_disconnect())
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def handle(self, messages, writer):
+        """Apply received messages, then move if it is the bot's turn.
+
+        Args:
+            messages: Messages from the frame decoder.
+            writer: The connection's stream writer.
+
+        Returns:
+            bool: False once the server has told the bot to disconnect.
+        """
+        for msg in messages:
+            op, fields = parse_message(msg)
+            if op == OP_MOVE:
+                mark, index = fields
+                if mark == 'X':
+                    self.x |= 1 << index
+                else:
+                    self.o |= 1 << index
+                if mark == self.player and self.sent_at is not None:
+                    self.stats.round_trips.append(time.perf_counter() - self.sent_at)
+                    self.stats.moves += 1
+                    self.sent_at = None
+            elif op == OP_RESET_BOARD:
+                self.x = self.o = 0
+            elif op == OP_WINNER or op == OP_DRAW:
+                if self.player == 'X':
+                    self.stats.games += 1  # Counted once per room
+            elif op == OP_ROOM:
+                if not self.seated:
+                    self.seated = True
+                    self.stats.seated += 1
+            elif op == OP_ROLE:
+                self.player = fields[0]
+                self.x = self.o = 0
+            elif op == OP_HELLO:
+                self.acked = fields[0] == PROTOCOL_VERSION
+            elif op == OP_ERROR:
+                self.stats.errors += 1
+                self.sent_at = None
+                if fields[0] == ERR_RATE_LIMITED:
+                    # Back off for one token's worth of time instead of hammering the limiter
+                    self.stats.throttled += 1
+                    self.sent_at = time.perf_counter()
+                    asyncio.get_running_loop().call_later(1 / MESSAGE_RATE, self.retry, writer)
+            elif op == OP_DISCONNECT:
+                return False
+        self.maybe_move(writer)
+        return True
+
+    def retry(self, writer):
+        """Move again after backing off from the rate limiter.
+
+        Args:
+            writer: The connection's stream writer.
+        """
+        self.sent_at = None
+        if not writer.is_closing():
+            self.maybe_move(writer)
+
+    def resume(self, writer):
+        """Move once the pace allows it.
+
+        Args:
+            writer: The connection's stream writer.
+        """
+        self.held = False
+        if not writer.is_closing():
+            self.maybe_move(writer)
+
+    def maybe_move(self, writer):
+        """Send a random legal move if it is the bot's turn.
+
+        Args:
+            writer: The connection's stream writer.
+        """
+        if not self.seated or self.sent_at is not None or self.held:
+            return
+        x, o = self.x, self.o
+        if is_win(x) or is_win(o):
+            return  # Waiting for the reset that follows the result
+        taken = x | o
+        if taken == FULL_MASK:
+            return
+        moved = bin(taken).count("1")
+        if (moved % 2 == 0) != (self.player == 'X'):
+            return  # Opponent's turn
+        now = time.perf_counter()
+        if now < self.next_move_at:
+            self.held = True
+            asyncio.get_running_loop().call_later(self.next_move_at - now, self.resume, writer)
+            return
+        index = self.rng.choice([i for i in range(9) if not taken >> i & 1])
+        if self.acked:
+            writer.write(encode_binary(OP_MOVE, self.player, index))
+        else:
+            writer.write(encode_frame(f"{self.player}:{index // 3}:{index % 3}"))
+        self.sent_at = now
+        if self.pace:
+            self.next_move_at = now + 1 / self.pace
+
+
+def percentile(values, fraction):
+    """Return the value below which the given fraction of the values fall.
+
+    Args:
+        values: Sorted list of values.
+        fraction: Fraction between 0 and 1.
+
+    Returns:
+        float: The nearest-rank percentile, or None for an empty list.
+    """
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def process_rss_kb(pid):
+    """Return the resident memory of a process and all of its children, in KiB.
+
+    Args:
+        pid: The process id.
+
+    Returns:
+        int: The summed VmRSS, or None where /proc is not available.
+    """
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            rss = next(int(line.split()[1]) for line in status if line.startswith("VmRSS:"))
+        with open(f"/proc/{pid}/task/{pid}/children") as children:
+            child_pids = children.read().split()
+    except (OSError, StopIteration):
+        return None
+    return rss + sum(process_rss_kb(int(child)) or 0 for child in child_pids)
+
+
+def raise_file_limit():
+    """Raise the soft open file limit to the hard limit, where supported."""
+    if resource is None:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+def spawn_server(host, port, workers, message_rate=0.0):
+    """Start an async server in a subprocess and wait until it accepts connections.
+
+    Args:
+        host: The address to listen on.
+        port: The port to listen on.
+        workers: Number of worker processes.
+        message_rate: Messages per second each client may send, or 0 for no limit.
+
+    Returns:
+        subprocess.Popen: The server process.
+    """
+    process = subprocess.Popen([sys.executable, SERVER_SCRIPT, "--mode", "async", "--host", host,
+                                "--port", str(port), "--workers", str(workers),
+                                "--message-rate", str(message_rate)],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection((host, port), timeout=1).close()
+            time.sleep(0.2)  # Let the probe connection be torn down again
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f"server did not start on {host}:{port}")
+
+
+async def run_load(host, port, bots, duration, binary=False, concurrency=256, seed=0, server_pid=None,
+                   pace=0.0, server_rate=None):
+    """Run a load test against a running server.
+
+    Args:
+        host: The server address.
+        port: The server port.
+        bots: Number of simulated players (pairs of them share a room).
+        duration: Seconds to play once every bot has been started.
+        binary: True to negotiate the binary protocol.
+        concurrency: Maximum number of connections being set up at once.
+        seed: Seed for the bots' move choices.
+        server_pid: Server process id for memory measurements, or None.
+        pace: Maximum moves per second of each bot, or 0 for unpaced bots.
+        server_rate: The server's message limit for the report: messages per second,
+            0 for no limit, or None if unknown.
+
+    Returns:
+        dict: The report (see format_report for the fields).
+    """
+    stats = LoadStats()
+    rng = random.Random(seed)
+    limit = asyncio.Semaphore(concurrency)
+    baseline = process_rss_kb(server_pid) if server_pid else None
+
+    start = time.perf_counter()
+    stop_at = start + duration
+    tasks = [asyncio.create_task(Bot(host, port, binary, stats, random.Random(rng.random()), pace).run(limit, stop_at))
+             for _ in range(bots)]
+    # Sample memory once the rooms exist, while the bots are still playing
+    while len(stats.connect_times) + stats.failures < bots and time.perf_counter() < stop_at:
+        await asyncio.sleep(0.05)
+    await asyncio.sleep(min(0.5, max(0.0, stop_at - time.perf_counter())))
+    loaded = process_rss_kb(server_pid) if server_pid else None
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+
+    round_trips = sorted(stats.round_trips)
+    connect_times = sorted(stats.connect_times)
+    rooms = stats.seated // 2
+    to_ms = lambda value: None if value is None else round(value * 1000, 3)
+    return {
+        "bots": bots,
+        "connected": len(connect_times),
+        "failed": stats.failures,
+        "rooms": rooms,
+        "protocol": "binary" if binary else "text",
+        "duration_s": round(elapsed, 3),
+        "moves": stats.moves,
+        "moves_per_sec": round(stats.moves / elapsed, 1) if elapsed else 0.0,
+        "games": stats.games,
+        "errors": stats.errors,
+        "throttled": stats.throttled,
+        "rate_limit": {"server": server_rate, "bot_pace": pace},
+        "move_rtt_ms": {"p50": to_ms(percentile(round_trips, 0.50)), "p99": to_ms(percentile(round_trips, 0.99)),
+                        "max": to_ms(round_trips[-1] if round_trips else None)},
+        "connect_ms": {"p50": to_ms(percentile(connect_times, 0.50)), "p99": to_ms(percentile(connect_times, 0.99)),
+                       "max": to_ms(connect_times[-1] if connect_times else None)},
+        "server_rss_kb": {"baseline": baseline, "loaded": loaded},
+        "memory_per_room_kb": (round((loaded - baseline) / rooms, 2)
+                               if baseline is not None and loaded is not None and rooms else None),
+    }
+
+
+def format_report(report):
+    """Format a load test report for the terminal.
+
+    Args:
+        report: The dictionary returned by run_load.
+
+    Returns:
+        str: The human-readable report.
+    """
+    rtt, connect, rss = report["move_rtt_ms"], report["connect_ms"], report["server_rss_kb"]
+    server_rate, pace = report["rate_limit"]["server"], report["rate_limit"]["bot_pace"]
+    server_limit = "unknown" if server_rate is None else f"{server_rate:g} msg/s" if server_rate else "off"
+    lines = [
+        f"Bots:              {report['bots']} ({report['connected']} connected, {report['failed']} failed, "
+        f"{report['rooms']} rooms, {report['protocol']} protocol)",
+        f"Duration:          {report['duration_s']} s",
+        f"Moves:             {report['moves']} ({report['moves_per_sec']} moves/s, {report['games']} games, "
+        f"{report['errors']} errors, {report['throttled']} rate-limited)",
+        f"Rate limits:       server {server_limit}, bots " + (f"paced to {pace:g} moves/s" if pace else "unpaced"),
+        f"Move round trip:   p50 {rtt['p50']} ms, p99 {rtt['p99']} ms, max {rtt['max']} ms",
+        f"Connection setup:  p50 {connect['p50']} ms, p99 {connect['p99']} ms, max {connect['max']} ms",
+    ]
+    if rss["baseline"] is not None and rss["loaded"] is not None:
+        lines.append(f"Server memory:     {rss['baseline']} KiB idle, {rss['loaded']} KiB loaded, "
+                     f"{report['memory_per_room_kb']} KiB per room")
+    return "\n".join(lines)
+
+
+def main():
+    """Parse the command line, run the load test and print the report."""
+    parser = argparse.ArgumentParser(description="Headless load generator and latency benchmark for the async game "
+                                                 "server (Server.py --mode async)")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="server address")
+    parser.add_argument("--port", type=int, default=PORT, help="server port")
+    parser.add_argument("--bots", type=int, default=1000, help="number of simulated players")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to play")
+    parser.add_argument("--binary", action="store_true", help="negotiate the binary protocol")
+    parser.add_argument("--concurrency", type=int, default=256, help="connections set up at once")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the bots' moves")
+    parser.add_argument("--spawn", action="store_true", help="start an async server on host:port for the run")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes of a spawned server")
+    parser.add_argument("--message-rate", type=float, default=0.0,
+                        help="per-client message limit of a spawned server (default 0 = no limit)")
+    parser.add_argument("--pace", type=float,
+                        help=f"maximum moves per second of each bot, 0 = unpaced (default: {PACE_FRACTION:g} "
+                             f"times the server's message limit, {MESSAGE_RATE:g} unless spawned; "
+                             f"unpaced against a spawned server without a limit)")
+    parser.add_argument("--server-pid", type=int, help="pid of an already running server, for memory figures")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    server_rate = args.message_rate if args.spawn else None
+    pace = args.pace
+    if pace is None:
+        pace = 0.0 if server_rate == 0 else PACE_FRACTION * (server_rate or MESSAGE_RATE)
+
+    raise_file_limit()
+    server = spawn_server(args.host, args.port, args.workers, args.message_rate) if args.spawn else None
+    server_pid = server.pid if server is not None else args.server_pid
+    try:
+        report = asyncio.run(run_load(args.host, args.port, args.bots, args.duration, args.binary,
+                                      args.concurrency, args.seed, server_pid, pace, server_rate))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    if report["connected"] >= 2 and not report["rooms"]:
+        sys.exit("loadtest: no bot was seated in a room; the load test needs the async server "
+                 "(Server.py --mode async)")
+
+
+if __name__ == "__main__":
+    main()
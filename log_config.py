@@ -0,0 +1,91 @@
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+
+LEVEL_ENV = "TICTACTOE_LOG_LEVEL"  # Environment variable overriding the default level
+DEFAULT_LEVEL = "INFO"  # Connections, matches and errors; moves and messages are only logged at DEBUG
+LOG_FORMAT = "%(asctime)s %(levelname)-7s %(name)s [room=%(room)s] %(message)s"
+
+_listener = None  # QueueListener writing records out, started by configure_logging
+_listener_pid = None  # Process that started it; forked workers must start their own
+
+
+class ContextFilter(logging.Filter):
+    """Fill in the context fields of records logged without them, so every line has the same shape."""
+
+    def filter(self, record):
+        if not hasattr(record, "room"):
+            record.room = "-"
+        return True
+
+
+class ContextAdapter(logging.LoggerAdapter):
+    """Logger adapter that attaches fixed context fields (such as the room id) to every record.
+
+    Unlike the stock adapter, fields passed with ``extra=`` at the call site are
+    merged with the adapter's instead of replacing them.
+    """
+
+    def process(self, msg, kwargs):
+        kwargs["extra"] = {**self.extra, **kwargs.get("extra", {})}
+        return msg, kwargs
+
+
+def room_logger(logger, room_id):
+    """Return a logger whose records carry a room id.
+
+    Args:
+        logger: The module logger to log through.
+        room_id: The id of the room.
+
+    Returns:
+        ContextAdapter: The adapter.
+    """
+    return ContextAdapter(logger, {"room": room_id})
+
+
+def configure_logging(level=None, stream=None):
+    """Route all logging through a queue drained by a background thread.
+
+    Callers only format the record and put it on an in-memory queue, so a slow
+    terminal or pipe never blocks a game thread or the event loop. Records below
+    the level are discarded before any formatting at all. Calling it again changes
+    the level; calling it in a forked worker process starts that worker's own listener.
+
+    Args:
+        level: Level name or number (default: the level already set, else
+            $TICTACTOE_LOG_LEVEL, else INFO).
+        stream: Stream to write to (default: stderr).
+
+    Returns:
+        logging.handlers.QueueListener: The running listener.
+    """
+    global _listener, _listener_pid
+    if level is None and _listener is None:
+        level = os.environ.get(LEVEL_ENV, DEFAULT_LEVEL)
+    root = logging.getLogger()
+    if level is not None:  # Otherwise keep the level set before a fork
+        root.setLevel(level.upper() if isinstance(level, str) else level)
+    if _listener is not None and _listener_pid == os.getpid():
+        return _listener
+
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    handler.addFilter(ContextFilter())
+    log_queue = queue.SimpleQueue()
+    root.handlers = [logging.handlers.QueueHandler(log_queue)]
+    _listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener_pid = os.getpid()
+    _listener.start()
+    atexit.register(stop_logging)
+    return _listener
+
+
+def stop_logging():
+    """Write out every queued record and stop the listener thread."""
+    global _listener
+    if _listener is not None and _listener_pid == os.getpid():
+        _listener.stop()
+        _listener = None
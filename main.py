@@ -1,4 +1,5 @@
 from tkinter import Tk
+from log_config import configure_logging
 from ui_home import HomeScreen
 
 def main():
@@ -9,6 +10,9 @@ def main():
     and loads the home screen UI. The root window's main event loop is started, 
     which listens for user interactions and updates the UI accordingly.
     """
+    # Queue-backed logging so the event loop never waits on console output
+    configure_logging()
+
     # Create the root Tkinter window (main application window)
     root = Tk()
     
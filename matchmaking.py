@@ -0,0 +1,186 @@
+import itertools
+from collections import OrderedDict
+
+DEFAULT_VARIANT = "3x3"  # Board variant used when a client does not ask for one
+
+
+class Ticket:
+    """A player's place in the matchmaking queue.
+
+    Attributes:
+        player_id: Unique identifier of the waiting player.
+        variant: The board variant the player wants to play.
+        skill: Optional skill rating used to pair players of similar strength.
+        client: The server-side connection object of the player.
+    """
+
+    __slots__ = ("player_id", "variant", "skill", "client")
+
+    def __init__(self, player_id, variant=DEFAULT_VARIANT, skill=None, client=None):
+        """Create a ticket.
+
+        Args:
+            player_id: Unique identifier of the waiting player.
+            variant: The board variant the player wants to play.
+            skill: Optional skill rating.
+            client: The server-side connection object of the player.
+        """
+        self.player_id = player_id
+        self.variant = variant
+        self.skill = skill
+        self.client = client
+
+
+class MatchmakingQueue:
+    """FIFO matchmaking queue that pairs players by board variant and skill band.
+
+    Waiting tickets are kept in one insertion-ordered bucket per (variant, skill band),
+    plus an index from player id to bucket, so enqueueing, pairing and cancelling are
+    all O(1) regardless of how many players are waiting.
+
+    Attributes:
+        skill_band: Width of a skill band; None pairs players regardless of skill.
+    """
+
+    def __init__(self, skill_band=None):
+        """Create an empty queue.
+
+        Args:
+            skill_band: Width of a skill band; None ignores skill when pairing.
+        """
+        self.skill_band = skill_band
+        self._buckets = {}  # (variant, band) -> OrderedDict of player_id -> ticket
+        self._index = {}  # player_id -> bucket key
+
+    def __len__(self):
+        """Return the number of waiting players."""
+        return len(self._index)
+
+    def __contains__(self, player_id):
+        """Return True if the player is waiting in the queue."""
+        return player_id in self._index
+
+    def bucket_key(self, ticket):
+        """Return the bucket a ticket is paired within.
+
+        Args:
+            ticket: The ticket to classify.
+
+        Returns:
+            tuple: The (variant, skill band) key.
+        """
+        if self.skill_band is None or ticket.skill is None:
+            return ticket.variant, None
+        return ticket.variant, int(ticket.skill // self.skill_band)
+
+    def enqueue(self, ticket):
+        """Pair a ticket with the longest-waiting compatible player, or queue it.
+
+        Args:
+            ticket: The ticket of the player looking for a match.
+
+        Returns:
+            Ticket: The opponent's ticket, or None if the player has to wait.
+        """
+        key = self.bucket_key(ticket)
+        bucket = self._buckets.get(key)
+        if bucket:
+            _, opponent = bucket.popitem(last=False)  # Oldest waiting ticket first
+            del self._index[opponent.player_id]
+            if not bucket:
+                del self._buckets[key]
+            return opponent
+
+        if bucket is None:
+            bucket = self._buckets[key] = OrderedDict()
+        bucket[ticket.player_id] = ticket
+        self._index[ticket.player_id] = key
+        return None
+
+    def cancel(self, player_id):
+        """Remove a waiting player from the queue.
+
+        Args:
+            player_id: The identifier of the player to remove.
+
+        Returns:
+            Ticket: The removed ticket, or None if the player was not waiting.
+        """
+        key = self._index.pop(player_id, None)
+        if key is None:
+            return None
+        bucket = self._buckets[key]
+        ticket = bucket.pop(player_id)
+        if not bucket:
+            del self._buckets[key]
+        return ticket
+
+
+class RoomManager:
+    """Creates, tracks and tears down the rooms of a server.
+
+    Attributes:
+        rooms: Maps room ids to active rooms.
+    """
+
+    def __init__(self, room_factory, shard=0, shard_count=1):
+        """Create a manager with no rooms.
+
+        Room ids are allocated so that room_id % shard_count == shard, which lets
+        any worker of a sharded server tell which worker owns a room from its id.
+
+        Args:
+            room_factory: Callable taking a room id and keyword arguments and
+                returning a new room.
+            shard: Index of the worker this manager belongs to.
+            shard_count: Total number of workers.
+        """
+        self.room_factory = room_factory
+        self.shard = shard
+        self.shard_count = shard_count
+        self.rooms = {}
+        self._room_ids = itertools.count(shard_count + shard, shard_count)
+
+    def owner(self, room_id):
+        """Return the index of the worker that owns a room.
+
+        Args:
+            room_id: The id of the room.
+
+        Returns:
+            int: The owning worker's index.
+        """
+        return room_id % self.shard_count
+
+    def __len__(self):
+        """Return the number of active rooms."""
+        return len(self.rooms)
+
+    def create_room(self, **kwargs):
+        """Create and register a new room.
+
+        Args:
+            **kwargs: Extra arguments passed to the room factory.
+
+        Returns:
+            The new room.
+        """
+        room_id = next(self._room_ids)
+        room = self.room_factory(room_id, **kwargs)
+        self.rooms[room_id] = room
+        return room
+
+    def get(self, room_id):
+        """Return the room with the given id, or None if it does not exist."""
+        return self.rooms.get(room_id)
+
+    def close_room(self, room_id):
+        """Unregister a room.
+
+        Args:
+            room_id: The id of the room to tear down.
+
+        Returns:
+            The removed room, or None if it did not exist.
+        """
+        return self.rooms.pop(room_id, None)
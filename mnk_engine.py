@@ -0,0 +1,424 @@
+import time
+from functools import lru_cache
+
+# Directions checked for lines: horizontal, vertical, diagonal, anti-diagonal
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+
+@lru_cache(maxsize=None)
+def winning_windows(size, k):
+    """
+    Returns every run of k cells in a row on a size x size board.
+
+    Parameters:
+    -----------
+    size : int
+        The width and height of the board.
+    k : int
+        The number of marks in a row needed to win.
+
+    Returns:
+    --------
+    tuple
+        A tuple of index tuples, one per window, computed once per (size, k).
+    """
+    windows = []
+    for row in range(size):
+        for col in range(size):
+            for dr, dc in DIRECTIONS:
+                end_row, end_col = row + dr * (k - 1), col + dc * (k - 1)
+                if 0 <= end_row < size and 0 <= end_col < size:
+                    windows.append(tuple((row + dr * i) * size + col + dc * i for i in range(k)))
+    return tuple(windows)
+
+
+class SearchTimeout(Exception):
+    """
+    Raised inside the search when the per-move time budget runs out.
+    """
+
+
+class MNKGame:
+    """
+    A generalized m,n,k game: a square board of any size where K marks in a row win.
+    It mirrors the TicTacToeGame interface so the same UI and tools can drive it.
+
+    Attributes:
+    -----------
+    size : int
+        The width and height of the board.
+    k : int
+        The number of marks in a row needed to win.
+    board : list
+        The board as a list of size * size marks ('X', 'O' or ' '), row by row.
+    current_player : str
+        The current player, either 'X' or 'O'.
+    ai_enabled : bool
+        Flag to indicate whether AI is enabled for single-player mode.
+    game_over : bool
+        Flag to indicate if the game is over.
+    winner : str or None
+        The mark that completed a line, detected incrementally from the last move.
+    move_count : int
+        Number of marks on the board.
+    engine : MNKEngine
+        The search engine used for AI moves.
+    """
+
+    def __init__(self, size=3, k=3, ai_enabled=False, engine=None):
+        """
+        Initializes an empty board of the given size.
+
+        Parameters:
+        -----------
+        size : int, optional
+            The width and height of the board (default is 3).
+        k : int, optional
+            The number of marks in a row needed to win (default is 3).
+        ai_enabled : bool, optional
+            If True, AI will be enabled to play against the user (default is False).
+        engine : MNKEngine, optional
+            The engine used for AI moves (default is a new MNKEngine with a 1 second budget).
+        """
+        if not 1 <= k <= size:
+            raise ValueError(f"k must be between 1 and the board size, got k={k} for size={size}")
+        self.size = size
+        self.k = k
+        self.board = [" " for _ in range(size * size)]  # Initialize the empty board
+        self.current_player = "X"  # X starts first by default
+        self.ai_enabled = ai_enabled  # Enable or disable AI
+        self.game_over = False  # Track if the game has ended
+        self.winner = None  # Set when a move completes a line
+        self.move_count = 0  # Number of occupied cells
+        self.engine = engine if engine is not None else MNKEngine()
+
+    def copy(self):
+        """
+        Returns an independent copy of the game state, used as the search scratch board.
+        """
+        clone = MNKGame.__new__(MNKGame)
+        clone.__dict__.update(self.__dict__)
+        clone.board = list(self.board)
+        return clone
+
+    def index(self, row, col):
+        """
+        Converts a row and column to a board index.
+        """
+        return row * self.size + col
+
+    def is_winning_move(self, idx):
+        """
+        Checks whether the mark at the given index completes K in a row. Only the four
+        lines through that cell are examined, so the cost does not depend on board size.
+
+        Parameters:
+        -----------
+        idx : int
+            The index of the cell that was just played.
+
+        Returns:
+        --------
+        bool
+            True if the move won the game, False otherwise.
+        """
+        board, size, k = self.board, self.size, self.k
+        mark = board[idx]
+        row, col = divmod(idx, size)
+        for dr, dc in DIRECTIONS:
+            count = 1
+            for sign in (1, -1):
+                r, c = row + dr * sign, col + dc * sign
+                while 0 <= r < size and 0 <= c < size and board[r * size + c] == mark:
+                    count += 1
+                    r += dr * sign
+                    c += dc * sign
+            if count >= k:
+                return True
+        return False
+
+    def place(self, idx, mark):
+        """
+        Places a mark without validation and reports whether it won the game.
+
+        Parameters:
+        -----------
+        idx : int
+            The index of an empty cell.
+        mark : str
+            The mark ('X' or 'O') to place.
+
+        Returns:
+        --------
+        bool
+            True if the move completed a line, False otherwise.
+        """
+        self.board[idx] = mark
+        self.move_count += 1
+        return self.is_winning_move(idx)
+
+    def undo(self, idx):
+        """
+        Removes the mark at the given index (the inverse of place).
+        """
+        self.board[idx] = " "
+        self.move_count -= 1
+
+    def candidate_moves(self, radius=1):
+        """
+        Returns the empty cells worth searching: on small boards every empty cell, on
+        larger boards only cells within `radius` of an existing mark.
+
+        Parameters:
+        -----------
+        radius : int, optional
+            How far from existing marks to look for candidates (default is 1).
+
+        Returns:
+        --------
+        list
+            The candidate indices, closest to the centre first.
+        """
+        size, board = self.size, self.board
+        centre = (size - 1) / 2
+        if self.move_count == 0:
+            return [self.index(size // 2, size // 2)]
+        if size <= 4:
+            cells = [i for i, mark in enumerate(board) if mark == " "]
+        else:
+            near = set()
+            for i, mark in enumerate(board):
+                if mark != " ":
+                    row, col = divmod(i, size)
+                    for r in range(max(0, row - radius), min(size, row + radius + 1)):
+                        for c in range(max(0, col - radius), min(size, col + radius + 1)):
+                            if board[r * size + c] == " ":
+                                near.add(r * size + c)
+            cells = list(near) or [i for i, mark in enumerate(board) if mark == " "]
+        cells.sort(key=lambda i: (abs(i // size - centre) + abs(i % size - centre), i))
+        return cells
+
+    def evaluate(self, mark):
+        """
+        Heuristic score of the position for the given mark, used at the search horizon.
+        Every window of K cells held by only one player counts 10^n for n marks in it.
+
+        Parameters:
+        -----------
+        mark : str
+            The mark ('X' or 'O') to score the position for.
+
+        Returns:
+        --------
+        int
+            Positive if the position favours `mark`, negative if it favours the opponent.
+        """
+        board = self.board
+        score = 0
+        for window in winning_windows(self.size, self.k):
+            mine = theirs = 0
+            for i in window:
+                cell = board[i]
+                if cell == mark:
+                    mine += 1
+                elif cell != " ":
+                    theirs += 1
+            if mine and not theirs:
+                score += 10 ** mine
+            elif theirs and not mine:
+                score -= 10 ** theirs
+        return score
+
+    def check_winner(self, mark):
+        """
+        Checks if the given player has won, using the result recorded by the last move.
+        """
+        return self.winner == mark
+
+    def board_full(self):
+        """
+        Checks if the board is completely full with no empty spaces left.
+        """
+        return self.move_count == len(self.board)
+
+    def ai_move(self):
+        """
+        Asks the engine for the best move of the current player within its time budget.
+
+        Returns:
+        --------
+        int or None
+            The index of the chosen move, or None if the board is full.
+        """
+        return self.engine.best_move(self, self.current_player)
+
+    def make_move(self, idx):
+        """
+        Places the current player's mark on the specified index of the board.
+
+        Parameters:
+        -----------
+        idx : int
+            The index of the board where the current player wants to place their mark.
+
+        Returns:
+        --------
+        bool
+            True if the move was valid and successful, False if the spot was already taken.
+        """
+        if self.board[idx] != " ":
+            return False
+        if self.place(idx, self.current_player):
+            self.winner = self.current_player
+        return True
+
+    def switch_player(self):
+        """
+        Switches the turn between player 'X' and player 'O'.
+        """
+        self.current_player = "O" if self.current_player == "X" else "X"
+
+    def reset_game(self):
+        """
+        Resets the game to its initial state, clearing the board and resetting the turn to player 'X'.
+        """
+        self.board = [" " for _ in range(self.size * self.size)]
+        self.current_player = "X"
+        self.game_over = False
+        self.winner = None
+        self.move_count = 0
+
+
+class MNKEngine:
+    """
+    Iterative-deepening alpha-beta search for MNKGame with a per-move wall-clock budget.
+
+    Each iteration searches one ply deeper than the last and starts from the previous
+    best move. When the budget runs out the unfinished iteration is discarded and the
+    best move of the last completed depth is played, so move latency stays bounded on
+    any board size.
+
+    Attributes:
+    -----------
+    time_budget : float
+        Maximum thinking time per move, in seconds.
+    max_depth : int or None
+        Optional cap on the search depth (None searches until the budget runs out).
+    radius : int
+        Neighbourhood radius used to generate candidate moves on large boards.
+    nodes_searched : int
+        Number of positions visited during the last call to best_move.
+    depth_reached : int
+        The deepest fully completed iteration of the last call to best_move.
+    """
+
+    WIN_SCORE = 10 ** 9  # Larger than any heuristic evaluation
+    CHECK_INTERVAL = 64  # Nodes between clock checks
+
+    def __init__(self, time_budget=1.0, max_depth=None, radius=1):
+        """
+        Initializes the engine.
+
+        Parameters:
+        -----------
+        time_budget : float, optional
+            Maximum thinking time per move, in seconds (default is 1.0).
+        max_depth : int, optional
+            Cap on the search depth (default is None, limited only by the budget).
+        radius : int, optional
+            Candidate move radius on large boards (default is 1).
+        """
+        self.time_budget = time_budget
+        self.max_depth = max_depth
+        self.radius = radius
+        self.nodes_searched = 0
+        self.depth_reached = 0
+
+    def best_move(self, game, mark):
+        """
+        Finds the best move for `mark` within the time budget.
+
+        Parameters:
+        -----------
+        game : MNKGame
+            The game to move in; it is not modified.
+        mark : str
+            The mark ('X' or 'O') to move for.
+
+        Returns:
+        --------
+        int or None
+            The index of the chosen move, or None if there is no legal move.
+        """
+        deadline = time.perf_counter() + self.time_budget
+        scratch = game.copy()
+        candidates = scratch.candidate_moves(self.radius)
+        self.nodes_searched = 0
+        self.depth_reached = 0
+        if not candidates:
+            return None
+
+        best = candidates[0]  # Fallback if not even depth 1 completes
+        limit = len(scratch.board) - scratch.move_count
+        if self.max_depth is not None:
+            limit = min(limit, self.max_depth)
+        for depth in range(1, limit + 1):
+            try:
+                score, move = self._search_root(scratch, mark, depth, deadline, best)
+            except SearchTimeout:
+                break  # Keep the result of the last completed depth
+            best = move
+            self.depth_reached = depth
+            if abs(score) > self.WIN_SCORE - len(scratch.board):
+                break  # A forced win or loss was found, deeper search cannot change it
+        return best
+
+    def _search_root(self, game, mark, depth, deadline, first):
+        """
+        Searches all root moves to the given depth, trying `first` before the others.
+        """
+        other = "O" if mark == "X" else "X"
+        moves = game.candidate_moves(self.radius)
+        moves.remove(first)
+        moves.insert(0, first)
+
+        alpha, beta = -float('inf'), float('inf')
+        best_move = first
+        for idx in moves:
+            if game.place(idx, mark):
+                score = self.WIN_SCORE - 1  # Immediate win
+            else:
+                score = -self._negamax(game, other, mark, depth - 1, 2, -beta, -alpha, deadline)
+            game.undo(idx)
+            if score > alpha:
+                alpha = score
+                best_move = idx
+        return alpha, best_move
+
+    def _negamax(self, game, mark, other, depth, ply, alpha, beta, deadline):
+        """
+        Negamax alpha-beta search; scores are from the point of view of `mark`.
+        """
+        self.nodes_searched += 1
+        if self.nodes_searched % self.CHECK_INTERVAL == 0 and time.perf_counter() > deadline:
+            raise SearchTimeout()
+
+        if game.board_full():
+            return 0  # Draw
+        if depth == 0:
+            return game.evaluate(mark)  # Horizon reached
+
+        best_score = -float('inf')
+        for idx in game.candidate_moves(self.radius):
+            if game.place(idx, mark):
+                score = self.WIN_SCORE - ply  # Win now, the sooner the better
+            else:
+                score = -self._negamax(game, other, mark, depth - 1, ply + 1, -beta, -alpha, deadline)
+            game.undo(idx)
+            if score > best_score:
+                best_score = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break  # Cut-off
+        return best_score
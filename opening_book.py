@@ -0,0 +1,221 @@
+import logging
+import mmap
+import os
+import struct
+
+from bitboard import BitBoard, FULL_MASK, WIN_TABLE, iter_moves
+from solver import TicTacToeSolver
+
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "opening_book.bin")
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"TTTB"  # File signature
+VERSION = 1
+HEADER_FORMAT = "<4sHH"  # Magic, version, reserved
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+ENTRY_FORMAT = "<H"  # One little-endian 16-bit entry per position
+ENTRY_SIZE = struct.calcsize(ENTRY_FORMAT)
+POSITIONS = 3 ** 9  # Every assignment of ' ', 'X', 'O' to the 9 cells
+
+# Entry layout: bits 0-8 optimal moves, bits 9-10 value + 1 for the player to move, bit 15 reachable
+MOVES_MASK = 0x1FF
+VALUE_SHIFT = 9
+REACHABLE = 0x8000
+
+# TERNARY[mask] is the base-3 weight of the cells in a 9-bit mask, so index = TERNARY[x] + 2 * TERNARY[o]
+TERNARY = tuple(sum(3 ** i for i in range(9) if bits >> i & 1) for bits in range(FULL_MASK + 1))
+
+
+def position_index(board):
+    """
+    Returns the base-3 index of a board (' ' = 0, 'X' = 1, 'O' = 2, cell 0 least significant).
+
+    Parameters:
+    -----------
+    board : BitBoard
+        The board to encode.
+
+    Returns:
+    --------
+    int
+        The index of the board in the table.
+    """
+    return TERNARY[board.x] + 2 * TERNARY[board.o]
+
+
+def generate_book(path=BOOK_PATH, solver=None):
+    """
+    Enumerates every reachable position, solves it, and writes the lookup table.
+
+    Parameters:
+    -----------
+    path : str, optional
+        Where to write the table (default is assets/opening_book.bin).
+    solver : TicTacToeSolver, optional
+        Solver used to evaluate positions (default is a fresh solver).
+
+    Returns:
+    --------
+    int
+        The number of reachable positions written.
+    """
+    solver = solver if solver is not None else TicTacToeSolver()
+    table = [0] * POSITIONS
+    reachable = 0
+
+    stack = [(0, 0)]  # (x, o) masks; X moves when both players have the same number of marks
+    while stack:
+        x, o = stack.pop()
+        index = TERNARY[x] + 2 * TERNARY[o]
+        if table[index]:
+            continue  # Already visited through another move order
+        reachable += 1
+
+        x_to_move = bin(x).count("1") == bin(o).count("1")
+        mine, theirs = (x, o) if x_to_move else (o, x)
+        free = FULL_MASK & ~(x | o)
+        value = solver.solve(mine, theirs)
+
+        optimal = 0
+        if not WIN_TABLE[theirs] and free:
+            for i in iter_moves(free):
+                if -solver.solve(theirs, mine | 1 << i) == value:
+                    optimal |= 1 << i
+                stack.append((x | 1 << i, o) if x_to_move else (x, o | 1 << i))
+        table[index] = REACHABLE | (value + 1) << VALUE_SHIFT | optimal
+
+    with open(path, "wb") as book_file:
+        book_file.write(struct.pack(HEADER_FORMAT, MAGIC, VERSION, 0))
+        book_file.write(struct.pack(f"<{POSITIONS}H", *table))
+    return reachable
+
+
+class OpeningBook:
+    """
+    Read-only, memory-mapped perfect-play table for every reachable 3x3 position.
+
+    The file is mapped rather than read, so all processes using the book share one
+    copy in the OS page cache, and a lookup is a single 16-bit read at the board's
+    base-3 index.
+
+    Attributes:
+    -----------
+    path : str
+        The path of the mapped table.
+    """
+
+    def __init__(self, path=BOOK_PATH):
+        """
+        Opens and memory-maps the table, checking its header.
+
+        Parameters:
+        -----------
+        path : str, optional
+            The path of the table (default is assets/opening_book.bin).
+
+        Raises:
+        -------
+        ValueError
+            If the file is not an opening book of a supported version.
+        """
+        self.path = path
+        with open(path, "rb") as book_file:
+            self._map = mmap.mmap(book_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _ = struct.unpack_from(HEADER_FORMAT, self._map, 0)
+        if magic != MAGIC or version != VERSION or len(self._map) != HEADER_SIZE + POSITIONS * ENTRY_SIZE:
+            self._map.close()
+            raise ValueError(f"{path} is not a version {VERSION} opening book")
+
+    def entry(self, board):
+        """
+        Returns the raw 16-bit table entry for a board.
+        """
+        if not isinstance(board, BitBoard):
+            board = BitBoard.from_list(board)
+        return struct.unpack_from(ENTRY_FORMAT, self._map, HEADER_SIZE + position_index(board) * ENTRY_SIZE)[0]
+
+    def entries(self):
+        """
+        Returns a copy of the whole table: POSITIONS little-endian 16-bit entries, in
+        base-3 index order, for bulk lookups.
+        """
+        return self._map[HEADER_SIZE:]
+
+    def value(self, board):
+        """
+        Returns the game value for the player to move (1 win, 0 draw, -1 loss), or None
+        if the position cannot arise in a legal game.
+        """
+        entry = self.entry(board)
+        if not entry & REACHABLE:
+            return None
+        return (entry >> VALUE_SHIFT & 3) - 1
+
+    def optimal_moves(self, board):
+        """
+        Returns every move that keeps the best achievable result, in ascending order.
+        """
+        return list(iter_moves(self.entry(board) & MOVES_MASK))
+
+    def best_move(self, board, player):
+        """
+        Returns the lowest-index optimal move, matching the solver's tie-breaking.
+
+        Parameters:
+        -----------
+        board : BitBoard or list
+            The current game board state.
+        player : str
+            The mark ('X' or 'O') of the player to move.
+
+        Returns:
+        --------
+        int or None
+            The best move, or None if the position is terminal, unreachable, or not
+            `player`'s turn.
+        """
+        if not isinstance(board, BitBoard):
+            board = BitBoard.from_list(board)
+        x_to_move = bin(board.x).count("1") == bin(board.o).count("1")
+        if x_to_move != (player == "X"):
+            return None  # Not a position from a legal game with this player to move
+        moves = self.entry(board) & MOVES_MASK
+        if not moves:
+            return None
+        return (moves & -moves).bit_length() - 1
+
+    def close(self):
+        """
+        Unmaps the table.
+        """
+        self._map.close()
+
+
+_book = None
+_book_loaded = False
+
+
+def get_book():
+    """
+    Returns the process-wide opening book, mapping it on first use.
+
+    Returns:
+    --------
+    OpeningBook or None
+        The shared book, or None if the table file is missing or invalid.
+    """
+    global _book, _book_loaded
+    if not _book_loaded:
+        _book_loaded = True
+        try:
+            _book = OpeningBook()
+        except (OSError, ValueError) as e:
+            logger.warning("Opening book unavailable, falling back to search: %s", e)
+            _book = None
+    return _book
+
+
+if __name__ == "__main__":
+    count = generate_book()
+    print(f"Wrote {count} positions to {BOOK_PATH}")
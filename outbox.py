@@ -0,0 +1,202 @@
+import asyncio
+import logging
+import socket
+import threading
+
+MAX_PENDING_BYTES = 1 << 20  # Unsent bytes a client may have queued before it counts as a slow consumer
+DISCONNECT_POLICY = "disconnect"  # Close slow consumers
+DROP_POLICY = "drop"  # Discard new frames for slow consumers
+
+logger = logging.getLogger(__name__)
+
+
+class ThreadedOutbox:
+    """Bounded outbound queue with its own writer thread for one blocking socket.
+
+    The game thread only appends frames and never waits on the peer's TCP
+    window. The writer thread sends everything queued since its last write in a
+    single sendall, so all messages produced by one event leave together.
+
+    Attributes:
+        conn: The client socket.
+        max_pending: Maximum number of unsent bytes before the overflow policy applies.
+        overflow: What to do when the queue is full: DISCONNECT_POLICY or DROP_POLICY.
+        closed: True once the outbox has been closed.
+    """
+
+    def __init__(self, conn, max_pending=MAX_PENDING_BYTES, overflow=DISCONNECT_POLICY):
+        """Create the outbox and start its writer thread.
+
+        Args:
+            conn: The client socket.
+            max_pending: Maximum number of unsent bytes.
+            overflow: DISCONNECT_POLICY or DROP_POLICY.
+        """
+        self.conn = conn
+        self.max_pending = max_pending
+        self.overflow = overflow
+        self.closed = False
+        self._chunks = []
+        self._pending = 0
+        self._ready = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def send(self, data):
+        """Queue encoded frames without blocking.
+
+        Args:
+            data: The bytes to send.
+
+        Returns:
+            bool: True if the data was queued, False if it was dropped or the
+                client was disconnected as a slow consumer.
+        """
+        with self._ready:
+            if self.closed:
+                return False
+            if self._pending + len(data) <= self.max_pending:
+                self._chunks.append(data)
+                self._pending += len(data)
+                self._ready.notify()
+                return True
+        if self.overflow == DISCONNECT_POLICY:
+            logger.warning("Outbound queue full, disconnecting slow consumer")
+            self.abort()
+        return False
+
+    def _run(self):
+        """Writer loop: send queued frames in batches until closed."""
+        while True:
+            with self._ready:
+                while not self._chunks and not self.closed:
+                    self._ready.wait()
+                if not self._chunks:
+                    return  # Closed and fully flushed
+                data = b"".join(self._chunks)  # Coalesce everything queued since the last write
+                self._chunks.clear()
+            try:
+                self.conn.sendall(data)
+            except OSError:
+                return
+            with self._ready:
+                self._pending -= len(data)  # Bytes in flight count against the limit until they are sent
+
+    def close(self):
+        """Stop the writer thread once it has sent what is already queued."""
+        with self._ready:
+            self.closed = True
+            self._ready.notify()
+
+    def join(self, timeout=None):
+        """Wait for the writer thread to finish after close().
+
+        Args:
+            timeout: Maximum number of seconds to wait, or None to wait indefinitely.
+
+        Returns:
+            bool: True if everything queued was written and the thread has stopped.
+        """
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def abort(self):
+        """Disconnect the client immediately, discarding queued frames."""
+        with self._ready:
+            self.closed = True
+            self._pending -= sum(map(len, self._chunks))
+            self._chunks.clear()
+            self._ready.notify()
+        try:
+            self.conn.shutdown(socket.SHUT_RDWR)  # Wakes the threads blocked on this socket
+        except OSError:
+            pass
+
+
+class AsyncOutbox:
+    """Bounded outbound queue with its own writer task for one asyncio stream.
+
+    Frames queued while the writer task waits are joined into one write, and
+    only the writer task awaits drain(), so a slow peer never stalls the
+    coroutine that produced the message.
+
+    Attributes:
+        writer: The connection's stream writer.
+        max_pending: Maximum number of unsent bytes before the overflow policy applies.
+        overflow: What to do when the queue is full: DISCONNECT_POLICY or DROP_POLICY.
+        closed: True once the outbox has been closed.
+    """
+
+    def __init__(self, writer, max_pending=MAX_PENDING_BYTES, overflow=DISCONNECT_POLICY):
+        """Create the outbox and start its writer task on the running loop.
+
+        Args:
+            writer: The connection's stream writer.
+            max_pending: Maximum number of unsent bytes.
+            overflow: DISCONNECT_POLICY or DROP_POLICY.
+        """
+        self.writer = writer
+        self.max_pending = max_pending
+        self.overflow = overflow
+        self.closed = False
+        self._chunks = []
+        self._pending = 0
+        self._ready = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def send(self, data):
+        """Queue encoded frames without blocking.
+
+        Args:
+            data: The bytes to send.
+
+        Returns:
+            bool: True if the data was queued, False if it was dropped or the
+                client was disconnected as a slow consumer.
+        """
+        if self.closed:
+            return False
+        if self._pending + len(data) > self.max_pending:
+            if self.overflow == DISCONNECT_POLICY:
+                logger.warning("Outbound queue full, disconnecting slow consumer")
+                self.abort()
+            return False
+        self._chunks.append(data)
+        self._pending += len(data)
+        self._ready.set()
+        return True
+
+    def _take(self):
+        """Remove and return everything queued as one buffer."""
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        self._ready.clear()
+        return data
+
+    async def _run(self):
+        """Writer loop: write queued frames in batches and wait for the peer to drain them."""
+        try:
+            while True:
+                await self._ready.wait()
+                data = self._take()
+                self.writer.write(data)  # Coalesce everything queued since the last write
+                await self.writer.drain()
+                self._pending -= len(data)  # Bytes in flight count against the limit until drained
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+
+    def close(self):
+        """Stop the writer task and close the stream after writing what is already queued."""
+        self.closed = True
+        self._task.cancel()
+        if self._chunks and not self.writer.is_closing():
+            self.writer.write(self._take())
+        self.writer.close()
+
+    def abort(self):
+        """Disconnect the client immediately, discarding queued frames."""
+        self.closed = True
+        self._task.cancel()
+        self._pending -= sum(map(len, self._chunks))
+        self._chunks.clear()
+        self.writer.transport.abort()
@@ -0,0 +1,275 @@
+from framing import DISCONNECT_MESSAGE, encode_binary_frame, encode_frame
+
+# Protocol negotiation: a client that understands the binary protocol sends the text
+# message "HELLO:<version>" after receiving its role. A server that supports that
+# version answers with a binary HELLO frame and both sides switch to binary frames.
+# Servers and clients that do not know HELLO simply ignore it and keep using text.
+HELLO_MESSAGE = "HELLO"
+PROTOCOL_VERSION = 1
+
+# Opcodes, the first byte of every binary payload
+OP_HELLO = 0x01  # Field: protocol version
+OP_ROLE = 0x02  # Field: mark
+OP_MOVE = 0x03  # Field: mark << 4 | cell index
+OP_WINNER = 0x04  # Field: mark
+OP_DRAW = 0x05
+OP_RESET_BOARD = 0x06
+OP_DISCONNECT = 0x07
+OP_REMATCH = 0x08
+OP_GAME_OVER = 0x09
+OP_ROOM = 0x0A  # Field: room id (4 bytes), tells a player which room it was seated in
+OP_JOIN = 0x0B  # Field: room id (4 bytes), asks to be seated in that room
+OP_REDIRECT = 0x0C  # Field: port (2 bytes), the worker that owns the requested room
+OP_ERROR = 0x0D  # Field: error code, sent only to the client whose message was rejected
+OP_SESSION = 0x0E  # Field: session token, issued when a player is seated
+OP_RESUME = 0x0F  # Field: session token, asks to take a held seat back after a dropped connection
+OP_SNAPSHOT = 0x10  # Fields: mark, X mask, O mask, mark to move; the whole game state in one message
+
+TOKEN_BYTES = 12  # Session tokens are 4 bytes of room id followed by 8 random bytes
+
+# Error codes carried by OP_ERROR
+ERR_NOT_SEATED = 1  # The player is not seated in a room yet
+ERR_NOT_YOUR_TURN = 2  # Move sent out of turn or for the other player's mark
+ERR_OCCUPIED = 3  # The cell is already taken
+ERR_OUT_OF_RANGE = 4  # The cell index is not on the board
+ERR_RATE_LIMITED = 5  # Too many messages; the message was dropped
+ERR_SESSION_EXPIRED = 6  # The session to resume is unknown or its grace period has run out
+# The player keeps the turn; a player moving before an opponent is seated can move again once one is
+RETRYABLE_ERRORS = frozenset((ERR_NOT_SEATED, ERR_OCCUPIED, ERR_OUT_OF_RANGE, ERR_RATE_LIMITED))
+
+BOARD_SIZE = 3  # Rows and columns of text move coordinates
+OFF_BOARD = -1  # Cell index reported for text coordinates that are not on the board
+
+MARKS = ("X", "O")  # Mark codes used in binary fields
+MARK_CODES = {"X": 0, "O": 1}
+
+# Text messages without fields
+TEXT_OPCODES = {
+    "DRAW": OP_DRAW,
+    "RESET_BOARD": OP_RESET_BOARD,
+    "DISCONNECT": OP_DISCONNECT,
+    "GAME_OVER": OP_GAME_OVER,
+    DISCONNECT_MESSAGE: OP_DISCONNECT,
+}
+TEXT_NAMES = {
+    OP_DRAW: "DRAW",
+    OP_RESET_BOARD: "RESET_BOARD",
+    OP_DISCONNECT: "DISCONNECT",
+    OP_GAME_OVER: "GAME_OVER",
+    OP_REMATCH: "REMATCH",
+}
+# Text messages with a single integer field
+NUMERIC_OPCODES = {"ROOM": OP_ROOM, "JOIN": OP_JOIN, "REDIRECT": OP_REDIRECT, "ERROR": OP_ERROR}
+# Text messages with a session token field
+TOKEN_OPCODES = {"SESSION": OP_SESSION, "RESUME": OP_RESUME}
+
+
+def check_token(token):
+    """Check that a session token is well formed.
+
+    Args:
+        token: The token as a hex string.
+
+    Returns:
+        str: The token in lower case.
+
+    Raises:
+        ValueError: If the token is not TOKEN_BYTES bytes of hex.
+    """
+    if len(bytes.fromhex(token)) != TOKEN_BYTES:
+        raise ValueError(f"malformed session token: {token!r}")
+    return token.lower()
+
+
+def token_room(token):
+    """Return the id of the room a session token belongs to.
+
+    Args:
+        token: A well-formed session token.
+
+    Returns:
+        int: The room id encoded in the token's first 4 bytes.
+    """
+    return int(token[:8], 16)
+
+
+def cell_index(row, col):
+    """Flatten the row and column of a text move into a cell index.
+
+    Each coordinate is checked on its own, so "1:-1" or "0:5" cannot wrap onto
+    another cell.
+
+    Args:
+        row: The row field of the message.
+        col: The column field of the message.
+
+    Returns:
+        int: The cell index, or OFF_BOARD if either field is not an integer from
+            0 to BOARD_SIZE - 1, which the servers reject with ERR_OUT_OF_RANGE.
+    """
+    try:
+        row, col = int(row), int(col)
+    except ValueError:
+        return OFF_BOARD
+    if not (0 <= row < BOARD_SIZE and 0 <= col < BOARD_SIZE):
+        return OFF_BOARD
+    return row * BOARD_SIZE + col
+
+
+def parse_message(msg):
+    """Parse a text or binary message into an opcode and its fields.
+
+    Text messages are parsed from their existing colon-separated form; binary
+    payloads are read field by field with no string handling at all.
+
+    Args:
+        msg: A message from FrameDecoder: a string for a text frame or bytes for
+            a binary frame.
+
+    Returns:
+        tuple: (opcode, fields). Moves are reported as (mark, cell index). Unknown
+            messages return (None, (msg,)).
+
+    Raises:
+        ValueError: If a known message has malformed fields.
+    """
+    if isinstance(msg, bytes):
+        op = msg[0]
+        try:
+            if op == OP_MOVE:
+                return op, (MARKS[msg[1] >> 4], msg[1] & 0x0F)
+            if op in (OP_ROLE, OP_WINNER):
+                return op, (MARKS[msg[1]],)
+            if op in (OP_HELLO, OP_ERROR):
+                return op, (msg[1],)
+            if op in (OP_ROOM, OP_JOIN):
+                if len(msg) != 5:
+                    raise IndexError
+                return op, (int.from_bytes(msg[1:5], 'big'),)
+            if op == OP_REDIRECT:
+                if len(msg) != 3:
+                    raise IndexError
+                return op, (int.from_bytes(msg[1:3], 'big'),)
+            if op in (OP_SESSION, OP_RESUME):
+                if len(msg) != 1 + TOKEN_BYTES:
+                    raise IndexError
+                return op, (msg[1:].hex(),)
+            if op == OP_SNAPSHOT:
+                if len(msg) != 6:
+                    raise IndexError
+                return op, (MARKS[msg[1] >> 4], int.from_bytes(msg[2:4], 'big'),
+                            int.from_bytes(msg[4:6], 'big'), MARKS[msg[1] & 0x0F])
+        except IndexError:
+            raise ValueError(f"malformed binary message: {msg!r}") from None
+        return op, ()
+
+    op = TEXT_OPCODES.get(msg)
+    if op is not None:
+        return op, ()
+    head, *fields = msg.split(':')
+    if head == "MOVE" and len(fields) == 3:
+        return OP_MOVE, (fields[0], cell_index(fields[1], fields[2]))
+    if head in MARKS:
+        if not fields:
+            return OP_ROLE, (head,)
+        if len(fields) == 2:
+            return OP_MOVE, (head, cell_index(fields[0], fields[1]))
+    if head == "WINNER" and len(fields) == 1:
+        return OP_WINNER, (fields[0],)
+    if head == HELLO_MESSAGE and len(fields) == 1:
+        return OP_HELLO, (int(fields[0]),)
+    if head == "REMATCH":
+        return OP_REMATCH, tuple(fields)
+    if head in NUMERIC_OPCODES and len(fields) == 1:
+        return NUMERIC_OPCODES[head], (int(fields[0]),)
+    if head in TOKEN_OPCODES and len(fields) == 1:
+        return TOKEN_OPCODES[head], (check_token(fields[0]),)
+    if head == "SNAPSHOT" and len(fields) == 4 and fields[0] in MARKS and fields[3] in MARKS:
+        return OP_SNAPSHOT, (fields[0], int(fields[1]), int(fields[2]), fields[3])
+    return None, (msg,)
+
+
+def format_text(op, *fields):
+    """Format a message in the text protocol.
+
+    Args:
+        op: The opcode.
+        *fields: The message fields, as returned by parse_message.
+
+    Returns:
+        str: The text message.
+    """
+    if op == OP_MOVE:
+        mark, index = fields
+        return f"MOVE:{mark}:{index // 3}:{index % 3}"
+    if op == OP_ROLE:
+        return fields[0]
+    if op == OP_WINNER:
+        return f"WINNER:{fields[0]}"
+    if op == OP_HELLO:
+        return f"{HELLO_MESSAGE}:{fields[0]}"
+    if op == OP_ROOM:
+        return f"ROOM:{fields[0]}"
+    if op == OP_JOIN:
+        return f"JOIN:{fields[0]}"
+    if op == OP_REDIRECT:
+        return f"REDIRECT:{fields[0]}"
+    if op == OP_ERROR:
+        return f"ERROR:{fields[0]}"
+    if op == OP_SESSION:
+        return f"SESSION:{fields[0]}"
+    if op == OP_RESUME:
+        return f"RESUME:{fields[0]}"
+    if op == OP_SNAPSHOT:
+        return "SNAPSHOT:{}:{}:{}:{}".format(*fields)
+    return TEXT_NAMES[op]
+
+
+def encode_binary(op, *fields):
+    """Encode a message as a binary frame.
+
+    A move takes 3 bytes on the wire (length, opcode, packed mark and cell)
+    instead of a 64-byte header plus about 10 bytes of text.
+
+    Args:
+        op: The opcode.
+        *fields: The message fields, as returned by parse_message.
+
+    Returns:
+        bytes: The complete binary frame.
+    """
+    if op == OP_MOVE:
+        mark, index = fields
+        payload = bytes((op, MARK_CODES[mark] << 4 | index))
+    elif op in (OP_ROLE, OP_WINNER):
+        payload = bytes((op, MARK_CODES[fields[0]]))
+    elif op in (OP_HELLO, OP_ERROR):
+        payload = bytes((op, fields[0]))
+    elif op in (OP_ROOM, OP_JOIN):
+        payload = bytes((op,)) + fields[0].to_bytes(4, 'big')
+    elif op == OP_REDIRECT:
+        payload = bytes((op,)) + fields[0].to_bytes(2, 'big')
+    elif op in (OP_SESSION, OP_RESUME):
+        payload = bytes((op,)) + bytes.fromhex(fields[0])
+    elif op == OP_SNAPSHOT:
+        mark, x, o, turn = fields
+        payload = bytes((op, MARK_CODES[mark] << 4 | MARK_CODES[turn])) + x.to_bytes(2, 'big') + o.to_bytes(2, 'big')
+    else:
+        payload = bytes((op,))
+    return encode_binary_frame(payload)
+
+
+def encode_message(op, *fields, binary=False):
+    """Encode a message in the framing the peer negotiated.
+
+    Args:
+        op: The opcode.
+        *fields: The message fields, as returned by parse_message.
+        binary: True to use the binary protocol, False for text.
+
+    Returns:
+        bytes: The complete frame.
+    """
+    if binary:
+        return encode_binary(op, *fields)
+    return encode_frame(format_text(op, *fields))
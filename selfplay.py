@@ -0,0 +1,346 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from bitboard import BitBoard
+from game_log import MAX_CELLS, GameLogWriter
+from mnk_engine import MNKEngine, MNKGame
+from opening_book import get_book
+from solver import SOLVER
+
+CHUNK_GAMES = 1000  # Games per work unit sent to a worker process
+
+
+class RandomAgent:
+    """
+    Plays a uniformly random legal move.
+    """
+
+    def choose(self, game, rng):
+        """
+        Picks the move for the current player.
+
+        Parameters:
+        -----------
+        game : MNKGame
+            The game to move in; it is not modified.
+        rng : random.Random
+            The worker's random number generator.
+
+        Returns:
+        --------
+        int
+            The index of the chosen cell.
+        """
+        return rng.choice([i for i, cell in enumerate(game.board) if cell == " "])
+
+
+class PerfectAgent:
+    """
+    Plays a perfect 3x3 move: the lowest-index optimal move from the opening book,
+    or from the cached solver if the book is unavailable (same as minimax, minus the search).
+    """
+
+    def choose(self, game, rng):
+        """
+        Picks the move for the current player (see RandomAgent.choose).
+        """
+        board = BitBoard.from_list(game.board)
+        book = get_book()
+        move = book.best_move(board, game.current_player) if book is not None else None
+        return move if move is not None else SOLVER.best_move(board, game.current_player)
+
+
+class EngineAgent:
+    """
+    Plays the move found by the iterative-deepening MNK engine, for boards of any size.
+
+    Attributes:
+    -----------
+    engine : MNKEngine
+        The engine searching for this agent.
+    """
+
+    def __init__(self, time_budget=0.05, max_depth=None):
+        """
+        Creates the agent's engine.
+
+        Parameters:
+        -----------
+        time_budget : float, optional
+            Seconds per move (default is 0.05).
+        max_depth : int, optional
+            Depth limit, which makes the agent's play reproducible (default is no limit).
+        """
+        self.engine = MNKEngine(time_budget=time_budget, max_depth=max_depth)
+
+    def choose(self, game, rng):
+        """
+        Picks the move for the current player (see RandomAgent.choose).
+        """
+        return self.engine.best_move(game, game.current_player)
+
+
+class EpsilonGreedyAgent:
+    """
+    Plays a random move with probability epsilon and the greedy agent's move otherwise.
+
+    Attributes:
+    -----------
+    epsilon : float
+        Probability of a random move.
+    greedy : object
+        The agent used for non-random moves.
+    """
+
+    def __init__(self, epsilon, greedy):
+        """
+        Creates the agent.
+
+        Parameters:
+        -----------
+        epsilon : float
+            Probability of a random move.
+        greedy : object
+            The agent used for non-random moves.
+        """
+        self.epsilon = epsilon
+        self.greedy = greedy
+        self._random = RandomAgent()
+
+    def choose(self, game, rng):
+        """
+        Picks the move for the current player (see RandomAgent.choose).
+        """
+        agent = self._random if rng.random() < self.epsilon else self.greedy
+        return agent.choose(game, rng)
+
+
+def make_agent(spec, size=3):
+    """
+    Creates an agent from its command-line description.
+
+    Supported specs are 'random', 'minimax' (perfect play, 3x3 only),
+    'engine[:time_budget[:max_depth]]' and 'epsilon:<epsilon>[:<greedy spec>]', where
+    the greedy agent defaults to 'minimax' on 3x3 and 'engine' on larger boards.
+
+    Parameters:
+    -----------
+    spec : str
+        The agent description.
+    size : int, optional
+        The board size the agent will play on (default is 3).
+
+    Returns:
+    --------
+    object
+        An agent with a choose(game, rng) method.
+
+    Raises:
+    -------
+    ValueError
+        If the spec is unknown or does not suit the board size.
+    """
+    name, _, args = spec.partition(":")
+    if name == "random":
+        return RandomAgent()
+    if name == "minimax":
+        if size != 3:
+            raise ValueError("the minimax agent only plays 3x3; use 'engine' for larger boards")
+        return PerfectAgent()
+    if name == "engine":
+        budget, _, depth = args.partition(":")
+        return EngineAgent(float(budget) if budget else 0.05, int(depth) if depth else None)
+    if name == "epsilon":
+        epsilon, _, greedy = args.partition(":")
+        greedy = greedy or ("minimax" if size == 3 else "engine")
+        return EpsilonGreedyAgent(float(epsilon), make_agent(greedy, size))
+    raise ValueError(f"Unknown agent: {spec}")
+
+
+def play_game(game, agents, rng):
+    """
+    Plays one game to the end.
+
+    Parameters:
+    -----------
+    game : MNKGame
+        A freshly reset game.
+    agents : dict
+        Maps 'X' and 'O' to their agents.
+    rng : random.Random
+        The worker's random number generator.
+
+    Returns:
+    --------
+    tuple
+        (list of move indices, winning mark or None for a draw).
+    """
+    moves = []
+    while True:
+        idx = agents[game.current_player].choose(game, rng)
+        game.make_move(idx)
+        moves.append(idx)
+        if game.winner is not None or game.board_full():
+            return moves, game.winner
+        game.switch_player()
+
+
+def play_chunk(chunk, games, size, k, first, second, alternate, seed):
+    """
+    Plays one work unit of games in a worker process.
+
+    Every chunk seeds its own random number generator from (seed, chunk), so a run
+    is reproducible however the chunks are spread over processes.
+
+    Parameters:
+    -----------
+    chunk : int
+        Index of the work unit.
+    games : int
+        Number of games to play.
+    size, k : int
+        Board size and line length.
+    first, second : str
+        Agent specs; `first` plays X unless colours alternate.
+    alternate : bool
+        True to swap colours every other game.
+    seed : int
+        Seed of the whole run.
+
+    Returns:
+    --------
+    list of dict
+        One record per game: id, x and o agent specs, moves, and winner.
+    """
+    rng = random.Random(seed * 1_000_003 + chunk)
+    agents = {first: make_agent(first, size), second: make_agent(second, size)}
+    game = MNKGame(size, k)
+    records = []
+    for offset in range(games):
+        game_id = chunk * CHUNK_GAMES + offset
+        x_spec, o_spec = (second, first) if alternate and game_id % 2 else (first, second)
+        game.reset_game()
+        moves, winner = play_game(game, {"X": agents[x_spec], "O": agents[o_spec]}, rng)
+        records.append({"id": game_id, "x": x_spec, "o": o_spec, "moves": moves, "winner": winner})
+    return records
+
+
+def run_selfplay(games, first, second, out, size=3, k=3, alternate=False, seed=0, workers=None):
+    """
+    Plays games across a process pool and streams the records to a file as JSON lines
+    or to a binary game log.
+
+    At most two work units per worker are in flight, so memory use stays flat no
+    matter how many games are requested; records are written in completion order.
+
+    Parameters:
+    -----------
+    games : int
+        Total number of games.
+    first, second : str
+        Agent specs; `first` plays X unless colours alternate.
+    out : file or GameLogWriter
+        Text file the records are written to as JSON lines, or a game log.
+    size, k : int, optional
+        Board size and line length (default is 3 and 3).
+    alternate : bool, optional
+        True to swap colours every other game (default is False).
+    seed : int, optional
+        Seed of the run (default is 0).
+    workers : int, optional
+        Worker processes (default is one per core).
+
+    Returns:
+    --------
+    dict
+        Summary: games, X wins, O wins, draws, wins per agent, seconds and games per second.
+
+    Raises:
+    -------
+    ValueError
+        If an agent spec is bad, or `out` is a game log and the board has more
+        than MAX_CELLS cells.
+    """
+    make_agent(first, size), make_agent(second, size)  # Reject bad specs before starting workers
+    if isinstance(out, GameLogWriter) and size * size > MAX_CELLS:
+        raise ValueError(f"game logs hold boards of at most {MAX_CELLS} cells, not {size}x{size}")
+    workers = workers or os.cpu_count() or 1
+    chunks = iter(range((games + CHUNK_GAMES - 1) // CHUNK_GAMES))
+    summary = {"games": 0, "x_wins": 0, "o_wins": 0, "draws": 0, "wins": {first: 0, second: 0}}
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        def submit(chunk):
+            count = min(CHUNK_GAMES, games - chunk * CHUNK_GAMES)
+            return executor.submit(play_chunk, chunk, count, size, k, first, second, alternate, seed)
+
+        pending = {submit(chunk) for _, chunk in zip(range(2 * workers), chunks)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                ended = time.time()
+                for record in future.result():
+                    if isinstance(out, GameLogWriter):
+                        out.write(record["x"], record["o"], record["moves"], record["winner"], ended, ended)
+                    else:
+                        out.write(json.dumps(record, separators=(",", ":")) + "\n")
+                    summary["games"] += 1
+                    winner = record["winner"]
+                    if winner is None:
+                        summary["draws"] += 1
+                    else:
+                        summary["x_wins" if winner == "X" else "o_wins"] += 1
+                        summary["wins"][record["x"] if winner == "X" else record["o"]] += 1
+                next_chunk = next(chunks, None)
+                if next_chunk is not None:
+                    pending.add(submit(next_chunk))
+
+    elapsed = time.perf_counter() - start
+    summary["seconds"] = round(elapsed, 3)
+    summary["games_per_sec"] = round(summary["games"] / elapsed, 1) if elapsed else 0.0
+    return summary
+
+
+def main():
+    """
+    Runs self-play from the command line.
+    """
+    parser = argparse.ArgumentParser(description="Headless self-play for generating game datasets")
+    parser.add_argument("--games", type=int, default=10000, help="number of games to play")
+    parser.add_argument("--x", default="minimax", help="agent playing X (random, minimax, engine[:budget[:depth]], "
+                                                       "epsilon:<eps>[:agent])")
+    parser.add_argument("--o", default="random", help="agent playing O")
+    parser.add_argument("--size", type=int, default=3, help="board size")
+    parser.add_argument("--k", type=int, default=3, help="marks in a row needed to win")
+    parser.add_argument("--alternate", action="store_true", help="swap colours every other game")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the run")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per core)")
+    parser.add_argument("--out", default="-", help="JSON lines output file ('-' for stdout)")
+    parser.add_argument("--game-log", action="store_true",
+                        help="write --out as a binary game log (see game_log.py) instead of JSON lines")
+    args = parser.parse_args()
+
+    if args.game_log:
+        if args.out == "-":
+            parser.error("--game-log needs an --out file")
+        if args.size * args.size > MAX_CELLS:
+            parser.error(f"--game-log holds boards of at most {MAX_CELLS} cells; --size {args.size} is too big")
+        out = GameLogWriter(args.out)
+    else:
+        out = sys.stdout if args.out == "-" else open(args.out, "w")
+    try:
+        summary = run_selfplay(args.games, args.x, args.o, out, args.size, args.k, args.alternate, args.seed,
+                               args.workers)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(json.dumps(summary), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
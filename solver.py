@@ -0,0 +1,189 @@
+from bitboard import BitBoard, FULL_MASK, WIN_TABLE, iter_moves
+
+
+class TicTacToeSolver:
+    """
+    A perfect-play solver for 3x3 Tic-Tac-Toe backed by a transposition table.
+
+    Positions are handled as a pair of bitboards (marks of the player to move, marks
+    of the opponent) and cached under a canonical key, the smallest of the 8 keys
+    obtained by rotating and reflecting the board, so symmetric positions are only
+    ever searched once. Chosen moves are cached under the exact position, which
+    turns every repeated AI reply into a single dictionary lookup.
+
+    Attributes:
+    -----------
+    values : dict
+        Maps a canonical position key to the game value for the player to move
+        (1 for a win, 0 for a draw, -1 for a loss).
+    moves : dict
+        Maps an exact position key to the best move index.
+    warmed : bool
+        True once warm_up() has run, which best_move() does on its first cache miss.
+    """
+
+    # The 8 symmetries of the square, each given as the source index for every cell
+    SYMMETRIES = ((0, 1, 2, 3, 4, 5, 6, 7, 8),  # Identity
+                  (6, 3, 0, 7, 4, 1, 8, 5, 2),  # Rotate 90
+                  (8, 7, 6, 5, 4, 3, 2, 1, 0),  # Rotate 180
+                  (2, 5, 8, 1, 4, 7, 0, 3, 6),  # Rotate 270
+                  (2, 1, 0, 5, 4, 3, 8, 7, 6),  # Mirror left-right
+                  (6, 7, 8, 3, 4, 5, 0, 1, 2),  # Mirror top-bottom
+                  (0, 3, 6, 1, 4, 7, 2, 5, 8),  # Main diagonal
+                  (8, 5, 2, 7, 4, 1, 6, 3, 0))  # Anti-diagonal
+
+    # For each symmetry, a table mapping every 9-bit mask to its transformed mask
+    SYMMETRY_TABLES = tuple(
+        tuple(sum(1 << j for j, src in enumerate(symmetry) if bits >> src & 1) for bits in range(FULL_MASK + 1))
+        for symmetry in SYMMETRIES)
+
+    def __init__(self):
+        """
+        Initializes the solver with empty caches.
+        """
+        self.values = {}  # Canonical position -> value for the player to move
+        self.moves = {}  # Exact position -> best move index
+        self.warmed = False
+
+    @staticmethod
+    def opponent(player):
+        """
+        Returns the mark of the other player.
+
+        Parameters:
+        -----------
+        player : str
+            The mark ('X' or 'O') of the current player.
+
+        Returns:
+        --------
+        str
+            The mark of the opposing player.
+        """
+        return "O" if player == "X" else "X"
+
+    @classmethod
+    def canonical_key(cls, mine, theirs):
+        """
+        Returns the canonical key of a position under the 8 board symmetries.
+
+        Parameters:
+        -----------
+        mine : int
+            The mask of cells owned by the player to move.
+        theirs : int
+            The mask of cells owned by the opponent.
+
+        Returns:
+        --------
+        int
+            The smallest packed (mine, theirs) key over all transformations.
+        """
+        return min(table[mine] | table[theirs] << 9 for table in cls.SYMMETRY_TABLES)
+
+    def solve(self, mine, theirs):
+        """
+        Computes the game value of a position with perfect play from both sides.
+
+        Parameters:
+        -----------
+        mine : int
+            The mask of cells owned by the player to move.
+        theirs : int
+            The mask of cells owned by the opponent.
+
+        Returns:
+        --------
+        int
+            1 if the player to move wins, -1 if they lose, 0 for a draw.
+        """
+        key = self.canonical_key(mine, theirs)
+        value = self.values.get(key)
+        if value is not None:
+            return value
+
+        free = FULL_MASK & ~(mine | theirs)
+        if WIN_TABLE[theirs]:
+            value = -1  # The previous move won the game
+        elif WIN_TABLE[mine]:
+            value = 1
+        elif not free:
+            value = 0  # Draw
+        else:
+            value = -1
+            for i in iter_moves(free):
+                score = -self.solve(theirs, mine | 1 << i)
+                if score > value:
+                    value = score
+                    if value == 1:
+                        break  # Cannot do better than a win
+
+        self.values[key] = value
+        return value
+
+    def best_move(self, board, player):
+        """
+        Returns the best move for the given player, searching only on a cache miss.
+
+        The first miss solves every reachable position at once (see warm_up), so
+        every later reply is a table lookup. Ties are broken by the lowest cell
+        index, matching a plain Minimax scan.
+
+        Parameters:
+        -----------
+        board : BitBoard or list
+            The current game board state.
+        player : str
+            The mark ('X' or 'O') of the player to move.
+
+        Returns:
+        --------
+        int or None
+            The index of the best move, or None if the board is full.
+        """
+        if not isinstance(board, BitBoard):
+            board = BitBoard.from_list(board)
+        mine = board.bits(player)
+        theirs = board.bits(self.opponent(player))
+        key = mine | theirs << 9
+        if key in self.moves:
+            return self.moves[key]
+        if not self.warmed:
+            self.warm_up()
+            if key in self.moves:
+                return self.moves[key]
+
+        best_score = -float('inf')
+        best_move = None
+        for i in iter_moves(FULL_MASK & ~(mine | theirs)):
+            score = -self.solve(theirs, mine | 1 << i)
+            if score > best_score:
+                best_score = score
+                best_move = i
+
+        self.moves[key] = best_move
+        return best_move
+
+    def warm_up(self):
+        """
+        Solves every reachable position so that later AI replies are pure cache lookups.
+        """
+        self.warmed = True  # Set first: the best_move() calls below must not warm up again
+        seen = set()
+        stack = [(0, 0)]  # (mine, theirs) from the point of view of the player to move
+        while stack:
+            mine, theirs = stack.pop()
+            key = mine | theirs << 9
+            if key in seen:
+                continue
+            seen.add(key)
+            free = FULL_MASK & ~(mine | theirs)
+            if WIN_TABLE[theirs] or not free:
+                continue  # Terminal positions have no move to cache
+            self.best_move(BitBoard(mine, theirs), "X")
+            for i in iter_moves(free):
+                stack.append((theirs, mine | 1 << i))
+
+
+# Shared solver so the cache survives across games and TicTacToeGame instances
+SOLVER = TicTacToeSolver()
@@ -0,0 +1,145 @@
+import os
+from collections import OrderedDict
+from PIL import Image, ImageTk
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+SPRITE_FILES = {"X": "Cross_m.png", "O": "Circle_m.png"}  # Marker sprites, by mark
+EMPTY = "empty"  # Name of the placeholder sprite for an empty cell
+EMPTY_COLOR = (217, 19, 59)  # Red placeholder
+CELL_SIZE = (100, 100)  # Default board cell size in pixels
+MAX_SPRITES = 32  # Rendered sprites kept before the least recently used is dropped
+
+
+class SpriteCache:
+    """
+    Loads each sprite image once and renders it per cell size, keeping the most
+    recently used renderings as shared PhotoImages.
+
+    Every rendering is made from the full-resolution source, so sprites stay crisp
+    at any cell size, and asking for a size that is cached costs one dictionary
+    lookup. A PhotoImage disappears from widgets showing it once nothing references
+    it, so callers keep the sprites they display (as the board UI does) and eviction
+    only drops the cache's own reference.
+
+    Attributes:
+    -----------
+    maxsize : int
+        Number of rendered sprites kept.
+    hits, misses : int
+        Cache lookups served from the cache and rendered anew.
+    """
+
+    def __init__(self, maxsize=MAX_SPRITES):
+        """
+        Creates an empty cache.
+
+        Parameters:
+        -----------
+        maxsize : int, optional
+            Number of rendered sprites kept (default is MAX_SPRITES).
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._sources = {}  # Sprite name -> full-resolution PIL image
+        self._rendered = OrderedDict()  # (name, size) -> PhotoImage, least recently used first
+
+    def source(self, name):
+        """
+        Returns the full-resolution image of a marker sprite, loading it on first use.
+
+        Parameters:
+        -----------
+        name : str
+            A key of SPRITE_FILES.
+
+        Returns:
+        --------
+        PIL.Image.Image
+            The source image.
+        """
+        image = self._sources.get(name)
+        if image is None:
+            with Image.open(os.path.join(ASSETS_DIR, SPRITE_FILES[name])) as source:
+                image = self._sources[name] = source.convert("RGBA")
+        return image
+
+    def render(self, name, size):
+        """
+        Renders a sprite at a size, without caching it.
+
+        Parameters:
+        -----------
+        name : str
+            'X', 'O' or EMPTY.
+        size : tuple
+            (width, height) in pixels.
+
+        Returns:
+        --------
+        PIL.Image.Image
+            The sprite.
+        """
+        if name == EMPTY:
+            return Image.new('RGB', size, color=EMPTY_COLOR)
+        return self.source(name).resize(size, resample=Image.BICUBIC)
+
+    def get(self, name, size=CELL_SIZE):
+        """
+        Returns the shared PhotoImage of a sprite at a size, rendering it if needed.
+
+        Parameters:
+        -----------
+        name : str
+            'X', 'O' or EMPTY.
+        size : tuple, optional
+            (width, height) in pixels (default is CELL_SIZE).
+
+        Returns:
+        --------
+        ImageTk.PhotoImage
+            The sprite.
+        """
+        key = (name, tuple(size))
+        photo = self._rendered.get(key)
+        if photo is not None:
+            self.hits += 1
+            self._rendered.move_to_end(key)
+            return photo
+
+        self.misses += 1
+        photo = self._rendered[key] = ImageTk.PhotoImage(self.render(name, key[1]))
+        if len(self._rendered) > self.maxsize:
+            self._rendered.popitem(last=False)  # Evict the least recently used rendering
+        return photo
+
+    def clear(self):
+        """
+        Drops every rendered sprite, keeping the loaded sources.
+        """
+        self._rendered.clear()
+
+
+_sprites = None  # Shared cache, created on first use
+
+
+def get_sprite(name, size=CELL_SIZE):
+    """
+    Returns a sprite from the application's shared cache (see SpriteCache.get).
+
+    Parameters:
+    -----------
+    name : str
+        'X', 'O' or EMPTY.
+    size : tuple, optional
+        (width, height) in pixels (default is CELL_SIZE).
+
+    Returns:
+    --------
+    ImageTk.PhotoImage
+        The sprite.
+    """
+    global _sprites
+    if _sprites is None:
+        _sprites = SpriteCache()
+    return _sprites.get(name, size)
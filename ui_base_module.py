@@ -1,8 +1,14 @@
+import logging
 import tkinter as tk
 from tkinter import messagebox
-from PIL import Image, ImageTk
 from pygame import mixer
 from gif_background import GIFLabel  # Import the GIFLabel class for GIF background support
+from board_canvas import CanvasBoard
+from sprites import CELL_SIZE
+
+WINDOW_SIZE = (542, 602)  # Width and height of the fixed-size window
+
+logger = logging.getLogger(__name__)
 
 class TicTacToeBaseUI:
     """
@@ -12,13 +18,8 @@ class TicTacToeBaseUI:
     Attributes:
         root (tk.Tk): The main application window.
         home_screen (HomeScreen): Reference to the home screen object to handle transitions.
-        buttons (list): List of button widgets for the game board.
-        button_images (list): List to track images assigned to buttons.
-        empty_image (ImageTk.PhotoImage): Placeholder image for an empty board cell.
-        x_image (Image.Image): Image for player X's marker.
-        o_image (Image.Image): Image for player O's marker.
-        x_photo (ImageTk.PhotoImage): Resized PhotoImage for player X's marker.
-        o_photo (ImageTk.PhotoImage): Resized PhotoImage for player O's marker.
+        cell_size (tuple): Width and height of a board cell in pixels.
+        board_view (CanvasBoard): The board, drawn on a single canvas.
         x_wins (int): Counter for player X's wins.
         o_wins (int): Counter for player O's wins.
         game_count (int): Counter for total number of games played.
@@ -26,8 +27,7 @@ class TicTacToeBaseUI:
 
     def __init__(self, root, home_screen):
         """
-        Initializes the Tic-Tac-Toe UI, hides the home screen, and sets up the game board 
-        with images and buttons.
+        Initializes the Tic-Tac-Toe UI, hides the home screen, and sets up the game board.
 
         Args:
             root (tk.Tk): The main application window.
@@ -35,25 +35,17 @@ class TicTacToeBaseUI:
         """
         self.root = root
         self.home_screen = home_screen
-        self.buttons = []
-        self.button_images = [None] * 9  # Initialize button image list for 9 cells
 
         # Hide home screen
         self.home_screen.hide_home_screen()
 
         # Add the GIF background using the custom GIFLabel widget
-        gif_label = GIFLabel(self.root, r"./assets/background.gif")
+        gif_label = GIFLabel(self.root, r"./assets/background.gif", WINDOW_SIZE)  # Same frames as the home screen
         gif_label.pack(fill="both", expand=True)
         gif_label.place(relx=0, rely=0, relwidth=1, relheight=1)  # Fill the entire window with the GIF
 
-        # Create the empty placeholder image to use before markers are placed on the board
-        self.empty_image = ImageTk.PhotoImage(Image.new('RGB', (100, 100), color=(217, 19, 59)))  # Red placeholder
-
-        # Load, resize, and prepare images for X and O markers
-        self.x_image = Image.open("./assets/Cross_m.png").resize((100, 100), resample=Image.BICUBIC)
-        self.o_image = Image.open("./assets/Circle_m.png").resize((100, 100), resample=Image.BICUBIC)
-        self.x_photo = ImageTk.PhotoImage(self.x_image)
-        self.o_photo = ImageTk.PhotoImage(self.o_image)
+        # Size of a board cell; the sprites for it are rendered once and shared by every game screen
+        self.cell_size = CELL_SIZE
 
         # Initialize win counters for players
         self.x_wins = 0
@@ -65,57 +57,29 @@ class TicTacToeBaseUI:
 
     def create_board(self):
         """
-        Creates the 3x3 Tic-Tac-Toe game board using buttons. Each button represents 
-        a cell on the board and triggers a player's move when clicked.
+        Creates the 3x3 Tic-Tac-Toe game board as a single canvas. Clicking a cell
+        triggers a player's move.
         """
-        print("GAME BOARD CREATED!")
-        button_size = (100, 100)  # Define a fixed button size for consistency
-
-        # Create a frame to center the game board within the window
-        self.board_frame = tk.Frame(self.root)
-        self.board_frame.pack(expand=True)
-
-        # Create 9 buttons for the board (3x3 grid)
-        for i in range(9):
-            button = tk.Button(self.board_frame, text=" ", font=("Arial", 24), width=button_size[0], height=button_size[1],
-                               command=lambda i=i: self.player_move(i), fg="red", bg="silver")
-            button.grid(row=i // 3, column=i % 3, sticky="nsew")  # Add sticky="nsew" to ensure the button expands within the cell
-
-            # Set the initial image for each button to the empty placeholder image
-            button.config(image=self.empty_image)
-            self.button_images[i] = None  # Ensure no image is associated with the button at start
-
-            # Store the button in the buttons list
-            self.buttons.append(button)
-
-        # Configure the grid layout for the board, ensuring all rows and columns are equally sized
-        for i in range(3):
-            self.board_frame.grid_rowconfigure(i, minsize=button_size[1], weight=1)  # Set minimum row height
-            self.board_frame.grid_columnconfigure(i, minsize=button_size[0], weight=1)  # Set minimum column width
+        logger.debug("Game board created")
+        self.board_view = CanvasBoard(self.root, size=3, cell_size=self.cell_size, on_click=self.player_move)
+        self.board_view.pack(expand=True)
 
     def update_board(self, game_board):
         """
-        Updates the game board UI based on the current game state by assigning 'X' and 'O' images 
-        to the corresponding buttons.
+        Updates the game board UI based on the current game state, redrawing only the cells
+        whose mark changed since the last update.
 
         Args:
             game_board (list): List representing the current game state, with 'X', 'O', or empty spaces.
         """
-        print("Game Board: ", game_board)
-        for i, button in enumerate(self.buttons):
-            if game_board[i] == 'X':
-                button.config(image=self.x_photo)  # Set the 'X' marker image
-            elif game_board[i] == 'O':
-                button.config(image=self.o_photo)  # Set the 'O' marker image
-            else:
-                button.config(image=self.empty_image)  # Set the empty placeholder image
+        logger.debug("Game board: %s", game_board)
+        self.board_view.render(game_board)
 
     def reset_board(self):
         """
-        Resets the game board for a new game, clearing all markers and enabling all buttons.
+        Resets the game board for a new game, clearing all markers and enabling the board.
         """
-        for button in self.buttons:
-            button.config(image=self.empty_image, state='normal')  # Reset button images and enable all buttons
+        self.board_view.clear()
 
     def create_common_controls(self):
         """
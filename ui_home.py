@@ -2,9 +2,11 @@ import tkinter as tk
 from game_logic import TicTacToeGame
 from ui_online_module import TicTacToeOnlineUI
 from ui_local_module import TicTacToeLocalUI
+from ui_base_module import WINDOW_SIZE
 from pygame import mixer
 from gif_background import GIFLabel  # Import the GIFLabel class for GIF background support
 
+
 class HomeScreen:
     """
     This class defines the home screen for the Tic-Tac-Toe game. It provides options 
@@ -36,7 +38,7 @@ class HomeScreen:
         self.create_home_screen()
 
         # Set window size and properties (fixed size, non-resizable)
-        root.geometry("542x602")  # Width x height
+        root.geometry("{}x{}".format(*WINDOW_SIZE))  # Width x height
         root.resizable(False, False)
 
     def create_home_screen(self):
@@ -47,7 +49,7 @@ class HomeScreen:
         self.root.title("Tic-Tac-Toe: Select Mode")
 
         # Add the background GIF using the custom GIFLabel widget
-        gif_label = GIFLabel(self.root, r"./assets/background.gif")
+        gif_label = GIFLabel(self.root, r"./assets/background.gif", WINDOW_SIZE)  # Frames scaled once, shared by every screen
         gif_label.pack(fill="both", expand=True)
         gif_label.place(relx=0, rely=0, relwidth=1, relheight=1)  # Set the GIF as the background
         self.home_widgets.append(gif_label)  # Store widget reference
@@ -81,7 +83,9 @@ class HomeScreen:
         Hide the home screen widgets, making them invisible while the game mode is active.
         """
         for widget in self.home_widgets:
-            widget.pack_forget()  # Hide each widget without destroying them
+            # Hide each widget without destroying them; the background is placed, not packed
+            widget.pack_forget()
+            widget.place_forget()
 
     def start_single_player(self):
         """
@@ -109,11 +113,11 @@ class HomeScreen:
 
     def clear_screen(self):
         """
-        Clear the current screen by hiding all home screen widgets and clearing the 
+        Clear the current screen by destroying all home screen widgets and clearing the 
         widget list.
         """
         for widget in self.home_widgets:
-            widget.pack_forget()  # Hide widgets (but do not destroy them)
+            widget.destroy()  # Never shown again: go_back_home builds a fresh home screen
         self.home_widgets.clear()  # Clear the list of home screen widgets
 
     def start_game(self, mode):
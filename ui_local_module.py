@@ -1,7 +1,11 @@
+import logging
+from ai_worker import AIWorker
 from ui_base_module import TicTacToeBaseUI
 import tkinter as tk
 from tkinter import messagebox
 
+logger = logging.getLogger(__name__)
+
 class TicTacToeLocalUI(TicTacToeBaseUI):
     """
     The TicTacToeLocalUI class is responsible for handling the local multiplayer UI 
@@ -10,6 +14,7 @@ class TicTacToeLocalUI(TicTacToeBaseUI):
 
     Attributes:
         game (TicTacToeGame): The game logic for managing Tic-Tac-Toe moves and state.
+        ai (AIWorker): Runs the AI's searches off the Tk thread.
         home_screen (HomeScreen): Reference to the home screen to allow returning 
                                   to the home screen after finishing the game.
     """
@@ -25,7 +30,8 @@ class TicTacToeLocalUI(TicTacToeBaseUI):
         """
         super().__init__(root, home_screen)
         self.game = game
-        print(f"Game object initialized: {self.game}")
+        self.ai = AIWorker(self.root)  # The window keeps drawing while the AI thinks
+        logger.debug("Game object initialized: %s", self.game)
 
         # Create the score display for X and O wins
         self.create_score_display()
@@ -55,7 +61,7 @@ class TicTacToeLocalUI(TicTacToeBaseUI):
         Args:
             idx (int): The index of the cell where the player attempts to make a move.
         """
-        if self.game.game_over:  # Do nothing if the game is over
+        if self.game.game_over or self.ai.thinking:  # Do nothing if the game is over or the AI is thinking
             return
 
         if self.game.make_move(idx):  # Update the game state with the player's move
@@ -79,27 +85,37 @@ class TicTacToeLocalUI(TicTacToeBaseUI):
             else:
                 self.game.switch_player()  # Switch to the other player
 
-                # If AI is enabled, make the AI's move
+                # If AI is enabled, let it search in the background; clicks are ignored meanwhile
                 if self.game.ai_enabled and self.game.current_player == "O":
-                    best_move = self.game.ai_move()  # Get the AI's best move
-                    if best_move is not None:
-                        self.game.make_move(best_move)  # Make the AI's move
-                        self.update_board(self.game.board)  # Refresh the UI board
-                        if self.game.check_winner("O"):  # Check if AI won
-                            self.o_wins += 1
-                            self.game_count += 1
-                            messagebox.showinfo("Tic-Tac-Toe", "AI wins this game!")
-                            self.update_scores()  # Update the displayed scores
-                            self.reset_board()  # Reset the game board for a new game
-                            self.check_winner()  # Check if someone won the best 2 out of 3
-                            return
-                        elif self.game.board_full():  # Check for a draw after AI's move
-                            self.game_count += 1
-                            messagebox.showinfo("Tic-Tac-Toe", "It's a draw!")
-                            self.reset_board()  # Reset the game board after a draw
-                            self.check_winner()
-                            return
-                    self.game.switch_player()  # Switch back to the player
+                    self.board_view.config(cursor="watch")
+                    self.ai.request(self.game.board, self.ai_move_found)
+
+    def ai_move_found(self, best_move):
+        """
+        Play the AI's move once its search has finished.
+
+        Args:
+            best_move (int): The index of the cell chosen by the AI, or None if there is none.
+        """
+        self.board_view.config(cursor="")
+        if best_move is not None:
+            self.game.make_move(best_move)  # Make the AI's move
+            self.update_board(self.game.board)  # Refresh the UI board
+            if self.game.check_winner("O"):  # Check if AI won
+                self.o_wins += 1
+                self.game_count += 1
+                messagebox.showinfo("Tic-Tac-Toe", "AI wins this game!")
+                self.update_scores()  # Update the displayed scores
+                self.reset_board()  # Reset the game board for a new game
+                self.check_winner()  # Check if someone won the best 2 out of 3
+                return
+            elif self.game.board_full():  # Check for a draw after AI's move
+                self.game_count += 1
+                messagebox.showinfo("Tic-Tac-Toe", "It's a draw!")
+                self.reset_board()  # Reset the game board after a draw
+                self.check_winner()
+                return
+        self.game.switch_player()  # Switch back to the player
 
     def update_scores(self):
         """
@@ -112,9 +128,18 @@ class TicTacToeLocalUI(TicTacToeBaseUI):
         """
         Reset the game board for a new game.
         """
+        self.ai.cancel()  # A search for the old game must not play into the new one
+        self.board_view.config(cursor="")
         self.game.reset_game()  # Reset the game logic
         super().reset_board()  # Reset the UI board
 
+    def go_back_home(self):
+        """
+        Stop the AI and return to the home screen.
+        """
+        self.ai.close()
+        super().go_back_home()
+
     def create_common_controls(self):
         """
         Create common controls like the restart button.
@@ -1,17 +1,22 @@
-import socket
-import threading
+import logging
+import queue
 import tkinter as tk
 from tkinter import messagebox  # Importing messagebox for role notifications
 from ui_base_module import TicTacToeBaseUI
+from client_network import EVENT_CLOSED, EVENT_CONNECTED, EVENT_FAILED, ClientConnection
+from protocol import (OP_DISCONNECT, OP_DRAW, OP_ERROR, OP_GAME_OVER, OP_HELLO, OP_MOVE, OP_RESET_BOARD, OP_ROLE,
+                      OP_SNAPSHOT, OP_WINNER, RETRYABLE_ERRORS)
 
 PORT = 1000  # Port for the server
 SERVER = '192.168.1.11'  # Local IP address of the server
 ADDR = (SERVER, PORT)  # Combine server and port into an address tuple
-FORMAT = 'utf-8'  # Encoding format for communication
-HEADER = 64  # Fixed header size for message lengths
-DISCONNECT_MESSAGE = "D"  # Message to indicate disconnection to the server
 GAME_OVER_MESSAGE = "GAME_OVER"  # Message indicating the game is over
 
+POLL_INTERVAL = 15  # Milliseconds between checks for network events on the Tk thread
+MAX_EVENTS_PER_POLL = 32  # Network events handled per check, so a burst never stalls redraws
+
+logger = logging.getLogger(__name__)
+
 class TicTacToeOnlineUI(TicTacToeBaseUI):
     """
     UI class for handling the online multiplayer mode of Tic-Tac-Toe.
@@ -28,7 +33,9 @@ class TicTacToeOnlineUI(TicTacToeBaseUI):
             home_screen: Reference to the home screen UI.
         """
         super().__init__(root, home_screen)
-        self.client = None  # Socket client for server connection
+        self.connection = None  # Background connection to the server
+        self.events = None  # Queue of network events waiting for the Tk thread
+        self.poll_job = None  # Pending root.after callback that drains the events
         self.player = None  # Player type ('X' or 'O')
         self.turn = False  # Keeps track of whether it's the player's turn
         self.game_in_progress = True  # Flag for game state
@@ -56,50 +63,65 @@ class TicTacToeOnlineUI(TicTacToeBaseUI):
         self.disconnect_button.pack(side=tk.LEFT, expand=True, padx=10, pady=10)
 
     def connect_to_server(self):
-        """ Handles connection to the Tic-Tac-Toe server. Sets up the client socket and manages the initial communication. """
-        if self.client is not None and self.client.fileno() != -1:
-            print("Already connected")  # If already connected, return
+        """ Starts connecting to the Tic-Tac-Toe server in the background; the window stays responsive. """
+        if self.connection is not None:
+            logger.info("Already connected")  # If already connected, return
             return
 
-        try:
-            # Create a new socket connection to the server
-            self.client = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.client.connect(ADDR)  # Connect to the server address
-
-            # Receive the player type (X or O) from the server
-            msg_length = self.client.recv(HEADER).decode(FORMAT)
-            if msg_length:
-                msg_length = int(msg_length)
-                self.player = self.client.recv(msg_length).decode(FORMAT)
-                
-                # If server is full, notify the user and return to the home screen
-                if self.player == "TOO_MANY_PLAYERS":
-                    print("Server full, returning to home.")
-                    messagebox.showerror("Server Full", "The server is full. Please try again later.")
-                    self.disconnect_from_server()
-                    return
-                
-                print(f"Connection Successful: Connected as player {self.player}")
-                
-                # Show player's role (X or O)
-                self.show_player_role()
-
-                # Player X starts first
-                if self.player == 'X':
-                    self.turn = True
-
-            # Disable the 'Connect' button and enable the 'Disconnect' button
-            self.connect_button.config(state=tk.DISABLED)
+        self.player = None
+        self.events = queue.SimpleQueue()  # Fresh queue, so nothing from an old connection is handled
+        self.connection = ClientConnection(ADDR, self.events)
+        self.connection.start()
+        self.connect_button.config(state=tk.DISABLED)  # No second attempt while this one runs
+        self.poll_events()
+
+    def poll_events(self):
+        """ Handles queued network events on the Tk thread, a bounded batch per call. """
+        self.poll_job = None
+        events = self.events
+        for _ in range(MAX_EVENTS_PER_POLL):
+            if self.connection is None or events is not self.events:
+                return  # Disconnected while handling an event
+            try:
+                op, fields = events.get_nowait()
+            except queue.Empty:
+                break
+            self.handle_event(op, fields)
+        if self.connection is not None:
+            self.poll_job = self.root.after(POLL_INTERVAL, self.poll_events)
+
+    def stop_polling(self):
+        """ Cancels the pending event check, if any. """
+        if self.poll_job is not None:
+            self.root.after_cancel(self.poll_job)
+            self.poll_job = None
+
+    def handle_event(self, op, fields):
+        """ Applies one network event (a connection event or a parsed server message) to the UI. """
+        if op == EVENT_CONNECTED:
             self.disconnect_button.config(state=tk.NORMAL)
-
-            # Start a new thread to handle receiving messages from the server
-            receive_thread = threading.Thread(target=self.receive_messages, daemon=True)
-            receive_thread.start()
-
-        except Exception as e:
-            print(f"Error connecting to server: {e}")
+        elif op == EVENT_FAILED:
+            logger.warning("Error connecting to server: %s", fields[0])
+            self.connection = None
             messagebox.showerror("Connection Error", "No server to connect to. Returning to Home Screen.")
             self.go_back_home()
+        elif op == EVENT_CLOSED:
+            logger.info("Connection closed by server")
+            self.connection = None
+            self.connect_button.config(state=tk.NORMAL)
+            self.disconnect_button.config(state=tk.DISABLED)
+        elif op is None and fields[0] == "TOO_MANY_PLAYERS":
+            # If server is full, notify the user and return to the home screen
+            logger.info("Server full, returning to home")
+            messagebox.showerror("Server Full", "The server is full. Please try again later.")
+            self.disconnect_from_server()
+        elif op == OP_ROLE and self.player is None:
+            self.player = fields[0]
+            logger.info("Connected as player %s", self.player)
+            self.show_player_role()  # Show player's role (X or O)
+            self.turn = self.player == 'X'  # Player X starts first
+        else:
+            self.handle_message(op, fields)
 
     def show_player_role(self):
         """ Displays a message box showing whether the player is X or O. """
@@ -107,26 +129,31 @@ class TicTacToeOnlineUI(TicTacToeBaseUI):
         messagebox.showinfo("Player Role", role_message)
 
     def disconnect_from_server(self):
-        """ Handles disconnection from the server. Cleans up the client socket and resets UI controls. """
-        if self.client is None or self.client.fileno() == -1:
-            print("No active connection to disconnect.")
+        """ Handles disconnection from the server. Closes the connection in the background and resets UI controls. """
+        if self.connection is None:
+            logger.debug("No active connection to disconnect")
             return
 
-        try:
-            # Send disconnect message to the server
-            self.client.send(DISCONNECT_MESSAGE.encode(FORMAT))
-            self.client.close()  # Close the socket connection
-            self.client = None
-            print("Disconnected from server.")
-            
-            # Reset UI buttons
-            self.connect_button.config(state=tk.NORMAL)
-            self.disconnect_button.config(state=tk.DISABLED)
+        # Send the disconnect notice and close the socket without waiting on the network
+        self.connection.close()
+        self.connection = None
+        self.stop_polling()
+        logger.info("Disconnected from server")
 
-            # Return to the home screen
-            self.go_back_home()
-        except Exception as e:
-            print(f"Error during disconnection: {e}")
+        # Reset UI buttons
+        self.connect_button.config(state=tk.NORMAL)
+        self.disconnect_button.config(state=tk.DISABLED)
+
+        # Return to the home screen
+        self.go_back_home()
+
+    def go_back_home(self):
+        """ Closes any open connection before leaving the online screen. """
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+        self.stop_polling()
+        super().go_back_home()
 
     def player_move(self, idx):
         """ Handles the player's move on the board, sending the move coordinates to the server. """
@@ -136,72 +163,79 @@ class TicTacToeOnlineUI(TicTacToeBaseUI):
 
     def send_coordinate(self, row, col):
         """ Sends the player's move (row and column) to the server. """
-        if not self.turn or not self.game_in_progress:
-            print("Not your turn or game over!")
+        if not self.turn or not self.game_in_progress or self.connection is None:
+            logger.debug("Not your turn or game over")
             return
 
-        # Prepare message with player's move
-        msg = f"{self.player}:{row}:{col}"
-        message = msg.encode(FORMAT)
-        msg_length = len(message)
-        send_length = str(msg_length).encode(FORMAT)
-        send_length += b' ' * (HEADER - len(send_length))  # Padding to match HEADER size
-
-        # Send message length and message itself to the server
-        self.client.send(send_length)
-        self.client.send(message)
+        # Queue the move in the negotiated protocol; the writer thread sends it
+        self.connection.send_move(self.player, row * 3 + col)
 
         # After sending the move, it's the other player's turn
         self.turn = False
 
-    def receive_messages(self):
-        """ Continuously listens for messages from the server, processing game updates or disconnection. """
-        while True:
-            try:
-                # Receive message length and message from the server
-                msg_length = self.client.recv(HEADER).decode(FORMAT)
-                if msg_length:
-                    msg_length = int(msg_length)
-                    msg = self.client.recv(msg_length).decode(FORMAT)
-                    print(f"Received from server: {msg}")
-
-                    # Handle different types of messages
-                    if msg.startswith("MOVE"):
-                        _, p, row, col = msg.split(':')
-                        self.update_board(int(row), int(col), p)
-                        if p != self.player:
-                            self.turn = True  # Set turn for the other player
-                    elif msg.startswith("WINNER"):
-                        _, winner = msg.split(':')
-                        print(f"{winner} wins!")
-                        self.game_over(f"Player {winner} wins!")
-                    elif msg == "DRAW":
-                        print("It's a draw!")
-                        self.game_over("It's a draw!")
-                    elif msg == "RESET_BOARD":
-                        self.reset_board()
-                    elif msg == GAME_OVER_MESSAGE:
-                        print("Game over, returning to home.")
-                        self.game_over("Game Over!")
-                    elif msg == "DISCONNECT":
-                        print("The other player has disconnected. Disconnecting both players.")
-                        self.disconnect_from_server()  # Disconnect if other player leaves
-                        break
-            except Exception as e:
-                print(f"Error receiving message: {e}")
-                break
+    def handle_message(self, op, fields):
+        """ Processes one message from the server: game updates, results or disconnection. """
+        if op == OP_MOVE:
+            p, index = fields
+            self.update_board(index // 3, index % 3, p)
+            if p != self.player:
+                self.turn = True  # Set turn for the other player
+        elif op == OP_WINNER:
+            winner = fields[0]
+            logger.info("%s wins", winner)
+            self.game_over(f"Player {winner} wins!")
+        elif op == OP_DRAW:
+            logger.info("Draw")
+            self.game_over("It's a draw!")
+        elif op == OP_RESET_BOARD:
+            self.reset_board()
+        elif op == OP_GAME_OVER:
+            logger.info("Game over, returning to home")
+            self.game_over("Game Over!")
+        elif op == OP_HELLO:
+            pass  # The connection has switched to the binary protocol
+        elif op == OP_ROLE:
+            self.player = fields[0]  # New role after a rematch
+            self.reset_board()
+        elif op == OP_SNAPSHOT:
+            self.apply_snapshot(*fields)  # The connection dropped and the game was resumed
+        elif op == OP_ERROR:
+            logger.warning("Move rejected by server (error %s)", fields[0])
+            if fields[0] in RETRYABLE_ERRORS and self.game_in_progress:
+                self.turn = True  # Still our move, let the player pick another cell
+        elif op == OP_DISCONNECT:
+            logger.info("The other player has disconnected")
+            self.disconnect_from_server()  # Disconnect if other player leaves
+
+    def apply_snapshot(self, mark, x, o, turn):
+        """
+        Redraws the board from a server snapshot.
+
+        Args:
+            mark: The player's mark.
+            x: Bit mask of the cells held by X.
+            o: Bit mask of the cells held by O.
+            turn: The mark to move next.
+        """
+        super().reset_board()
+        for index in range(9):
+            if x >> index & 1:
+                self.update_board(index // 3, index % 3, 'X')
+            elif o >> index & 1:
+                self.update_board(index // 3, index % 3, 'O')
+        self.player = mark
+        self.game_in_progress = True
+        self.turn = turn == mark
 
     def update_board(self, row, col, player):
         """ Updates the game board to reflect the player's move. """
-        print(f"Updating board for player {player} at ({row}, {col})")
-        if player == 'X':
-            self.buttons[row * 3 + col].config(image=self.x_photo)  # Update button to X
-        elif player == 'O':
-            self.buttons[row * 3 + col].config(image=self.o_photo)  # Update button to O
+        logger.debug("Updating board for player %s at (%d, %d)", player, row, col)
+        if player in ('X', 'O'):
+            self.board_view.set_cell(row * 3 + col, player)  # Redraws just this cell
 
     def game_over(self, result):
         """ Ends the game, showing a result message and resetting the board. """
-        print(f"Game over: {result}")
+        logger.info("Game over: %s", result)
         self.game_in_progress = False  # Set game as no longer in progress
         tk.messagebox.showinfo("Game Over", result)  # Show game-over message
         self.reset_board()  # Reset the board for a new game
@@ -0,0 +1,100 @@
+import time
+from protocol import (ERR_NOT_SEATED, ERR_NOT_YOUR_TURN, ERR_OCCUPIED, ERR_OUT_OF_RANGE, ERR_RATE_LIMITED,
+                      ERR_SESSION_EXPIRED, OP_ERROR, encode_message)
+
+BOARD_CELLS = 9  # Valid cell indices are 0 to BOARD_CELLS - 1
+MESSAGE_RATE = 20.0  # Messages per second a client may sustain
+MESSAGE_BURST = 40  # Messages a client may send at once before the rate applies
+MAX_STRIKES = 50  # Consecutive rejected messages before a client is disconnected
+
+# Every error reply is encoded once, up front, for both protocols, so rejecting a
+# message costs a dictionary lookup and a queue append
+ERROR_FRAMES = {
+    (code, binary): encode_message(OP_ERROR, code, binary=binary)
+    for code in (ERR_NOT_SEATED, ERR_NOT_YOUR_TURN, ERR_OCCUPIED, ERR_OUT_OF_RANGE, ERR_RATE_LIMITED,
+                 ERR_SESSION_EXPIRED)
+    for binary in (False, True)
+}
+
+
+def check_move(board, turn, player, mark, index):
+    """Validate a move against the authoritative board in constant time.
+
+    Args:
+        board: The room's BitBoard.
+        turn: The mark ('X' or 'O') whose turn it is.
+        player: The mark assigned to the sending connection, or None if it is not seated.
+        mark: The mark named in the move message.
+        index: The cell index named in the move message.
+
+    Returns:
+        int: 0 if the move is legal, otherwise the error code to reply with.
+    """
+    if player is None:
+        return ERR_NOT_SEATED
+    if mark != player or player != turn:
+        return ERR_NOT_YOUR_TURN
+    if not 0 <= index < BOARD_CELLS:
+        return ERR_OUT_OF_RANGE
+    if not board.is_free(index):  # Single bit test on the occupancy mask
+        return ERR_OCCUPIED
+    return 0
+
+
+class RateLimiter:
+    """Token bucket that caps how fast one connection may send messages.
+
+    Each message takes one token; tokens refill at `rate` per second up to `burst`.
+    A rate of None lets every message through.
+    Consecutive rejections are counted so a client that keeps misbehaving can be
+    disconnected instead of being answered forever.
+
+    Attributes:
+        rate: Tokens added per second, or None for no limit.
+        burst: Maximum number of tokens.
+        strikes: Number of consecutive rejected messages.
+    """
+
+    __slots__ = ("rate", "burst", "tokens", "stamp", "strikes")
+
+    def __init__(self, rate=MESSAGE_RATE, burst=MESSAGE_BURST):
+        """Create a full bucket.
+
+        Args:
+            rate: Tokens added per second, or None for no limit.
+            burst: Maximum number of tokens.
+        """
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.stamp = time.monotonic()
+        self.strikes = 0
+
+    def allow(self):
+        """Take a token for one message.
+
+        Returns:
+            bool: True if the message may be processed, False if it should be dropped.
+        """
+        if self.rate is None:
+            return True
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def strike(self):
+        """Record a rejected message.
+
+        Returns:
+            bool: True once the client has reached MAX_STRIKES and should be disconnected.
+        """
+        self.strikes += 1
+        return self.strikes >= MAX_STRIKES
+
+    def clear(self):
+        """Reset the strike count after an accepted message."""
+        self.strikes = 0